@@ -3,20 +3,34 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, callback
-import homeassistant.helpers.config_validation as cv
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.typing import ConfigType
-import voluptuous as vol
 
 from .const import (
-    ATTR_KEY,
-    ATTR_SERIAL_NUMBER,
-    ATTR_VALUE,
-    DEFAULT_TOPIC_PREFIX,
+    CONF_LATENCY_TRACING,
+    CONF_LOAD_MANAGEMENT,
+    CONF_SURPLUS_CHARGING,
+    CONF_TARIFF,
+    CONF_TOPIC_PREFIX,
+    DATA_CHARGERS,
+    DATA_ROUTERS,
+    DATA_SESSION_LOG,
+    DEFAULT_LATENCY_TRACING,
+    DEFAULT_LOAD_MANAGEMENT,
+    DEFAULT_SURPLUS_CHARGING,
     DOMAIN,
+    SESSION_COMPLETED,
 )
+from .coordinator import PxChargerCoordinator
+from .cost import PxCostController
+from .loadmanagement import PxLoadController
+from .router import PxFleetRouter
+from .services import async_setup_services
+from .sessionlog import PxSessionLog, session_record
+from .statistics import PxSessionStatistics
+from .surplus import PxSurplusController
+from .tracing import PxLatencyTracer
 
 PLATFORMS: list[str] = [
     "binary_sensor",
@@ -26,56 +40,97 @@ PLATFORMS: list[str] = [
 
 _LOGGER = logging.getLogger(__name__)
 
-SERVICE_SCHEMA_SET_CONFIG_KEY = vol.Schema(
-    {
-        vol.Required(ATTR_SERIAL_NUMBER): cv.string,
-        vol.Required(ATTR_KEY): cv.string,
-        vol.Required(ATTR_VALUE): cv.string,
-    }
-)
-
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up pulsatrix (MQTT) from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+
+    # All chargers sharing a topic prefix share one wildcard subscription
+    routers: dict[str, PxFleetRouter] = hass.data.setdefault(DATA_ROUTERS, {})
+    topic_prefix = entry.data[CONF_TOPIC_PREFIX]
+    if (router := routers.get(topic_prefix)) is None:
+        router = routers[topic_prefix] = PxFleetRouter(hass, topic_prefix)
+
+    coordinator = PxChargerCoordinator(hass, entry, router)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    # Serial number index for the services
+    hass.data.setdefault(DATA_CHARGERS, {})[coordinator.serial_number] = coordinator
+    await coordinator.async_start()
+
+    session_log: PxSessionLog = hass.data[DATA_SESSION_LOG]
+    session_statistics = coordinator.session_statistics = PxSessionStatistics(
+        hass, coordinator.serial_number, session_log
+    )
+
+    @callback
+    def log_session(transition: str, event_data: dict, data: dict) -> None:
+        if transition != SESSION_COMPLETED:
+            return
+        record = session_record(coordinator.serial_number, data, event_data["energy"])
+        session_log.async_add(record)
+        if "recorder" in hass.config.components:
+            # Only the hours of the session are imported
+            hass.async_create_task(session_statistics.async_add(record))
+
+    entry.async_on_unload(coordinator.sessions.async_add_listener(log_session))
+    entry.async_on_unload(session_log.async_flush)
+
+    if entry.options.get(CONF_LOAD_MANAGEMENT, DEFAULT_LOAD_MANAGEMENT):
+        controller = coordinator.load_controller = PxLoadController(
+            hass, coordinator, entry
+        )
+        await controller.async_start()
+        entry.async_on_unload(controller.async_stop)
+
+    if entry.options.get(CONF_SURPLUS_CHARGING, DEFAULT_SURPLUS_CHARGING):
+        surplus_controller = coordinator.surplus_controller = PxSurplusController(
+            hass, coordinator, entry
+        )
+        await surplus_controller.async_start()
+        entry.async_on_unload(surplus_controller.async_stop)
+
+    if entry.options.get(CONF_TARIFF):
+        cost_controller = coordinator.cost_controller = PxCostController(
+            hass, coordinator, entry
+        )
+        await cost_controller.async_start()
+        entry.async_on_unload(cost_controller.async_stop)
+
+    if entry.options.get(CONF_LATENCY_TRACING, DEFAULT_LATENCY_TRACING):
+        tracer = coordinator.tracer = PxLatencyTracer(hass, coordinator)
+        await tracer.async_start()
+        entry.async_on_unload(tracer.async_stop)
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator: PxChargerCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_CHARGERS].pop(coordinator.serial_number, None)
+        # The router drops its wildcard subscription with the last handler,
+        # it is kept so a reload of the entry can reuse it
+        coordinator.async_shutdown()
 
     return unload_ok
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up integration."""
+    session_log = hass.data[DATA_SESSION_LOG] = PxSessionLog(hass)
+    await session_log.async_load()
 
-    @callback
-    async def set_config_key_service(call: ServiceCall) -> None:
-        serial_number = call.data.get("serial_number")
-        key = call.data.get("key")
-        # @FIXME: Retrieve the topic_prefix from config_entry
-        topic = f"{DEFAULT_TOPIC_PREFIX}/{serial_number}/{key}/set"
-        value = call.data.get("value")
-
-        if not value.isnumeric():
-            if value in ["true", "True"]:
-                value = "true"
-            elif value in ["false", "False"]:
-                value = "false"
-            else:
-                value = f'"{value}"'
-
-        await mqtt.async_publish(hass, topic, value)
-
-    hass.services.async_register(
-        DOMAIN,
-        "set_config_key",
-        set_config_key_service,
-        schema=SERVICE_SCHEMA_SET_CONFIG_KEY,
-    )
+    async_setup_services(hass)
 
     return True
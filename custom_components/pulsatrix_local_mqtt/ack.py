@@ -0,0 +1,149 @@
+"""Acknowledgement of the limits published to a pulsatrix charger."""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONF_LIMIT_RETRIES, DEFAULT_LIMIT_RETRIES
+from .definitions.number import PxChargerNumberEntityDescription
+from .metrics import PxMetricSource
+from .sampling import PxHistogram
+
+if TYPE_CHECKING:
+    from .coordinator import PxChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for the first acknowledgement, doubled with every retry
+ACK_TIMEOUT = 2.0
+ACK_RETRIES = 3
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PxPendingPublish:
+    """A published limit waiting for its acknowledgement."""
+
+    __slots__ = ("value", "payload", "sent", "attempts", "echoes", "cancel_retry")
+
+    def __init__(self, value: float, payload: str) -> None:
+        """Initialize the pending publish."""
+        self.value = value
+        self.payload = payload
+        self.sent = time.perf_counter()
+        self.attempts = 1
+        # Broker echoes of the attempts still to be received
+        self.echoes = 0
+        self.cancel_retry: CALLBACK_TYPE | None = None
+
+
+class PxAckTracker(PxMetricSource):
+    """Match published limits with the values the charger reports back.
+
+    The limits are read back from the topics they are published to, so the
+    broker delivers every publish back to our own subscription first. These
+    echoes are skipped, one per attempt, a publish is acknowledged by the
+    next equal value the charger reports after them. A newer publish of the
+    same limit replaces the pending one.
+
+    Retries are opt-in and only made once the charger has acknowledged a
+    publish, a charger that never reports limits back gets every limit
+    published once. Without an acknowledgement within the timeout the
+    payload is published again then, with the timeout doubling on every
+    attempt, until the retries are used up.
+    """
+
+    def __init__(self, coordinator: PxChargerCoordinator) -> None:
+        """Initialize the tracker."""
+        super().__init__()
+        self.coordinator = coordinator
+        self.histogram = PxHistogram(LATENCY_BUCKETS)
+        self.latency: float | None = None
+        self.retries = 0
+        self.failures = 0
+        self.retry = coordinator.config_entry.options.get(
+            CONF_LIMIT_RETRIES, DEFAULT_LIMIT_RETRIES
+        )
+        # The charger reported a published limit back at least once
+        self.confirmed = False
+
+        self._pending: dict[str, PxPendingPublish] = {}
+
+    async def async_publish(
+        self, description: PxChargerNumberEntityDescription, value: float, payload: str
+    ) -> None:
+        """Publish a limit and wait for its acknowledgement."""
+        self._async_cancel(description.key)
+        pending = self._pending[description.key] = PxPendingPublish(value, payload)
+        await self._async_send(description, pending)
+
+    async def _async_send(
+        self, description: PxChargerNumberEntityDescription, pending: PxPendingPublish
+    ) -> None:
+        """Publish the payload and schedule the retry."""
+        delay = ACK_TIMEOUT * 2 ** (pending.attempts - 1)
+
+        async def retry(_now) -> None:
+            pending.cancel_retry = None
+            if self._pending.get(description.key) is not pending:
+                return
+            if pending.attempts > ACK_RETRIES:
+                del self._pending[description.key]
+                self.failures += 1
+                _LOGGER.warning(
+                    "%s was not acknowledged after %d attempts",
+                    self.coordinator.topic(description.topic),
+                    pending.attempts,
+                )
+                self._async_update_metrics()
+                return
+            pending.attempts += 1
+            self.retries += 1
+            await self._async_send(description, pending)
+
+        if self.retry and self.confirmed:
+            pending.cancel_retry = async_call_later(
+                self.coordinator.hass, delay, retry
+            )
+        pending.echoes += 1
+        await mqtt.async_publish(
+            self.coordinator.hass,
+            self.coordinator.topic(description.topic),
+            pending.payload,
+        )
+
+    @callback
+    def async_value_received(self, key: str, value: float) -> None:
+        """Acknowledge the pending publish of a limit read back with its value."""
+        pending = self._pending.get(key)
+        if pending is None or not math.isclose(value, pending.value, abs_tol=1e-6):
+            return
+        if pending.echoes:
+            # Our own publish delivered back by the broker
+            pending.echoes -= 1
+            return
+
+        self._async_cancel(key)
+        self.confirmed = True
+        # Latency of the first publish, retries included
+        self.latency = round((time.perf_counter() - pending.sent) * 1000, 1)
+        self.histogram.add(self.latency)
+        self._async_update_metrics()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop waiting for acknowledgements."""
+        for key in tuple(self._pending):
+            self._async_cancel(key)
+
+    @callback
+    def _async_cancel(self, key: str) -> None:
+        """Drop the pending publish of a limit."""
+        pending = self._pending.pop(key, None)
+        if pending is not None and pending.cancel_retry is not None:
+            pending.cancel_retry()
@@ -2,10 +2,12 @@
 import logging
 
 from homeassistant import config_entries, core
-from homeassistant.components import mqtt
 from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.const import STATE_OFF, STATE_ON
 from homeassistant.core import callback
 
+from .const import DOMAIN
+from .coordinator import PxChargerCoordinator
 from .definitions.binary_sensor import (
     BINARY_SENSORS,
     PxChargerBinarySensorEntityDescription,
@@ -21,8 +23,9 @@ async def async_setup_entry(
         async_add_entities,
 ):
     """Config entry setup."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
     async_add_entities(
-        PxChargerBinarySensor(config_entry, description)
+        PxChargerBinarySensor(coordinator, config_entry, description)
         for description in BINARY_SENSORS
         if not description.disabled
     )
@@ -35,13 +38,14 @@ class PxChargerBinarySensor(PxChargerEntity, BinarySensorEntity):
 
     def __init__(
         self,
+        coordinator: PxChargerCoordinator,
         config_entry: config_entries.ConfigEntry,
         description: PxChargerBinarySensorEntityDescription,
     ) -> None:
         """Initialize the binary sensor."""
         self.entity_description = description
 
-        super().__init__(config_entry, description)
+        super().__init__(coordinator, config_entry, description)
 
     @property
     def available(self):
@@ -50,26 +54,45 @@ class PxChargerBinarySensor(PxChargerEntity, BinarySensorEntity):
         """Return True if entity is available."""
         return self._attr_is_on is not None
 
+    @property
+    def extra_state_attributes(self):
+        """Return entity specific state attributes."""
+        return self._restored_attributes(None)
+
+    def _state_snapshot(self):
+        """Return the values that make up the written state."""
+        return (self._attr_is_on,)
+
     async def async_added_to_hass(self):
         if self.entity_description.initial_value is not None:
             self._attr_is_on = self.entity_description.initial_value
 
+        if (last_state := await self.async_get_last_state()) is not None:
+            if last_state.state in (STATE_ON, STATE_OFF):
+                self._attr_is_on = last_state.state == STATE_ON
+                self._restored = True
+
         """Subscribe to MQTT events."""
         @callback
-        def message_received(message):
-            """Handle new MQTT messages."""
+        def message_received(value, raw):
+            """Handle a value extracted from an MQTT payload."""
             if self.entity_description.state is not None:
-                self._attr_is_on = self.entity_description.state(
-                    message.payload, self.entity_description.attribute
-                )
+                self._attr_is_on = value
             else:
-                if message.payload == "true":
+                if value is True:
                     self._attr_is_on = True
-                elif message.payload == "false":
+                elif value is False:
                     self._attr_is_on = False
                 else:
                     self._attr_is_on = None
 
-            self.async_write_ha_state()
+            self.async_write_ha_state_if_changed()
 
-        await mqtt.async_subscribe(self.hass, self._topic, message_received, 1)
+        self._stats = self.coordinator.async_get_topic_stats(
+            self.entity_description.topic
+        )
+        self.async_on_remove(
+            await self.coordinator.async_subscribe_description(
+                self.entity_description, message_received
+            )
+        )
@@ -0,0 +1,42 @@
+"""Payload codecs for pulsatrix MQTT messages."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import json
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+PayloadDecoder = Callable[[bytes | str], Any]
+
+CODEC_JSON = "json"
+CODEC_ORJSON = "orjson"
+
+_DECODERS: dict[str, PayloadDecoder] = {CODEC_JSON: json.loads}
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    _LOGGER.debug("orjson is not available, falling back to json")
+else:
+    _DECODERS[CODEC_ORJSON] = orjson.loads
+
+
+def register_codec(name: str, decoder: PayloadDecoder) -> None:
+    """Register a decoder for another payload encoding.
+
+    The decoder receives the raw payload bytes and must raise a ValueError
+    for payloads it cannot decode.
+    """
+    _DECODERS[name] = decoder
+
+
+def get_decoder(name: str | None = None) -> PayloadDecoder:
+    """Return the decoder registered under name.
+
+    Without a name the fastest available JSON decoder is returned.
+    """
+    if name is None:
+        name = CODEC_ORJSON if CODEC_ORJSON in _DECODERS else CODEC_JSON
+    return _DECODERS[name]
@@ -5,13 +5,57 @@ import logging
 from typing import Any
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import config_validation as cv, selector
 import voluptuous as vol
 
-from .const import CONF_SERIAL_NUMBER, CONF_TOPIC_PREFIX, DEFAULT_TOPIC_PREFIX, DOMAIN
+from .const import (
+    CONF_DEADBAND_MAX_INTERVAL,
+    CONF_DEADBAND_PREFIX,
+    CONF_FALLBACK_TIMEOUT,
+    CONF_FORCE_REFRESH,
+    CONF_HYSTERESIS,
+    CONF_LATENCY_TRACING,
+    CONF_LIMIT_RETRIES,
+    CONF_LOAD_MANAGEMENT,
+    CONF_MAIN_FUSE,
+    CONF_MIN_DWELL,
+    CONF_NUMBER_DEBOUNCE,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SAMPLE_STATE,
+    CONF_SERIAL_NUMBER,
+    CONF_SURPLUS_CHARGING,
+    CONF_SURPLUS_INTERVAL,
+    CONF_SURPLUS_SENSOR,
+    CONF_SURPLUS_TARGET,
+    CONF_TARIFF,
+    CONF_TOPIC_PREFIX,
+    DEFAULT_DEADBAND_MAX_INTERVAL,
+    DEFAULT_FALLBACK_TIMEOUT,
+    DEFAULT_FORCE_REFRESH,
+    DEFAULT_HYSTERESIS,
+    DEFAULT_LATENCY_TRACING,
+    DEFAULT_LIMIT_RETRIES,
+    DEFAULT_LOAD_MANAGEMENT,
+    DEFAULT_MAIN_FUSE,
+    DEFAULT_MIN_DWELL,
+    DEFAULT_NUMBER_DEBOUNCE,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLE_STATE,
+    DEFAULT_SURPLUS_CHARGING,
+    DEFAULT_SURPLUS_INTERVAL,
+    DEFAULT_SURPLUS_TARGET,
+    DEFAULT_TARIFF,
+    DEFAULT_TOPIC_PREFIX,
+    DOMAIN,
+    SAMPLE_STATES,
+    SURPLUS_TARGET_AMPERAGE,
+    SURPLUS_TARGETS,
+)
+from .cost import PxTariff
+from .definitions.sensor import DEADBAND_DEFAULTS, PxDeadband
 
 try:
     # < HA 2022.8.0
@@ -31,6 +75,25 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+
+def validate_deadband(value: Any) -> str:
+    """Validate a deadband option like "0.5" or "1%"."""
+    try:
+        return str(PxDeadband.parse(cv.string(value)))
+    except ValueError as err:
+        raise vol.Invalid(f"Invalid deadband: {value}") from err
+
+
+def validate_tariff(value: Any) -> str:
+    """Validate a tariff option like "00:00=0.25, 07:00=0.35", empty disables it."""
+    if not (value := cv.string(value).strip()):
+        return ""
+    try:
+        return str(PxTariff.parse(value))
+    except ValueError as err:
+        raise vol.Invalid(f"Invalid tariff: {value}") from err
+
+
 class PlaceholderHub:
     """Placeholder class to make tests pass.
 
@@ -71,12 +134,29 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._serial_number = None
         self._topic_prefix = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_mqtt(self, discovery_info: MqttServiceInfo) -> FlowResult:
         """Handle a flow initialized by MQTT discovery."""
         subscribed_topic = discovery_info.subscribed_topic
 
         # Subscribed topic must be in sync with the manifest.json
-        assert subscribed_topic in ["pulsatrix/secc/+/tx/status", "pulsatrix/secc/+/meter/fiscal"]
+        assert subscribed_topic in [
+            "pulsatrix/secc/+/tx/status",
+            "pulsatrix/secc/+/meter/fiscal",
+            "pulsatrix/secc/+/meter/grid",
+            "pulsatrix/secc/+/charging/status",
+            "pulsatrix/secc/+/chargingPoint/status",
+            "pulsatrix/secc/+/charging/amperageLimit",
+            "pulsatrix/secc/+/charging/powerLimit",
+            "pulsatrix/secc/+/charging/limitTimeout",
+        ]
 
         # Example topic: /pulsatrix/072246/var
         topic = discovery_info.topic
@@ -140,6 +220,145 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a pulsatrix (MQTT) config entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors = {}
+        if user_input is not None:
+            if (
+                user_input.get(CONF_LOAD_MANAGEMENT)
+                and user_input.get(CONF_SURPLUS_CHARGING)
+                and user_input.get(CONF_SURPLUS_TARGET) == SURPLUS_TARGET_AMPERAGE
+            ):
+                # Both would control the amperage limit, the charger uses
+                # the minimum of the amperage and the power limit
+                errors[CONF_SURPLUS_TARGET] = "surplus_target_conflict"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = {
+            vol.Optional(
+                CONF_FORCE_REFRESH,
+                default=options.get(CONF_FORCE_REFRESH, DEFAULT_FORCE_REFRESH),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+        for group, deadband in DEADBAND_DEFAULTS.items():
+            key = f"{CONF_DEADBAND_PREFIX}{group}"
+            schema[
+                vol.Optional(key, default=options.get(key, str(deadband)))
+            ] = validate_deadband
+        schema[
+            vol.Optional(
+                CONF_DEADBAND_MAX_INTERVAL,
+                default=options.get(
+                    CONF_DEADBAND_MAX_INTERVAL, DEFAULT_DEADBAND_MAX_INTERVAL
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_SAMPLE_INTERVAL,
+                default=options.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_SAMPLE_STATE,
+                default=options.get(CONF_SAMPLE_STATE, DEFAULT_SAMPLE_STATE),
+            )
+        ] = vol.In(SAMPLE_STATES)
+        schema[
+            vol.Optional(
+                CONF_NUMBER_DEBOUNCE,
+                default=options.get(CONF_NUMBER_DEBOUNCE, DEFAULT_NUMBER_DEBOUNCE),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=10000))
+        schema[
+            vol.Optional(
+                CONF_LIMIT_RETRIES,
+                default=options.get(CONF_LIMIT_RETRIES, DEFAULT_LIMIT_RETRIES),
+            )
+        ] = cv.boolean
+        schema[
+            vol.Optional(
+                CONF_LOAD_MANAGEMENT,
+                default=options.get(CONF_LOAD_MANAGEMENT, DEFAULT_LOAD_MANAGEMENT),
+            )
+        ] = cv.boolean
+        schema[
+            vol.Optional(
+                CONF_MAIN_FUSE,
+                default=options.get(CONF_MAIN_FUSE, DEFAULT_MAIN_FUSE),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=6))
+        schema[
+            vol.Optional(
+                CONF_HYSTERESIS,
+                default=options.get(CONF_HYSTERESIS, DEFAULT_HYSTERESIS),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_MIN_DWELL,
+                default=options.get(CONF_MIN_DWELL, DEFAULT_MIN_DWELL),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_FALLBACK_TIMEOUT,
+                default=options.get(CONF_FALLBACK_TIMEOUT, DEFAULT_FALLBACK_TIMEOUT),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=60))
+        schema[
+            vol.Optional(
+                CONF_SURPLUS_CHARGING,
+                default=options.get(CONF_SURPLUS_CHARGING, DEFAULT_SURPLUS_CHARGING),
+            )
+        ] = cv.boolean
+        schema[
+            vol.Optional(
+                CONF_SURPLUS_SENSOR,
+                description={"suggested_value": options.get(CONF_SURPLUS_SENSOR)},
+            )
+        ] = selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor"))
+        schema[
+            vol.Optional(
+                CONF_SURPLUS_TARGET,
+                default=options.get(CONF_SURPLUS_TARGET, DEFAULT_SURPLUS_TARGET),
+            )
+        ] = vol.In(SURPLUS_TARGETS)
+        schema[
+            vol.Optional(
+                CONF_SURPLUS_INTERVAL,
+                default=options.get(CONF_SURPLUS_INTERVAL, DEFAULT_SURPLUS_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_TARIFF, default=options.get(CONF_TARIFF, DEFAULT_TARIFF)
+            )
+        ] = validate_tariff
+        schema[
+            vol.Optional(
+                CONF_LATENCY_TRACING,
+                default=options.get(CONF_LATENCY_TRACING, DEFAULT_LATENCY_TRACING),
+            )
+        ] = cv.boolean
+
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(schema), errors=errors
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -2,14 +2,79 @@
 
 DOMAIN = "pulsatrix_local_mqtt"
 
+DATA_ROUTERS = f"{DOMAIN}_routers"
+DATA_CHARGERS = f"{DOMAIN}_chargers"
+DATA_SESSION_LOG = f"{DOMAIN}_session_log"
+
+EVENT_SESSION = f"{DOMAIN}_session"
+EVENT_PROFILE = f"{DOMAIN}_profile"
+SESSION_STARTED = "started"
+SESSION_SUSPENDED = "suspended"
+SESSION_RESUMED = "resumed"
+SESSION_COMPLETED = "completed"
+SESSION_FAILED = "failed"
+
 ATTR_SERIAL_NUMBER = "serial_number"
 ATTR_KEY = "key"
 ATTR_VALUE = "value"
+ATTR_ITEMS = "items"
+ATTR_SERIAL_NUMBERS = "serial_numbers"
+ATTR_CONFIG = "config"
+ATTR_FORCE = "force"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESTORED = "restored"
+ATTR_SOURCE = "source"
+ATTR_SECONDS = "seconds"
 
 CONF_SERIAL_NUMBER = "serial_number"
 CONF_TOPIC_PREFIX = "topic_prefix"
+CONF_FORCE_REFRESH = "force_refresh"
+CONF_DEADBAND_MAX_INTERVAL = "deadband_max_interval"
+CONF_DEADBAND_PREFIX = "deadband_"
+CONF_SAMPLE_INTERVAL = "sample_interval"
+CONF_SAMPLE_STATE = "sample_state"
+CONF_LOAD_MANAGEMENT = "load_management"
+CONF_MAIN_FUSE = "main_fuse"
+CONF_HYSTERESIS = "hysteresis"
+CONF_MIN_DWELL = "min_dwell"
+CONF_FALLBACK_TIMEOUT = "fallback_timeout"
+CONF_NUMBER_DEBOUNCE = "number_debounce"
+CONF_LIMIT_RETRIES = "limit_retries"
+CONF_SURPLUS_CHARGING = "surplus_charging"
+CONF_SURPLUS_SENSOR = "surplus_sensor"
+CONF_SURPLUS_TARGET = "surplus_target"
+CONF_SURPLUS_INTERVAL = "surplus_interval"
+CONF_TARIFF = "tariff"
+CONF_LATENCY_TRACING = "latency_tracing"
 
 DEFAULT_TOPIC_PREFIX = "/pulsatrix/secc"
+DEFAULT_FORCE_REFRESH = 0
+DEFAULT_DEADBAND_MAX_INTERVAL = 300
+DEFAULT_SAMPLE_INTERVAL = 0
+DEFAULT_SAMPLE_STATE = "last"
+DEFAULT_LOAD_MANAGEMENT = False
+DEFAULT_MAIN_FUSE = 25.0
+DEFAULT_HYSTERESIS = 1.0
+DEFAULT_MIN_DWELL = 30
+DEFAULT_FALLBACK_TIMEOUT = 5
+DEFAULT_NUMBER_DEBOUNCE = 300
+DEFAULT_LIMIT_RETRIES = False
+DEFAULT_SURPLUS_CHARGING = False
+DEFAULT_SURPLUS_TARGET = "power"
+DEFAULT_SURPLUS_INTERVAL = 30
+DEFAULT_TARIFF = ""
+DEFAULT_LATENCY_TRACING = False
+
+SAMPLE_STATES = ["last", "mean"]
+
+SURPLUS_TARGET_AMPERAGE = "amperage"
+SURPLUS_TARGET_POWER = "power"
+SURPLUS_TARGETS = [SURPLUS_TARGET_POWER, SURPLUS_TARGET_AMPERAGE]
+
+STATISTICS_SESSIONS = "sessions"
+STATISTICS_METER_REGISTER = "meter_register"
+STATISTICS_SOURCES = [STATISTICS_SESSIONS, STATISTICS_METER_REGISTER]
 
 DEVICE_INFO_MANUFACTURER = "pulsatrix"
 DEVICE_INFO_MODEL = "esp32-openEVCC-303"
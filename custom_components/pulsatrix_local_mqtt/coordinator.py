@@ -0,0 +1,334 @@
+"""Per-charger MQTT topic coordinator for pulsatrix."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+import logging
+import time
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .ack import PxAckTracker
+from .codec import get_decoder
+from .const import (
+    CONF_SERIAL_NUMBER,
+    CONF_TOPIC_PREFIX,
+    DATA_CHARGERS,
+)
+from .definitions import PxChargerEntityDescription
+from .definitions.binary_sensor import BINARY_SENSORS
+from .definitions.number import NUMBERS, PxChargerNumberEntityDescription
+from .definitions.sensor import SENSORS
+from .join import PxChargerJoin
+from .plan import PlanEntry, compile_plan, run_plan
+from .router import PxFleetRouter
+from .session import PxSessionTracker
+from .snapshot import PxConfigSnapshot
+from .topicstats import PxTopicStats
+
+_LOGGER = logging.getLogger(__name__)
+
+PayloadListener = Callable[[Any], None]
+ValueListener = Callable[[Any, Any], None]
+
+
+@callback
+def async_get_coordinator(
+    hass: HomeAssistant, serial_number: str
+) -> PxChargerCoordinator | None:
+    """Return the coordinator of the loaded charger with a serial number."""
+    return hass.data.get(DATA_CHARGERS, {}).get(serial_number)
+
+
+class PxTopicSubscription:
+    """Listeners and active plan entries of a single topic."""
+
+    __slots__ = ("listeners", "active", "entries", "unsubscribe", "stats")
+
+    def __init__(self, stats: PxTopicStats) -> None:
+        """Initialize the topic subscription."""
+        self.stats = stats
+        self.listeners: list[PayloadListener] = []
+        self.active: dict[tuple[str, str], PlanEntry] = {}
+        self.entries: tuple[PlanEntry, ...] = ()
+        self.unsubscribe: CALLBACK_TYPE | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.listeners or self.active)
+
+
+class PxChargerCoordinator:
+    """Share one MQTT subscription and one payload decode per topic.
+
+    Entities register a listener for their description. The coordinator
+    registers each topic once with the fleet router, decodes every payload
+    once and runs the compiled extraction plan of the topic in a single
+    pass, handing each entity its extracted value. Listeners interested in
+    the whole decoded payload can register for a sub-topic directly.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: config_entries.ConfigEntry,
+        router: PxFleetRouter,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.config_entry = config_entry
+        self.router = router
+        self.topic_prefix = config_entry.data[CONF_TOPIC_PREFIX]
+        self.serial_number = config_entry.data[CONF_SERIAL_NUMBER]
+
+        self._decode = get_decoder()
+        self._plan = compile_plan((*SENSORS, *BINARY_SENSORS, *NUMBERS))
+        self._topics: dict[str, PxTopicSubscription] = {}
+        # Kept across subscriptions, for the diagnostics
+        self.topic_stats: dict[str, PxTopicStats] = {}
+        self.join = PxChargerJoin(self)
+        self.load_controller = None
+        self.surplus_controller = None
+        self.cost_controller = None
+        self.session_statistics = None
+        self.tracer = None
+        # The message handlers are wrapped by the profile service
+        self.profiling = False
+
+        # Last value published or read back per number key
+        self.setpoints: dict[str, float] = {}
+        self._setpoint_listeners: dict[str, list[Callable[[float], None]]] = {}
+        self.acks = PxAckTracker(self)
+        self.config = PxConfigSnapshot()
+        self.sessions = PxSessionTracker(self)
+        self._unsubscribe_config: CALLBACK_TYPE | None = None
+
+    def topic(self, sub_topic: str) -> str:
+        """Return the full MQTT topic for a sub-topic of this charger."""
+        return f"{self.topic_prefix}/{self.serial_number}/{sub_topic}"
+
+    async def async_subscribe(
+        self, sub_topic: str, listener: PayloadListener
+    ) -> CALLBACK_TYPE:
+        """Register a listener for the decoded payloads of a sub-topic.
+
+        Returns a callable that removes the listener again.
+        """
+        subscription = await self._async_get_subscription(sub_topic)
+        subscription.listeners.append(listener)
+        self._async_replay(sub_topic, listeners=(listener,))
+
+        @callback
+        def remove_listener() -> None:
+            subscription.listeners.remove(listener)
+            self._async_release(sub_topic, subscription)
+
+        return remove_listener
+
+    async def async_subscribe_description(
+        self, description: PxChargerEntityDescription, listener: ValueListener
+    ) -> CALLBACK_TYPE:
+        """Register a listener for the values extracted for a description.
+
+        The listener is called with the extracted value and the raw value.
+        Returns a callable that removes the listener again.
+        """
+        sub_topic = description.topic
+        plan_key = (description.domain, description.key)
+        subscription = await self._async_get_subscription(sub_topic)
+
+        entry = subscription.active.get(plan_key)
+        if entry is None:
+            entry = subscription.active[plan_key] = (
+                *self._plan[sub_topic][plan_key],
+                [listener],
+            )
+            subscription.entries = tuple(subscription.active.values())
+        else:
+            entry[-1].append(listener)
+        self._async_replay(
+            sub_topic, entries=((*self._plan[sub_topic][plan_key], [listener]),)
+        )
+
+        @callback
+        def remove_listener() -> None:
+            listeners = entry[-1]
+            listeners.remove(listener)
+            if not listeners:
+                del subscription.active[plan_key]
+                subscription.entries = tuple(subscription.active.values())
+            self._async_release(sub_topic, subscription)
+
+        return remove_listener
+
+    async def async_start(self) -> None:
+        """Follow the sessions, limits and config keys of the charger."""
+        await self.sessions.async_start()
+        for description in NUMBERS:
+            await self.async_subscribe_description(
+                description, partial(self._async_number_received, description)
+            )
+        # Registered last, the observer only takes the topics without handler
+        self._unsubscribe_config = await self.router.async_register_observer(
+            self.serial_number, self.config.async_message_received
+        )
+
+    @callback
+    def _async_number_received(
+        self, description: PxChargerNumberEntityDescription, value: Any, raw: Any
+    ) -> None:
+        """Take over a limit reported by the charger and acknowledge it."""
+        parser = description.value_parser or float
+        try:
+            value = parser(value)
+        except (TypeError, ValueError):
+            _LOGGER.debug("Unable to parse %s from %s", description.key, value)
+            return
+
+        self.acks.async_value_received(description.key, value)
+        if self.setpoints.get(description.key) != value:
+            self._async_set_setpoint(description.key, value)
+
+    async def async_publish_number(
+        self, description: PxChargerNumberEntityDescription, value: float
+    ) -> None:
+        """Publish a new value of a number and notify its setpoint listeners.
+
+        This is the single publish path of the number entities and the
+        integration's controllers. The publish is retried until the charger
+        reports the value back.
+        """
+        if description.value_formatter:
+            payload = description.value_formatter(value)
+        else:
+            payload = str(value)
+
+        await self.acks.async_publish(description, value, payload)
+        self._async_set_setpoint(description.key, value)
+
+    @callback
+    def _async_set_setpoint(self, key: str, value: float) -> None:
+        """Store the value of a number and notify its setpoint listeners."""
+        self.setpoints[key] = value
+        for listener in tuple(self._setpoint_listeners.get(key, ())):
+            listener(value)
+
+    @callback
+    def async_subscribe_setpoint(
+        self, key: str, listener: Callable[[float], None]
+    ) -> CALLBACK_TYPE:
+        """Register a listener for the values published for a number key.
+
+        Returns a callable that removes the listener again.
+        """
+        listeners = self._setpoint_listeners.setdefault(key, [])
+        listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(listener)
+
+        return remove_listener
+
+    async def _async_get_subscription(self, sub_topic: str) -> PxTopicSubscription:
+        """Return the subscription of a sub-topic, registering it if needed."""
+        subscription = self._topics.get(sub_topic)
+        if subscription is not None:
+            return subscription
+
+        subscription = self._topics[sub_topic] = PxTopicSubscription(
+            self.async_get_topic_stats(sub_topic)
+        )
+        subscription.unsubscribe = await self.router.async_register(
+            self.serial_number,
+            sub_topic,
+            partial(self._async_dispatch, subscription),
+        )
+        return subscription
+
+    @callback
+    def _async_replay(
+        self,
+        sub_topic: str,
+        entries: tuple[PlanEntry, ...] = (),
+        listeners: tuple[PayloadListener, ...] = (),
+    ) -> None:
+        """Hand the retained payload of a sub-topic to new listeners only.
+
+        The broker delivered it before the listeners were added, the listeners
+        already registered have handled it when it was received.
+        """
+        payload = self.router.async_get_retained(self.serial_number, sub_topic)
+        if payload is None:
+            return
+        try:
+            data = self._decode(payload)
+        except ValueError:
+            data = payload.decode("utf-8", errors="replace")
+        if entries:
+            run_plan(entries, data)
+        for listener in listeners:
+            listener(data)
+
+    @callback
+    def async_get_topic_stats(self, sub_topic: str) -> PxTopicStats:
+        """Return the message counters of a sub-topic."""
+        if (stats := self.topic_stats.get(sub_topic)) is None:
+            stats = self.topic_stats[sub_topic] = PxTopicStats()
+        return stats
+
+    @callback
+    def _async_release(
+        self, sub_topic: str, subscription: PxTopicSubscription
+    ) -> None:
+        """Drop the MQTT subscription once a topic has no listeners left."""
+        if subscription or self._topics.get(sub_topic) is not subscription:
+            return
+        del self._topics[sub_topic]
+        if subscription.unsubscribe is not None:
+            subscription.unsubscribe()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Release the router registrations of all topics."""
+        self.acks.async_shutdown()
+        self.sessions.async_stop()
+        if self._unsubscribe_config is not None:
+            self._unsubscribe_config()
+            self._unsubscribe_config = None
+        for subscription in self._topics.values():
+            if subscription.unsubscribe is not None:
+                subscription.unsubscribe()
+        self._topics.clear()
+
+    @callback
+    def _async_dispatch(
+        self, subscription: PxTopicSubscription, payload: bytes
+    ) -> None:
+        """Decode a payload and hand it to every listener of the topic."""
+        received = time.perf_counter()
+        stats = subscription.stats
+        stats.message_received(received)
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.received = received
+        try:
+            try:
+                data = self._decode(payload)
+            except ValueError:
+                # Plain (non JSON) payloads are passed on as text, all topics
+                # routed here are expected to carry JSON though
+                data = payload.decode("utf-8", errors="replace")
+                stats.parse_errors += 1
+            decoded = time.perf_counter()
+
+            if subscription.entries:
+                run_plan(subscription.entries, data)
+            stats.message_timed(received, decoded, time.perf_counter())
+            for listener in tuple(subscription.listeners):
+                listener(data)
+        finally:
+            # A failing listener must not leave the stamp for later writes
+            if tracer is not None:
+                tracer.received = None
@@ -0,0 +1,204 @@
+"""Charging cost of pulsatrix chargers with a time-of-use tariff."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import CONF_TARIFF, DOMAIN, SESSION_STARTED
+from .coordinator import PxChargerCoordinator
+from .metrics import PxMetricSource
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds after the first change the totals are saved at the latest
+SAVE_DELAY = 60
+
+
+class PxTariff:
+    """Time-of-use tariff compiled into sorted boundaries.
+
+    Parsed from ``"HH:MM=price"`` pairs, e.g. ``"00:00=0.25, 07:00=0.35"``.
+    A price applies from its time until the next one, the last price of the
+    day wraps around midnight up to the first one.
+    """
+
+    __slots__ = ("boundaries", "prices")
+
+    def __init__(self, boundaries: tuple[int, ...], prices: tuple[float, ...]) -> None:
+        """Initialize the tariff with ascending seconds of the day."""
+        self.boundaries = boundaries
+        self.prices = prices
+
+    @classmethod
+    def parse(cls, value: str) -> PxTariff:
+        """Parse a tariff, raise ValueError if it is invalid."""
+        segments: dict[int, float] = {}
+        for part in value.split(","):
+            start, separator, price = part.partition("=")
+            hours, _, minutes = start.strip().partition(":")
+            seconds = int(hours) * 3600 + int(minutes or 0) * 60
+            if not separator or not 0 <= seconds < 86400 or seconds in segments:
+                raise ValueError(f"Invalid tariff segment: {part.strip()}")
+            segments[seconds] = float(price)
+        boundaries = sorted(segments)
+        if boundaries[0]:
+            segments[0] = segments[boundaries[-1]]
+            boundaries.insert(0, 0)
+        return cls(tuple(boundaries), tuple(segments[b] for b in boundaries))
+
+    def __str__(self) -> str:
+        return ", ".join(
+            f"{boundary // 3600:02}:{boundary % 3600 // 60:02}={price:g}"
+            for boundary, price in zip(self.boundaries, self.prices)
+        )
+
+    def segment(self, seconds: float) -> tuple[float, int]:
+        """Return the price at a second of the day and when it ends."""
+        index = bisect_right(self.boundaries, seconds) - 1
+        end = (
+            self.boundaries[index + 1] if index + 1 < len(self.boundaries) else 86400
+        )
+        return self.prices[index], end
+
+
+class PxCostController(PxMetricSource):
+    """Price the energy charged with a time-of-use tariff.
+
+    Every meter/fiscal reading adds the energy imported since the previous
+    one, priced at the current tariff segment, to the session and monthly
+    totals. The price is only looked up again once the current segment
+    ends, so a reading costs a comparison and a multiplication. The totals
+    are kept in a store and survive restarts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: PxChargerCoordinator,
+        config_entry: config_entries.ConfigEntry,
+    ) -> None:
+        """Initialize the controller."""
+        super().__init__()
+        self.hass = hass
+        self.coordinator = coordinator
+        self.tariff = PxTariff.parse(config_entry.options[CONF_TARIFF])
+
+        self.price: float | None = None
+        self.session_cost = 0.0
+        self.monthly_cost = 0.0
+        self.month: str | None = None
+
+        self._energy: float | None = None
+        self._segment_end = 0.0
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}_cost_{coordinator.serial_number}"
+        )
+        self._save_pending = False
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+
+    async def async_start(self) -> None:
+        """Restore the totals and follow the meter and the sessions."""
+        if (data := await self._store.async_load()) is not None:
+            self.session_cost = data["session_cost"]
+            self.monthly_cost = data["monthly_cost"]
+            self.month = data["month"]
+            self._energy = data["energy"]
+        self._unsubscribe.append(
+            self.coordinator.sessions.async_add_listener(self._async_transition)
+        )
+        self._unsubscribe.append(
+            await self.coordinator.async_subscribe(
+                "meter/fiscal", self._async_fiscal_received
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop pricing and save the totals."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        self._async_save_now()
+
+    def _data(self) -> dict[str, Any]:
+        """Return the totals to store."""
+        return {
+            "session_cost": self.session_cost,
+            "monthly_cost": self.monthly_cost,
+            "month": self.month,
+            "energy": self._energy,
+        }
+
+    def _pending_data(self) -> dict[str, Any]:
+        """Return the totals to store once the delayed save is due."""
+        self._save_pending = False
+        return self._data()
+
+    @callback
+    def _async_transition(self, transition: str, event_data: dict, data: dict) -> None:
+        """Start the session total over with a new session."""
+        if transition == SESSION_STARTED:
+            self.session_cost = 0.0
+        self._async_save_now()
+
+    @callback
+    def _async_fiscal_received(self, data: Any) -> None:
+        """Add the cost of the energy imported since the last reading."""
+        if not isinstance(data, dict):
+            return
+        try:
+            energy = float(data["energyImported"])
+        except (KeyError, TypeError, ValueError):
+            return
+        last_energy, self._energy = self._energy, energy
+        if last_energy is None or energy <= last_energy:
+            # The first reading or a meter reset only sets the baseline
+            return
+
+        now = dt_util.utcnow()
+        if now.timestamp() >= self._segment_end:
+            self._async_enter_segment(now)
+        cost = (energy - last_energy) * self.price
+        self.session_cost += cost
+        self.monthly_cost += cost
+        self._async_save()
+        self._async_update_metrics()
+
+    @callback
+    def _async_enter_segment(self, now: datetime) -> None:
+        """Look up the tariff segment of a point in time."""
+        local = dt_util.as_local(now)
+        midnight = dt_util.start_of_local_day(local)
+        self.price, end = self.tariff.segment((local - midnight).total_seconds())
+        self._segment_end = (midnight + timedelta(seconds=end)).timestamp()
+
+        month = local.strftime("%Y-%m")
+        if month != self.month:
+            self.month = month
+            self.monthly_cost = 0.0
+
+    @callback
+    def _async_save(self) -> None:
+        """Save the totals at most SAVE_DELAY seconds after the first change.
+
+        Every call of async_delay_save pushes the pending save back, with a
+        reading per second it would never be due. It is only called when no
+        save is pending.
+        """
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._pending_data, SAVE_DELAY)
+
+    @callback
+    def _async_save_now(self) -> None:
+        """Save the totals right away, replacing a pending save."""
+        self._save_pending = False
+        self.hass.async_create_task(self._store.async_save(self._data()))
@@ -1,9 +1,10 @@
 """Definitions for pulsatrix sensors exposed via MQTT."""
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 import logging
+from typing import Any
 
 from homeassistant.helpers.entity import EntityDescription
 
@@ -93,6 +94,44 @@ class PxChargerStatusCodes:
     }
 
 
+@dataclass(frozen=True)
+class PxExtraction:
+    """Declarative extractor.
+
+    The value at ``key`` (and ``index``) is either looked up in ``lookup`` or
+    converted to float, multiplied with ``scale`` and rounded to
+    ``precision``. Values missing from ``lookup`` are passed to ``missing`` or
+    kept as they are. Calling it extracts a single value, the extraction plan
+    compiles it into a step run inline for all entities of a topic.
+    """
+
+    scale: float | None = None
+    precision: int | None = None
+    lookup: Mapping[Any, Any] | None = None
+    missing: Callable[[Any], Any] | None = None
+
+    def __call__(self, data: Any, key: str, index: int = -1) -> Any:
+        """Extract the value at key (and index) from a decoded payload."""
+        try:
+            raw = data[key] if index < 0 else data[key][index]
+        except (IndexError, KeyError, TypeError):
+            return None
+        if raw is None:
+            return None
+        if self.lookup is not None:
+            try:
+                return self.lookup[raw]
+            except (KeyError, TypeError):
+                return raw if self.missing is None else self.missing(raw)
+        if self.scale is None:
+            return raw
+        try:
+            value = float(raw) * self.scale
+        except (TypeError, ValueError):
+            return None
+        return value if self.precision is None else round(value, self.precision)
+
+
 @dataclass
 class PxChargerEntityDescription(EntityDescription):
     """Generic entity description for pulsatrix."""
@@ -2,13 +2,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import json
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 from homeassistant.helpers.entity import EntityCategory
 
-from . import PxChargerEntityDescription
+from . import PxChargerEntityDescription, PxExtraction
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,28 +20,17 @@ class PxChargerBinarySensorEntityDescription(
     domain: str = "binary_sensor"
 
 
-def map_state_to_boolean(value, key) -> bool:
-    return json.loads(value)[key] == "CHARGING"
+def _false(value) -> bool:
+    return False
 
 
-def map_plug_lock_to_boolean(value, key) -> bool | None:
-    try:
-        return json.loads(value)[key] == True
-    except (KeyError, TypeError):
-        return None
-
-
-def map_connector_available(value, key) -> bool:
-    return json.loads(value)[key] == "Available"
-
-
-def map_connector_faulted(value, key) -> bool:
-    return json.loads(value)[key] == "Faulted"
-
-
-def map_vehicle_connected(value, key) -> bool:
-    status = json.loads(value)[key]
-    return status in ["B", "C", "D"]
+map_state_to_boolean = PxExtraction(lookup={"CHARGING": True}, missing=_false)
+map_plug_lock_to_boolean = PxExtraction(lookup={True: True}, missing=_false)
+map_connector_available = PxExtraction(lookup={"Available": True}, missing=_false)
+map_connector_faulted = PxExtraction(lookup={"Faulted": True}, missing=_false)
+map_vehicle_connected = PxExtraction(
+    lookup={"B": True, "C": True, "D": True}, missing=_false
+)
 
 
 BINARY_SENSORS: tuple[PxChargerBinarySensorEntityDescription, ...] = (
@@ -4,6 +4,7 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 import logging
+from typing import Any
 
 from homeassistant.components.number import NumberEntityDescription, NumberMode
 from homeassistant.const import UnitOfElectricCurrent, UnitOfPower, UnitOfTime, PERCENTAGE
@@ -20,12 +21,12 @@ class PxChargerNumberEntityDescription(
     """Number entity description for pulsatrix."""
 
     domain: str = "number"
-    native_value: float | None = None
     native_min_value: float = 0
     native_max_value: float = 100
     native_step: float = 1
     mode: NumberMode = NumberMode.AUTO
     value_formatter: Callable[[float], str] | None = None
+    value_parser: Callable[[Any], float] | None = None
 
 
 def format_float(value: float) -> str:
@@ -43,17 +44,27 @@ def format_minutes_to_ms(value: float) -> str:
     return str(int(value * 60000))
 
 
+def parse_float(data: Any) -> float:
+    """Parse a value reported by the charger, the inverse of format_float."""
+    return float(data)
+
+
+def parse_ms_to_minutes(data: Any) -> float:
+    """Convert milliseconds reported by the charger to minutes."""
+    return float(data) / 60000
+
+
 NUMBERS: tuple[PxChargerNumberEntityDescription, ...] = (
     PxChargerNumberEntityDescription(
         key="amperage_limit",
         topic="charging/amperageLimit",
         name="pulsatrix Amperage Limit",
-        native_value=16,
         native_min_value=6,
         native_max_value=32,
         native_step=0.5,
         mode=NumberMode.SLIDER,
         value_formatter=format_float,
+        value_parser=parse_float,
         icon="mdi:current-ac",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         entity_registry_enabled_default=True,
@@ -63,12 +74,12 @@ NUMBERS: tuple[PxChargerNumberEntityDescription, ...] = (
         key="power_limit",
         topic="charging/powerLimit",
         name="pulsatrix Power Limit",
-        native_value=11000,
         native_min_value=1380,  # ~6A * 230V
         native_max_value=22000,  # ~32A * 230V * 3 phases
         native_step=100,
         mode=NumberMode.BOX,
         value_formatter=format_int,
+        value_parser=parse_float,
         icon="mdi:flash",
         native_unit_of_measurement=UnitOfPower.WATT,
         entity_registry_enabled_default=True,
@@ -78,12 +89,12 @@ NUMBERS: tuple[PxChargerNumberEntityDescription, ...] = (
         key="limit_timeout",
         topic="charging/limitTimeout",
         name="pulsatrix Limit Timeout",
-        native_value=5,  # 5 minutes default
         native_min_value=1,   # 1 minute
         native_max_value=60,  # 1 hour
         native_step=1,  # 1 minute steps
         mode=NumberMode.SLIDER,
         value_formatter=format_minutes_to_ms,
+        value_parser=parse_ms_to_minutes,
         icon="mdi:timer-outline",
         native_unit_of_measurement=UnitOfTime.MINUTES,
         entity_registry_enabled_default=False,
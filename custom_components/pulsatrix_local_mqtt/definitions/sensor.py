@@ -1,9 +1,10 @@
 """Definitions for pulsatrix sensors exposed via MQTT."""
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
-import json
 import logging
+from typing import Any
 import pytz
 from datetime import datetime
 from homeassistant.components.sensor import (
@@ -12,112 +13,127 @@ from homeassistant.components.sensor import (
     SensorEntityDescription
 )
 from homeassistant.const import (
-   UnitOfEnergy,UnitOfPower,UnitOfFrequency,UnitOfElectricCurrent,UnitOfElectricPotential,UnitOfTime
+   PERCENTAGE,UnitOfEnergy,UnitOfPower,UnitOfFrequency,UnitOfElectricCurrent,UnitOfElectricPotential,UnitOfTime
 )
 from homeassistant.helpers.entity import EntityCategory
 
-from . import PxChargerEntityDescription, PxChargerStatusCodes
+from . import PxChargerEntityDescription, PxChargerStatusCodes, PxExtraction
+from ..join import (
+    INPUT_AMPERAGE,
+    INPUT_AMPERAGE_LIMIT,
+    INPUT_PHASES,
+    INPUT_VOLTAGE,
+    PxChargerJoin,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
-class PxChargerSensorEntityDescription(
-    PxChargerEntityDescription, SensorEntityDescription
-):
-    """Sensor entity description for pulsatrix."""
-    domain: str = "sensor"
+@dataclass(frozen=True)
+class PxDeadband:
+    """Band around the last written value in which changes are not written.
 
+    The band is either absolute (in the unit of the sensor) or relative (in
+    percent of the last written value).
+    """
 
-def extract_json_float(value, key, index) -> float | None:
-    try:
-        if index >= 0:
-            return round(float(json.loads(value)[key][index]), 2)
-        else:
-            return round(float(json.loads(value)[key]), 2)
-    except IndexError:
-        return None
+    value: float
+    relative: bool = False
 
+    @classmethod
+    def parse(cls, text: str) -> PxDeadband:
+        """Parse a deadband like "0.5" (absolute) or "1%" (relative)."""
+        text = text.strip()
+        relative = text.endswith("%")
+        value = float(text.rstrip("%"))
+        if value < 0:
+            raise ValueError("Deadband must not be negative")
+        return cls(value, relative)
 
-def extract_json_float_kilo(value, key, index) -> float | None:
-    try:
-        if index >= 0:
-            return round(float(json.loads(value)[key][index]) / 1000, 2)
-        else:
-            return round(float(json.loads(value)[key]) / 1000, 2)
-    except IndexError:
-        return None
+    def __str__(self) -> str:
+        return f"{self.value:g}%" if self.relative else f"{self.value:g}"
 
+    def scaled(self, factor: float) -> PxDeadband:
+        """Return the band converted to another unit, e.g. from kW to W."""
+        if self.relative or factor == 1:
+            return self
+        return PxDeadband(self.value * factor)
 
-def extract_energy(value, key, index) -> float | None:
-    try:
-        return round(float(json.loads(value)["lastMeterValue"]) - float(json.loads(value)["meterStart"]), 2)
-    except IndexError:
-        return None
+    def contains(self, reference: float, value: float) -> bool:
+        """Return True if value lies within the band around reference."""
+        band = abs(reference) * self.value / 100 if self.relative else self.value
+        return abs(value - reference) < band
 
 
-def extract_json_amperage_kilo_watts(value, key, index) -> float | None:
-    try:
-        if index >= 0:
-            return round((float(json.loads(value)[key][index]) * 3 * 238) / 1000, 2)
-        else:
-            return round((float(json.loads(value)[key]) * 3 * 238) / 1000, 2)
-    except IndexError:
-        return None
+DEADBAND_DEFAULTS: dict[str, PxDeadband] = {
+    "voltage": PxDeadband(0.5),
+    "frequency": PxDeadband(0.05),
+    "amperage": PxDeadband(0.1),
+    "power": PxDeadband(1, relative=True),
+}
 
 
-def extract_json(value, key, index) -> str | None:
-    try:
-        return json.loads(value)[key]
-    except IndexError:
-        return None
-
-
-def transform_code(value, key, index) -> str:
-    """Transform codes into a human readable string."""
-    _LOGGER.debug("transform_code" + json.loads(value)[key])
-    try:
-        return getattr(PxChargerStatusCodes, "states")[json.loads(value)[key]]
-    except KeyError:
-        return "Definition missing for code %s" % value
-
-
-def transform_connector_status(value, key, index) -> str:
-    """Transform connector status codes into a human readable string."""
-    try:
-        return getattr(PxChargerStatusCodes, "connector_status")[json.loads(value)[key]]
-    except KeyError:
-        return json.loads(value)[key]
+@dataclass
+class PxChargerSensorEntityDescription(
+    PxChargerEntityDescription, SensorEntityDescription
+):
+    """Sensor entity description for pulsatrix."""
+    domain: str = "sensor"
+    deadband: PxDeadband | None = None
+    deadband_group: str | None = None
+    # Factor from the unit of the group option (e.g. kW) to the sensor's unit
+    deadband_scale: float = 1
+    downsample: bool = False
 
 
-def transform_charge_controller_status(value, key, index) -> str:
-    """Transform charge controller status codes into a human readable string."""
-    try:
-        return getattr(PxChargerStatusCodes, "charge_controller_status")[json.loads(value)[key]]
-    except KeyError:
-        return json.loads(value)[key]
+@dataclass
+class PxChargerDerivedSensorEntityDescription(PxChargerSensorEntityDescription):
+    """Sensor derived from the joined values of several topics."""
+    inputs: frozenset[str] = frozenset()
+    value: Callable[[PxChargerJoin], Any] | None = None
 
 
-def transform_vehicle_status(value, key, index) -> str:
-    """Transform vehicle status codes into a human readable string."""
-    try:
-        return getattr(PxChargerStatusCodes, "vehicle_status")[json.loads(value)[key]]
-    except KeyError:
-        return json.loads(value)[key]
+@dataclass
+class PxChargerMetricSensorEntityDescription(PxChargerSensorEntityDescription):
+    """Sensor exposing a metric of one of the integration's controllers."""
+    value: Callable[[Any], Any] | None = None
+    attributes: Callable[[Any], dict[str, Any]] | None = None
+
+
+extract_json_float = PxExtraction(scale=1, precision=2)
+extract_json_float_kilo = PxExtraction(scale=1 / 1000, precision=2)
+# Charging duration, converted from milliseconds to minutes
+extract_duration_minutes = PxExtraction(scale=1 / 60000, precision=1)
+extract_json = PxExtraction()
+extract_json_string = PxExtraction()
+extract_json_bool = PxExtraction()
+
+# Codes transformed into human readable strings
+transform_code = PxExtraction(
+    lookup=PxChargerStatusCodes.states,
+    missing="Definition missing for code {}".format,
+)
+transform_connector_status = PxExtraction(
+    lookup=PxChargerStatusCodes.connector_status
+)
+transform_charge_controller_status = PxExtraction(
+    lookup=PxChargerStatusCodes.charge_controller_status
+)
+transform_vehicle_status = PxExtraction(lookup=PxChargerStatusCodes.vehicle_status)
+transform_start_reason = PxExtraction(lookup=PxChargerStatusCodes.start_reason)
 
 
-def transform_start_reason(value, key, index) -> str:
-    """Transform start reason codes into a human readable string."""
+def extract_energy(data, key, index) -> float | None:
     try:
-        return getattr(PxChargerStatusCodes, "start_reason")[json.loads(value)[key]]
-    except KeyError:
-        return json.loads(value)[key]
+        return round(float(data["lastMeterValue"]) - float(data["meterStart"]), 2)
+    except IndexError:
+        return None
 
 
-def transform_cp_error_cause(value, key, index) -> str:
+def transform_cp_error_cause(data, key, index) -> str:
     """Transform CP error cause codes into a human readable string."""
     try:
-        raw = json.loads(value)[key]
+        raw = data[key]
         if raw is None or raw == "":
             return None
         return getattr(PxChargerStatusCodes, "cp_error_cause").get(raw, raw)
@@ -125,8 +141,8 @@ def transform_cp_error_cause(value, key, index) -> str:
         return None
 
 
-def map_state_to_datetime(value, key, index) -> str:
-    ts = int(json.loads(value)[key])
+def map_state_to_datetime(data, key, index) -> str:
+    ts = int(data[key])
     if ts == 0:
         return None
     dt = datetime.utcfromtimestamp(ts)
@@ -134,31 +150,6 @@ def map_state_to_datetime(value, key, index) -> str:
     return timezone.localize(dt).strftime("%d.%m.%Y %H:%M:%S")
 
 
-def extract_duration_minutes(value, key, index) -> float | None:
-    """Extract charging duration and convert from milliseconds to minutes."""
-    try:
-        ms = int(json.loads(value)[key])
-        return round(ms / 60000, 1)
-    except (KeyError, TypeError, ValueError):
-        return None
-
-
-def extract_json_string(value, key, index) -> str | None:
-    """Extract a string value from JSON."""
-    try:
-        return json.loads(value)[key]
-    except (KeyError, TypeError):
-        return None
-
-
-def extract_json_bool(value, key, index) -> bool | None:
-    """Extract a boolean value from JSON."""
-    try:
-        return json.loads(value)[key]
-    except (KeyError, TypeError):
-        return None
-
-
 SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
     PxChargerSensorEntityDescription(
         key="current_consumption",
@@ -171,6 +162,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=True,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -187,18 +181,6 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         entity_registry_enabled_default=True,
         disabled=False,
     ),
-    PxChargerSensorEntityDescription(
-        key="effective_amperage_limit",
-        topic="tx/status",
-        name="pulsatrix Max Consumption",
-        state=extract_json_amperage_kilo_watts,
-        attribute="effectiveAmperageLimit",
-        device_class=SensorDeviceClass.POWER,
-        native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=True,
-        disabled=False,
-    ),
     PxChargerSensorEntityDescription(
         key="state",
         topic="tx/status",
@@ -238,6 +220,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["frequency"],
+        deadband_group="frequency",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -252,6 +237,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -266,6 +254,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -280,6 +271,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -294,6 +288,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -308,6 +305,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -322,6 +322,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -556,6 +559,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -582,6 +588,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["frequency"],
+        deadband_group="frequency",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -596,6 +605,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -610,6 +622,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -624,6 +639,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["voltage"],
+        deadband_group="voltage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -638,6 +656,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -652,6 +673,9 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
         disabled=False,
     ),
     PxChargerSensorEntityDescription(
@@ -666,6 +690,253 @@ SENSORS: tuple[PxChargerSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["amperage"],
+        deadband_group="amperage",
+        downsample=True,
+        disabled=False,
+    ),
+)
+
+
+def derive_max_power(join: PxChargerJoin) -> float | None:
+    """Return the power offered at the amperage limit in kW.
+
+    Only the phases used in the session are taken into account, each with its
+    measured voltage.
+    """
+    limit = join.inputs[INPUT_AMPERAGE_LIMIT]
+    if limit is None:
+        return None
+    voltages = join.voltages
+    return round(limit * sum(voltages[phase] for phase in join.phases) / 1000, 2)
+
+
+def derive_phase_power(phase: int) -> Callable[[PxChargerJoin], float | None]:
+    """Return a function deriving the real power of a phase in W."""
+
+    def derive(join: PxChargerJoin) -> float | None:
+        voltages = join.inputs[INPUT_VOLTAGE]
+        amperages = join.inputs[INPUT_AMPERAGE]
+        if voltages is None or amperages is None:
+            return None
+        return round(voltages[phase] * amperages[phase], 1)
+
+    return derive
+
+
+def derive_phase_imbalance(join: PxChargerJoin) -> float | None:
+    """Return the largest deviation of a phase amperage from the mean in %."""
+    amperages = join.inputs[INPUT_AMPERAGE]
+    if amperages is None:
+        return None
+    used = [amperages[phase] for phase in join.phases]
+    mean = sum(used) / len(used)
+    if len(used) < 2 or mean <= 0:
+        return 0.0
+    return round(max(abs(value - mean) for value in used) / mean * 100, 1)
+
+
+DERIVED_SENSORS: tuple[PxChargerDerivedSensorEntityDescription, ...] = (
+    PxChargerDerivedSensorEntityDescription(
+        key="effective_amperage_limit",
+        name="pulsatrix Max Consumption",
+        inputs=frozenset({INPUT_AMPERAGE_LIMIT, INPUT_PHASES, INPUT_VOLTAGE}),
+        value=derive_max_power,
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        disabled=False,
+    ),
+    PxChargerDerivedSensorEntityDescription(
+        key="p1_power",
+        name="pulsatrix P1 power",
+        inputs=frozenset({INPUT_AMPERAGE, INPUT_VOLTAGE}),
+        value=derive_phase_power(0),
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        deadband_scale=1000,
+        disabled=False,
+    ),
+    PxChargerDerivedSensorEntityDescription(
+        key="p2_power",
+        name="pulsatrix P2 power",
+        inputs=frozenset({INPUT_AMPERAGE, INPUT_VOLTAGE}),
+        value=derive_phase_power(1),
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        deadband_scale=1000,
+        disabled=False,
+    ),
+    PxChargerDerivedSensorEntityDescription(
+        key="p3_power",
+        name="pulsatrix P3 power",
+        inputs=frozenset({INPUT_AMPERAGE, INPUT_VOLTAGE}),
+        value=derive_phase_power(2),
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        deadband_scale=1000,
+        disabled=False,
+    ),
+    PxChargerDerivedSensorEntityDescription(
+        key="phase_imbalance",
+        name="pulsatrix Phase Imbalance",
+        inputs=frozenset({INPUT_AMPERAGE, INPUT_PHASES}),
+        value=derive_phase_imbalance,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:scale-unbalanced",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        disabled=False,
+    ),
+)
+
+
+LOAD_MANAGEMENT_SENSORS: tuple[PxChargerMetricSensorEntityDescription, ...] = (
+    PxChargerMetricSensorEntityDescription(
+        key="load_management_latency",
+        name="pulsatrix Load Management Latency",
+        value=lambda controller: controller.latency,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-sand",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+    PxChargerMetricSensorEntityDescription(
+        key="load_management_publishes",
+        name="pulsatrix Load Management Publishes",
+        value=lambda controller: controller.publish_count,
+        initial_value=0,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+)
+
+
+SURPLUS_SENSORS: tuple[PxChargerMetricSensorEntityDescription, ...] = (
+    PxChargerMetricSensorEntityDescription(
+        key="surplus_power",
+        name="pulsatrix Surplus Power",
+        value=lambda controller: (
+            None if controller.surplus is None else round(controller.surplus)
+        ),
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:solar-power",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        deadband=DEADBAND_DEFAULTS["power"],
+        deadband_group="power",
+        deadband_scale=1000,
+        disabled=False,
+    ),
+)
+
+
+ACK_SENSORS: tuple[PxChargerMetricSensorEntityDescription, ...] = (
+    PxChargerMetricSensorEntityDescription(
+        key="limit_ack_latency",
+        name="pulsatrix Limit Ack Latency",
+        value=lambda acks: acks.latency,
+        attributes=lambda acks: {
+            **acks.histogram.as_dict("ms"),
+            "acks": acks.histogram.total,
+            "retries": acks.retries,
+            "failures": acks.failures,
+        },
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-check-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+)
+
+
+LATENCY_SENSORS: tuple[PxChargerMetricSensorEntityDescription, ...] = (
+    PxChargerMetricSensorEntityDescription(
+        key="state_latency_p50",
+        name="pulsatrix State Latency P50",
+        value=lambda tracer: tracer.p50,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+    PxChargerMetricSensorEntityDescription(
+        key="state_latency_p95",
+        name="pulsatrix State Latency P95",
+        value=lambda tracer: tracer.p95,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+    PxChargerMetricSensorEntityDescription(
+        key="state_latency_max",
+        name="pulsatrix State Latency Max",
+        value=lambda tracer: tracer.maximum,
+        attributes=lambda tracer: {"state_writes": tracer.writes},
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+)
+
+
+COST_SENSORS: tuple[PxChargerMetricSensorEntityDescription, ...] = (
+    PxChargerMetricSensorEntityDescription(
+        key="session_cost",
+        name="pulsatrix Session Cost",
+        value=lambda controller: round(controller.session_cost, 2),
+        attributes=lambda controller: {"price": controller.price},
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        icon="mdi:cash",
+        entity_registry_enabled_default=True,
+        disabled=False,
+    ),
+    PxChargerMetricSensorEntityDescription(
+        key="monthly_cost",
+        name="pulsatrix Monthly Cost",
+        value=lambda controller: round(controller.monthly_cost, 2),
+        attributes=lambda controller: {"month": controller.month},
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        icon="mdi:cash-multiple",
+        entity_registry_enabled_default=True,
         disabled=False,
     ),
 )
@@ -0,0 +1,24 @@
+"""Diagnostics support for pulsatrix (MQTT)."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import PxChargerCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry."""
+    coordinator: PxChargerCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "topics": {
+            sub_topic: stats.as_dict()
+            for sub_topic, stats in sorted(coordinator.topic_stats.items())
+        },
+    }
@@ -1,31 +1,53 @@
 """MQTT component mixins and helpers."""
+import time
+from typing import Any
+
 from homeassistant import config_entries
-from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import slugify
 
 from .const import (
+    ATTR_RESTORED,
+    CONF_FORCE_REFRESH,
     CONF_SERIAL_NUMBER,
-    CONF_TOPIC_PREFIX,
+    DEFAULT_FORCE_REFRESH,
     DEVICE_INFO_MANUFACTURER,
     DEVICE_INFO_MODEL,
     DOMAIN,
 )
+from .coordinator import PxChargerCoordinator
 from .definitions import PxChargerEntityDescription
+from .topicstats import PxTopicStats
+
 
+class PxChargerEntity(RestoreEntity):
+    """Common pulsatrix entity.
 
-class PxChargerEntity(Entity):
-    """Common pulsatrix entity."""
+    The last known state is restored when the entity is added and marked with
+    the ``restored`` attribute until the first live value is written.
+    """
 
     def __init__(
         self,
+        coordinator: PxChargerCoordinator,
         config_entry: config_entries.ConfigEntry,
         description: PxChargerEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        topic_prefix = config_entry.data[CONF_TOPIC_PREFIX]
+        self.coordinator = coordinator
+        self._force_refresh = 60 * config_entry.options.get(
+            CONF_FORCE_REFRESH, DEFAULT_FORCE_REFRESH
+        )
+        self._last_written: tuple[Any, ...] | None = None
+        self._last_write_time = 0.0
+        self._restored = False
+        # Counters of the topic the entity is written from, if it has one
+        self._stats: PxTopicStats | None = None
+
         serial_number = config_entry.data[CONF_SERIAL_NUMBER]
 
-        self._topic = f"{topic_prefix}/{serial_number}/{description.topic}"
         self.entity_id = f"{description.domain}.pulsatrix_{serial_number}_{description.key}"
 
         self._attr_unique_id = "-".join(
@@ -37,3 +59,49 @@ class PxChargerEntity(Entity):
             manufacturer=DEVICE_INFO_MANUFACTURER,
             model=DEVICE_INFO_MODEL,
         )
+
+    def _restored_attributes(self, attributes: dict[str, Any] | None):
+        """Return the attributes with the restored marker added if needed."""
+        if not self._restored:
+            return attributes
+        return {**(attributes or {}), ATTR_RESTORED: True}
+
+    def _state_snapshot(self) -> tuple[Any, ...]:
+        """Return the values that make up the written state."""
+        return (self.state, self.extra_state_attributes)
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state only if it differs from the last written one.
+
+        With the force refresh option set, an unchanged state is written again
+        (as forced update) once the refresh interval has passed.
+        """
+        # Any value written from here on is live
+        self._restored = False
+
+        snapshot = self._state_snapshot()
+        now = time.monotonic()
+
+        if snapshot == self._last_written:
+            if not self._force_refresh or now - self._last_write_time < self._force_refresh:
+                self._count_write(False)
+                return
+            self._attr_force_update = True
+
+        self._count_write(True)
+        self._last_written = snapshot
+        self._last_write_time = now
+        self.async_write_ha_state()
+        self._attr_force_update = False
+        if (tracer := self.coordinator.tracer) is not None:
+            tracer.async_state_written()
+
+    def _count_write(self, written: bool) -> None:
+        """Count a state write, or one suppressed, for the topic of the entity."""
+        if self._stats is None:
+            return
+        if written:
+            self._stats.writes += 1
+        else:
+            self._stats.suppressed += 1
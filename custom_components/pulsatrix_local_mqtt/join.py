@@ -0,0 +1,181 @@
+"""Join the values of several topics of a pulsatrix charger."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import re
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+if TYPE_CHECKING:
+    from .coordinator import PxChargerCoordinator
+    from .definitions.sensor import PxChargerDerivedSensorEntityDescription
+
+_LOGGER = logging.getLogger(__name__)
+
+NOMINAL_VOLTAGE = 230.0
+
+INPUT_VOLTAGE = "voltage"
+INPUT_AMPERAGE = "amperage"
+INPUT_PHASES = "phases"
+INPUT_AMPERAGE_LIMIT = "amperage_limit"
+
+_PHASE_NAME = re.compile(r"L?([123])")
+
+ValueListener = Callable[[Any, Any], None]
+
+
+def parse_phases(value: Any) -> tuple[int, ...] | None:
+    """Return the (zero based) phases in use from ``usedPhasesSession``.
+
+    The charger reports either the number of phases or the phase names
+    (e.g. "L1L2L3" or "L1, L3").
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return tuple(range(int(value))) if 1 <= value <= 3 else None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return parse_phases(int(value))
+        phases = sorted({int(name) - 1 for name in _PHASE_NAME.findall(value)})
+        return tuple(phases) or None
+    return None
+
+
+def _phase_values(value: Any) -> tuple[float, ...] | None:
+    """Return the per phase values of a meter array."""
+    try:
+        return tuple(float(item) for item in value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PxChargerJoin:
+    """Latest values of the meter/fiscal, charging/status and tx/status topics.
+
+    Each topic only updates the inputs it carries, the others are kept from
+    their last message. When an input changes, only the derived values
+    depending on it are computed again and handed to their listeners.
+    """
+
+    def __init__(self, coordinator: PxChargerCoordinator) -> None:
+        """Initialize the join."""
+        self.coordinator = coordinator
+        self.inputs: dict[str, Any] = {
+            INPUT_VOLTAGE: None,
+            INPUT_AMPERAGE: None,
+            INPUT_PHASES: None,
+            INPUT_AMPERAGE_LIMIT: None,
+        }
+        self._listeners: list[
+            tuple[PxChargerDerivedSensorEntityDescription, ValueListener]
+        ] = []
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+
+    @property
+    def voltages(self) -> tuple[float, ...]:
+        """Return the measured phase voltages, nominal ones if unknown."""
+        return self.inputs[INPUT_VOLTAGE] or (NOMINAL_VOLTAGE,) * 3
+
+    @property
+    def phases(self) -> tuple[int, ...]:
+        """Return the phases in use, all three if unknown."""
+        return self.inputs[INPUT_PHASES] or (0, 1, 2)
+
+    async def async_add_listener(
+        self,
+        description: PxChargerDerivedSensorEntityDescription,
+        listener: ValueListener,
+    ) -> CALLBACK_TYPE:
+        """Register a listener for the derived value of a description.
+
+        The listener is called with the value right away if any of the
+        description's inputs is known, and whenever one of them changes.
+        Returns a callable that removes the listener again.
+        """
+        if not self._listeners and not self._unsubscribe:
+            await self._async_subscribe()
+
+        item = (description, listener)
+        self._listeners.append(item)
+        if any(self.inputs[name] is not None for name in description.inputs):
+            self._async_notify(item)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(item)
+            if not self._listeners:
+                for unsubscribe in self._unsubscribe:
+                    unsubscribe()
+                self._unsubscribe.clear()
+
+        return remove_listener
+
+    async def _async_subscribe(self) -> None:
+        """Subscribe to the topics carrying the inputs."""
+        for sub_topic, handler in (
+            ("meter/fiscal", self._async_meter_received),
+            ("charging/status", self._async_charging_status_received),
+            ("tx/status", self._async_tx_status_received),
+        ):
+            self._unsubscribe.append(
+                await self.coordinator.async_subscribe(sub_topic, handler)
+            )
+
+    @callback
+    def _async_meter_received(self, data: Any) -> None:
+        if isinstance(data, dict):
+            self._async_update(
+                {
+                    INPUT_VOLTAGE: _phase_values(data.get("voltage")),
+                    INPUT_AMPERAGE: _phase_values(data.get("amperage")),
+                }
+            )
+
+    @callback
+    def _async_charging_status_received(self, data: Any) -> None:
+        if isinstance(data, dict) and "usedPhasesSession" in data:
+            self._async_update(
+                {INPUT_PHASES: parse_phases(data["usedPhasesSession"])}
+            )
+
+    @callback
+    def _async_tx_status_received(self, data: Any) -> None:
+        if isinstance(data, dict) and "effectiveAmperageLimit" in data:
+            try:
+                limit = float(data["effectiveAmperageLimit"])
+            except (TypeError, ValueError):
+                limit = None
+            self._async_update({INPUT_AMPERAGE_LIMIT: limit})
+
+    @callback
+    def _async_update(self, values: dict[str, Any]) -> None:
+        """Store new input values and notify the affected listeners."""
+        changed = set()
+        for name, value in values.items():
+            if self.inputs[name] != value:
+                self.inputs[name] = value
+                changed.add(name)
+        if not changed:
+            return
+
+        for item in tuple(self._listeners):
+            if not changed.isdisjoint(item[0].inputs):
+                self._async_notify(item)
+
+    @callback
+    def _async_notify(
+        self,
+        item: tuple[PxChargerDerivedSensorEntityDescription, ValueListener],
+    ) -> None:
+        """Compute the derived value of a description for its listener."""
+        description, listener = item
+        try:
+            value = description.value(self)
+        except (IndexError, TypeError, ZeroDivisionError):
+            _LOGGER.debug("Unable to derive %s from %s", description.key, self.inputs)
+            value = None
+        listener(value, None)
@@ -0,0 +1,199 @@
+"""Dynamic load management for pulsatrix chargers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    CONF_FALLBACK_TIMEOUT,
+    CONF_HYSTERESIS,
+    CONF_MAIN_FUSE,
+    CONF_MIN_DWELL,
+    DEFAULT_FALLBACK_TIMEOUT,
+    DEFAULT_HYSTERESIS,
+    DEFAULT_MAIN_FUSE,
+    DEFAULT_MIN_DWELL,
+)
+from .coordinator import PxChargerCoordinator
+from .definitions.number import NUMBERS
+from .join import NOMINAL_VOLTAGE
+from .metrics import PxMetricSource
+
+_LOGGER = logging.getLogger(__name__)
+
+AMPERAGE_LIMIT = next(d for d in NUMBERS if d.key == "amperage_limit")
+LIMIT_TIMEOUT = next(d for d in NUMBERS if d.key == "limit_timeout")
+
+
+class PxLoadController(PxMetricSource):
+    """Keep the grid connection below the main fuse limit.
+
+    Every meter/grid message is turned into a new amperage limit right away:
+    the household load per phase is the grid amperage minus the charger's own
+    amperage (meter/fiscal), the limit is what is left up to the main fuse on
+    the most loaded phase. Lowering the limit is never delayed. Raising it
+    requires the headroom to exceed the hysteresis and the last change to be
+    at least the minimum dwell time ago. Equal setpoints are never published.
+    The limit never goes below the minimum amperage of the charger, as there
+    is no verified way to pause charging through a limit.
+
+    With a fallback timeout, the charger drops the limit on its own once it
+    is not refreshed within that time, e.g. when Home Assistant or the grid
+    meter stops. The limit is refreshed with the first grid message after
+    half of the timeout has passed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: PxChargerCoordinator,
+        config_entry: config_entries.ConfigEntry,
+    ) -> None:
+        """Initialize the controller."""
+        super().__init__()
+        self.hass = hass
+        self.coordinator = coordinator
+
+        options = config_entry.options
+        self.main_fuse = float(options.get(CONF_MAIN_FUSE, DEFAULT_MAIN_FUSE))
+        self.hysteresis = float(options.get(CONF_HYSTERESIS, DEFAULT_HYSTERESIS))
+        self.min_dwell = options.get(CONF_MIN_DWELL, DEFAULT_MIN_DWELL)
+        self.fallback_timeout = options.get(
+            CONF_FALLBACK_TIMEOUT, DEFAULT_FALLBACK_TIMEOUT
+        )
+
+        self.publish_count = 0
+        self.latency: float | None = None
+
+        self._charger_amperage: tuple[float, ...] = (0.0, 0.0, 0.0)
+        # Last limit requested by the controller or published by the user
+        self._limit: float | None = None
+        self._last_change = -math.inf
+        self._last_publish = -math.inf
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    async def async_start(self) -> None:
+        """Subscribe to the meters and set the fallback timeout."""
+        if self.fallback_timeout:
+            await self.coordinator.async_publish_number(
+                LIMIT_TIMEOUT, self.fallback_timeout
+            )
+        self._unsubscribe.append(
+            self.coordinator.async_subscribe_setpoint(
+                AMPERAGE_LIMIT.key, self._async_setpoint_published
+            )
+        )
+        self._unsubscribe.append(
+            await self.coordinator.async_subscribe(
+                "meter/fiscal", self._async_fiscal_received
+            )
+        )
+        self._unsubscribe.append(
+            await self.coordinator.async_subscribe(
+                "meter/grid", self._async_grid_received
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop controlling the charger."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        for task in self._tasks:
+            task.cancel()
+
+    @callback
+    def _async_setpoint_published(self, value: float) -> None:
+        """Take over limits set through the number entity."""
+        self._limit = value
+
+    @callback
+    def _async_fiscal_received(self, data: Any) -> None:
+        """Keep the latest per phase amperage of the charger."""
+        if isinstance(data, dict):
+            try:
+                self._charger_amperage = tuple(float(a) for a in data["amperage"])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    @callback
+    def _async_grid_received(self, data: Any) -> None:
+        """Compute and publish a new limit for a grid meter reading."""
+        received = time.perf_counter()
+        grid = self._grid_amperage(data)
+        if grid is None:
+            return
+
+        limit = self.compute_limit(grid)
+        current = self._limit
+        now = time.monotonic()
+
+        if current is not None and limit > current:
+            if (
+                limit - current < self.hysteresis
+                or now - self._last_change < self.min_dwell
+            ):
+                limit = current
+
+        if limit == current:
+            refresh_due = (
+                self.fallback_timeout
+                and now - self._last_publish >= self.fallback_timeout * 60 / 2
+            )
+            if not refresh_due:
+                return
+        else:
+            self._last_change = now
+
+        self._limit = limit
+        self._last_publish = now
+        task = self.hass.async_create_task(self._async_publish(limit, received))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _grid_amperage(self, data: Any) -> tuple[float, ...] | None:
+        """Return the per phase amperage at the grid connection."""
+        if not isinstance(data, dict):
+            return None
+        try:
+            return tuple(float(a) for a in data["amperage"])
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            # Spread the total power evenly if the meter has no amperages
+            return (float(data["activePower"]) / (3 * NOMINAL_VOLTAGE),) * 3
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def compute_limit(self, grid: tuple[float, ...]) -> float:
+        """Return the amperage limit leaving the main fuse headroom."""
+        charger = self._charger_amperage
+        headroom = min(
+            self.main_fuse - amperage + (charger[phase] if phase < len(charger) else 0)
+            for phase, amperage in enumerate(grid)
+        )
+        step = AMPERAGE_LIMIT.native_step
+        limit = min(math.floor(headroom / step) * step, AMPERAGE_LIMIT.native_max_value)
+        if limit < AMPERAGE_LIMIT.native_min_value:
+            _LOGGER.debug(
+                "Headroom of %.1f A is below the minimum amperage of %s",
+                headroom,
+                self.coordinator.serial_number,
+            )
+            return float(AMPERAGE_LIMIT.native_min_value)
+        return limit
+
+    async def _async_publish(self, limit: float, received: float) -> None:
+        """Publish a limit and update the metrics."""
+        await self.coordinator.async_publish_number(AMPERAGE_LIMIT, limit)
+        self.publish_count += 1
+        self.latency = round((time.perf_counter() - received) * 1000, 3)
+        self._async_update_metrics()
@@ -0,0 +1,43 @@
+"""Metrics of the pulsatrix controllers."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+MetricListener = Callable[[Any, Any], None]
+
+
+class PxMetricSource:
+    """Hand the metrics of a controller to the sensors showing them."""
+
+    def __init__(self) -> None:
+        """Initialize the metric source."""
+        self._metric_listeners: list[tuple[Callable[[Any], Any], MetricListener]] = []
+
+    @callback
+    def async_add_listener(
+        self, value: Callable[[Any], Any], listener: MetricListener
+    ) -> CALLBACK_TYPE:
+        """Register a listener for a metric of the controller.
+
+        The listener is called with the metric right away and whenever the
+        controller updates its metrics. Returns a callable that removes the
+        listener again.
+        """
+        item = (value, listener)
+        self._metric_listeners.append(item)
+        listener(value(self), None)
+
+        @callback
+        def remove_listener() -> None:
+            self._metric_listeners.remove(item)
+
+        return remove_listener
+
+    @callback
+    def _async_update_metrics(self) -> None:
+        """Hand the current metrics to all listeners."""
+        for value, listener in tuple(self._metric_listeners):
+            listener(value(self), None)
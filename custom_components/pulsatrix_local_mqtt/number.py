@@ -2,9 +2,12 @@
 import logging
 
 from homeassistant import config_entries, core
-from homeassistant.components import mqtt
 from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
 
+from .const import CONF_NUMBER_DEBOUNCE, DEFAULT_NUMBER_DEBOUNCE, DOMAIN
+from .coordinator import PxChargerCoordinator
 from .definitions.number import NUMBERS, PxChargerNumberEntityDescription
 from .entity import PxChargerEntity
 
@@ -17,8 +20,9 @@ async def async_setup_entry(
         async_add_entities,
 ):
     """Config entry setup."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
     async_add_entities(
-        PxChargerNumber(config_entry, description)
+        PxChargerNumber(coordinator, config_entry, description)
         for description in NUMBERS
         if not description.disabled
     )
@@ -31,31 +35,87 @@ class PxChargerNumber(PxChargerEntity, NumberEntity):
 
     def __init__(
         self,
+        coordinator: PxChargerCoordinator,
         config_entry: config_entries.ConfigEntry,
         description: PxChargerNumberEntityDescription,
     ) -> None:
         """Initialize the number entity."""
-        super().__init__(config_entry, description)
+        super().__init__(coordinator, config_entry, description)
 
         self.entity_description = description
-        self._attr_native_value = description.native_value
+        # Unknown until the charger reports the limit or it is set
+        self._attr_native_value = coordinator.setpoints.get(description.key)
         self._attr_native_min_value = description.native_min_value
         self._attr_native_max_value = description.native_max_value
         self._attr_native_step = description.native_step
         self._attr_mode = description.mode
 
+        self._pending: float | None = None
+        self._cancel_publish: CALLBACK_TYPE | None = None
+        self._debounce = (
+            config_entry.options.get(CONF_NUMBER_DEBOUNCE, DEFAULT_NUMBER_DEBOUNCE)
+            / 1000
+        )
+
     @property
     def available(self) -> bool:
-        """Return True if entity is available."""
+        """Return True if entity is available.
+
+        Limits can be set even if the charger never reported them.
+        """
         return True
 
+    async def async_added_to_hass(self) -> None:
+        """Follow the values published or read back for this number."""
+
+        @callback
+        def setpoint_published(value: float) -> None:
+            """Handle a value published or reported by the charger."""
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+        self.async_on_remove(
+            self.coordinator.async_subscribe_setpoint(
+                self.entity_description.key, setpoint_published
+            )
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Publish a value that is still held back."""
+        if self._cancel_publish is not None:
+            self._cancel_publish()
+            self._cancel_publish = None
+            await self._async_publish_pending()
+
     async def async_set_native_value(self, value: float) -> None:
-        """Set new value."""
-        if self.entity_description.value_formatter:
-            payload = self.entity_description.value_formatter(value)
-        else:
-            payload = str(value)
+        """Set new value.
+
+        The state is updated right away, the value is published once no
+        other value was set for the debounce delay, so dragging a slider
+        publishes only the value it ends on.
+        """
+        self._pending = value
+        if not self._debounce:
+            await self._async_publish_pending()
+            return
 
-        await mqtt.async_publish(self.hass, self._topic, payload)
         self._attr_native_value = value
         self.async_write_ha_state()
+        if self._cancel_publish is not None:
+            self._cancel_publish()
+        self._cancel_publish = async_call_later(
+            self.hass, self._debounce, self._async_debounce_ended
+        )
+
+    async def _async_debounce_ended(self, _now) -> None:
+        """Publish the value set last once the debounce delay has passed."""
+        self._cancel_publish = None
+        await self._async_publish_pending()
+
+    async def _async_publish_pending(self) -> None:
+        """Publish the last value set unless the charger already has it."""
+        value, self._pending = self._pending, None
+        key = self.entity_description.key
+        if value is None or value == self.coordinator.setpoints.get(key):
+            return
+        await self.coordinator.async_publish_number(self.entity_description, value)
@@ -0,0 +1,135 @@
+"""Compile entity descriptions into per-topic extraction plans."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+from typing import Any
+
+from .definitions import PxChargerEntityDescription, PxExtraction
+
+_LOGGER = logging.getLogger(__name__)
+
+IDENTITY = PxExtraction()
+
+# (key, index, scale, precision, lookup, missing, state, raw_state)
+PlanStep = tuple[
+    Any, int, Any, Any, Any, Any, Callable | None, Callable | None
+]
+# A plan step followed by the listeners of its entities
+PlanEntry = tuple[
+    Any, int, Any, Any, Any, Any, Callable | None, Callable | None, list
+]
+
+_MISSING = object()
+
+
+def _binary_extractor(state: Callable) -> Callable:
+    """Adapt a binary sensor extractor, which takes no index, to a plan step."""
+
+    def extract(data, key, index):
+        return state(data, key)
+
+    return extract
+
+
+def compile_description(description: PxChargerEntityDescription) -> PlanStep:
+    """Compile a single entity description into a flat plan step.
+
+    Extractors that are no PxExtraction are kept as callable and are run as
+    part of the same pass.
+    """
+    state = description.state
+    key = description.attribute
+    index = description.attribute_index
+
+    raw_state = description.raw_value
+
+    if state is None:
+        return (None, -1, None, None, None, None, None, raw_state)
+
+    if not isinstance(state, PxExtraction):
+        if description.domain == "binary_sensor":
+            state = _binary_extractor(state)
+        return (key, index, None, None, None, None, state, raw_state)
+
+    if raw_state == IDENTITY:
+        # The inline step already extracts the value before conversion
+        raw_state = None
+
+    return (
+        key,
+        index,
+        state.scale,
+        state.precision,
+        state.lookup,
+        state.missing,
+        None,
+        raw_state,
+    )
+
+
+def compile_plan(
+    descriptions: Iterable[PxChargerEntityDescription],
+) -> dict[str, dict[tuple[str, str], PlanStep]]:
+    """Compile descriptions into plan steps grouped by topic."""
+    plan: dict[str, dict[tuple[str, str], PlanStep]] = {}
+    for description in descriptions:
+        plan.setdefault(description.topic, {})[
+            (description.domain, description.key)
+        ] = compile_description(description)
+    return plan
+
+
+def run_plan(entries: Iterable[PlanEntry], data: Any) -> None:
+    """Run all entries of a topic in a single pass over the decoded payload.
+
+    Each listener is called with the extracted value and the raw value.
+    """
+    is_dict = isinstance(data, dict)
+
+    for key, index, scale, precision, lookup, missing, state, raw_state, listeners in entries:
+        if key is None:
+            value = raw = data
+        elif state is not None:
+            try:
+                value = state(data, key, index)
+            except (KeyError, IndexError, TypeError, ValueError):
+                _LOGGER.debug("Unable to extract %s from %s", key, data)
+                value = None
+            raw = None
+        else:
+            raw = data.get(key) if is_dict else None
+            if index >= 0 and raw is not None:
+                try:
+                    raw = raw[index]
+                except (IndexError, KeyError, TypeError):
+                    raw = None
+
+            if raw is None:
+                value = None
+            elif lookup is not None:
+                try:
+                    value = lookup.get(raw, _MISSING)
+                except TypeError:
+                    value = _MISSING
+                if value is _MISSING:
+                    value = raw if missing is None else missing(raw)
+            elif scale is not None:
+                try:
+                    value = float(raw) * scale
+                except (TypeError, ValueError):
+                    value = None
+                else:
+                    if precision is not None:
+                        value = round(value, precision)
+            else:
+                value = raw
+
+        if raw_state is not None:
+            try:
+                raw = raw_state(data, key, index)
+            except (KeyError, IndexError, TypeError, ValueError):
+                raw = None
+
+        for listener in listeners:
+            listener(value, raw)
@@ -0,0 +1,93 @@
+"""On-demand profiling of the MQTT message handling of pulsatrix chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import cProfile
+import io
+import logging
+import pstats
+
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+from .const import ATTR_SERIAL_NUMBER, DOMAIN, EVENT_PROFILE
+from .coordinator import PxChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions listed in the report, by cumulative time
+REPORT_LINES = 50
+
+
+@callback
+def async_start_profile(
+    hass: HomeAssistant, coordinator: PxChargerCoordinator, seconds: int
+) -> str:
+    """Start profiling the message handlers of a charger.
+
+    The handlers are only wrapped for the given number of seconds, before
+    and after that the messages are dispatched without any profiling code.
+    The profile runs in a background task of the config entry, which is
+    cancelled when the entry is unloaded. Once the report is written an
+    EVENT_PROFILE event is fired. Returns the path of the report.
+    """
+    profiler = cProfile.Profile()
+    messages = 0
+    serial_number = coordinator.serial_number
+
+    def wrap(handler: Callable[..., None]) -> Callable[..., None]:
+        def profiled(*args) -> None:
+            nonlocal messages
+            messages += 1
+            profiler.enable()
+            try:
+                handler(*args)
+            finally:
+                profiler.disable()
+
+        return profiled
+
+    coordinator.profiling = True
+    unwrap = coordinator.router.async_wrap_handlers(serial_number, wrap)
+
+    @callback
+    def stop_profiling(_task: asyncio.Task | None = None) -> None:
+        unwrap()
+        coordinator.profiling = False
+
+    path = hass.config.path(
+        f"{DOMAIN}_profile_{serial_number}_{dt_util.now().strftime('%Y%m%d%H%M%S')}.txt"
+    )
+
+    async def async_profile() -> None:
+        await asyncio.sleep(seconds)
+        stop_profiling()
+        header = (
+            f"pulsatrix {serial_number}: {messages} messages "
+            f"in {seconds} seconds until {dt_util.now().isoformat()}\n\n"
+        )
+        await hass.async_add_executor_job(_write_report, profiler, path, header)
+        _LOGGER.info("Wrote profile of %s to %s", serial_number, path)
+        hass.bus.async_fire(
+            EVENT_PROFILE,
+            {ATTR_SERIAL_NUMBER: serial_number, "path": path, "messages": messages},
+        )
+
+    task = coordinator.config_entry.async_create_background_task(
+        hass, async_profile(), f"{DOMAIN} profile {serial_number}"
+    )
+    # Also restores the handlers if the profile is cancelled
+    task.add_done_callback(stop_profiling)
+    return path
+
+
+def _write_report(profiler: cProfile.Profile, path: str, header: str) -> None:
+    """Write the statistics of a profile sorted by cumulative time."""
+    stream = io.StringIO()
+    stream.write(header)
+    if profiler.getstats():
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LINES)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
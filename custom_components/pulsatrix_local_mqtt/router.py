@@ -0,0 +1,181 @@
+"""Fleet wide MQTT message routing for pulsatrix."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], None]
+TopicObserver = Callable[[str, bytes], None]
+HandlerWrapper = Callable[[Callable[..., None]], Callable[..., None]]
+
+
+class PxFleetRouter:
+    """Route the messages of all chargers below a topic prefix.
+
+    A single wildcard subscription (``{prefix}/+/#``) receives the messages of
+    every charger. The serial number and sub-topic are taken from the topic
+    and the payload is handed to the handler registered for them, so the
+    number of broker subscriptions does not grow with the number of chargers.
+    Messages of sub-topics without a handler go to the charger's observer.
+
+    The broker delivers the retained messages only once, when the wildcard
+    subscription is made. For each topic delivered as retained the router
+    keeps the last payload, so handlers and observers registered later, e.g.
+    of a charger loaded after another one, can be handed what they missed.
+    """
+
+    def __init__(self, hass: HomeAssistant, topic_prefix: str) -> None:
+        """Initialize the router."""
+        self.hass = hass
+        self.topic_prefix = topic_prefix
+
+        self._offset = len(topic_prefix) + 1
+        self._handlers: dict[tuple[str, str], MessageHandler] = {}
+        self._observers: dict[str, TopicObserver] = {}
+        # Last payload per (serial number, sub-topic) of the retained topics
+        self._retained: dict[tuple[str, str], bytes] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+
+    @property
+    def has_handlers(self) -> bool:
+        """Return True if any charger is registered with the router."""
+        return bool(self._handlers or self._observers)
+
+    async def async_register(
+        self, serial_number: str, sub_topic: str, handler: MessageHandler
+    ) -> CALLBACK_TYPE:
+        """Register the handler of a charger's sub-topic.
+
+        Returns a callable that removes the handler again. The wildcard
+        subscription is dropped once the last handler is removed. The retained
+        payload of the sub-topic is not replayed, see async_get_retained.
+        """
+        key = (serial_number, sub_topic)
+        self._handlers[key] = handler
+        await self._async_subscribe()
+
+        @callback
+        def remove_handler() -> None:
+            if _unwrapped(self._handlers.get(key)) is handler:
+                del self._handlers[key]
+            self._async_release()
+
+        return remove_handler
+
+    async def async_register_observer(
+        self, serial_number: str, observer: TopicObserver
+    ) -> CALLBACK_TYPE:
+        """Register the observer of a charger's sub-topics without handler.
+
+        The observer is called with the sub-topic and the raw payload, right
+        away for the retained payloads of the sub-topics without handler.
+        Returns a callable that removes the observer again.
+        """
+        self._observers[serial_number] = observer
+        await self._async_subscribe()
+        for (serial, sub_topic), payload in tuple(self._retained.items()):
+            if serial == serial_number and (serial, sub_topic) not in self._handlers:
+                observer(sub_topic, payload)
+
+        @callback
+        def remove_observer() -> None:
+            if _unwrapped(self._observers.get(serial_number)) is observer:
+                del self._observers[serial_number]
+            self._async_release()
+
+        return remove_observer
+
+    @callback
+    def async_get_retained(self, serial_number: str, sub_topic: str) -> bytes | None:
+        """Return the last payload of a charger's retained sub-topic."""
+        return self._retained.get((serial_number, sub_topic))
+
+    @callback
+    def async_wrap_handlers(
+        self, serial_number: str, wrap: HandlerWrapper
+    ) -> CALLBACK_TYPE:
+        """Replace the handlers and the observer of a charger by wrapped ones.
+
+        Only the handlers registered at the time are wrapped, the dispatch
+        itself is unchanged. Returns a callable that restores the handlers.
+        """
+        handlers = {
+            key: handler
+            for key, handler in self._handlers.items()
+            if key[0] == serial_number
+        }
+        observers = {}
+        if (observer := self._observers.get(serial_number)) is not None:
+            observers[serial_number] = observer
+        wrapped_handlers = {key: _wrap(wrap, h) for key, h in handlers.items()}
+        wrapped_observers = {key: _wrap(wrap, o) for key, o in observers.items()}
+        self._handlers.update(wrapped_handlers)
+        self._observers.update(wrapped_observers)
+
+        @callback
+        def unwrap() -> None:
+            for registry, wrapped in (
+                (self._handlers, wrapped_handlers),
+                (self._observers, wrapped_observers),
+            ):
+                for key, wrapper in wrapped.items():
+                    # Handlers removed meanwhile are not restored
+                    if registry.get(key) is wrapper:
+                        registry[key] = wrapper._wrapped_handler
+
+        return unwrap
+
+    async def _async_subscribe(self) -> None:
+        """Make the wildcard subscription unless it exists."""
+        if self._unsubscribe is None:
+            self._unsubscribe = await mqtt.async_subscribe(
+                self.hass,
+                f"{self.topic_prefix}/+/#",
+                self._async_message_received,
+                1,
+                encoding=None,
+            )
+
+    @callback
+    def _async_release(self) -> None:
+        """Drop the wildcard subscription once nothing is registered."""
+        if not self.has_handlers and self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+            # A new subscription receives the retained messages again
+            self._retained.clear()
+
+    @callback
+    def _async_message_received(self, message) -> None:
+        """Dispatch a message to the handler of its serial and sub-topic."""
+        serial_number, _, sub_topic = message.topic[self._offset :].partition("/")
+        key = (serial_number, sub_topic)
+        # Later messages of a retained topic are delivered without the flag
+        if message.retain or key in self._retained:
+            if message.payload:
+                self._retained[key] = message.payload
+            else:
+                # An empty message clears the retained topic
+                self._retained.pop(key, None)
+        handler = self._handlers.get(key)
+        if handler is not None:
+            handler(message.payload)
+        elif (observer := self._observers.get(serial_number)) is not None:
+            observer(sub_topic, message.payload)
+
+
+def _wrap(wrap: HandlerWrapper, handler: Callable[..., None]) -> Callable[..., None]:
+    """Return a wrapped handler that remembers the original one."""
+    wrapper = wrap(handler)
+    wrapper._wrapped_handler = handler
+    return wrapper
+
+
+def _unwrapped(handler: Callable[..., None] | None) -> Callable[..., None] | None:
+    """Return the original of a wrapped handler."""
+    return getattr(handler, "_wrapped_handler", handler)
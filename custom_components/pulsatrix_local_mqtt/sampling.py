@@ -0,0 +1,150 @@
+"""Sample accumulation helpers for pulsatrix."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from math import ceil
+
+
+class PxSampleWindow:
+    """Accumulate numeric samples between two state writes.
+
+    Only a fixed set of running values is kept, so adding a sample does not
+    allocate anything regardless of the message rate.
+    """
+
+    __slots__ = ("count", "total", "minimum", "maximum", "last")
+
+    def __init__(self) -> None:
+        """Initialize an empty window."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self.count = 0
+        self.total = 0.0
+        self.minimum = 0.0
+        self.maximum = 0.0
+        self.last = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a sample to the window."""
+        if self.count == 0:
+            self.minimum = self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the samples in the window."""
+        return self.total / self.count if self.count else 0.0
+
+
+class PxEwmaBuffer:
+    """Exponentially weighted moving average over a ring buffer of samples.
+
+    Only the most recent ``size`` samples are kept in a preallocated list, so
+    old samples stop influencing the average entirely once they are
+    overwritten.
+    """
+
+    __slots__ = ("alpha", "samples", "count", "index")
+
+    def __init__(self, size: int, alpha: float) -> None:
+        """Initialize an empty buffer."""
+        self.alpha = alpha
+        self.samples = [0.0] * size
+        self.count = 0
+        self.index = 0
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self.count = 0
+        self.index = 0
+
+    def add(self, value: float) -> None:
+        """Add a sample, overwriting the oldest one if the buffer is full."""
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    @property
+    def value(self) -> float | None:
+        """Return the average of the samples, weighting recent ones most."""
+        if not self.count:
+            return None
+        size = len(self.samples)
+        start = (self.index - self.count) % size
+        average = self.samples[start]
+        for offset in range(1, self.count):
+            average += self.alpha * (self.samples[(start + offset) % size] - average)
+        return average
+
+
+class PxHistogram:
+    """Count samples in fixed buckets.
+
+    A sample falls into the first bucket whose upper bound it does not
+    exceed, larger samples into a final overflow bucket.
+    """
+
+    __slots__ = ("bounds", "counts")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        """Initialize an empty histogram with ascending upper bounds."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def add(self, value: float) -> None:
+        """Count a sample."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    @property
+    def total(self) -> int:
+        """Return the number of samples."""
+        return sum(self.counts)
+
+    def as_dict(self, unit: str = "") -> dict[str, int]:
+        """Return the counts keyed by bucket, e.g. ``le_50ms`` or ``gt_5000ms``."""
+        buckets = {
+            f"le_{bound:g}{unit}": count
+            for bound, count in zip(self.bounds, self.counts)
+        }
+        buckets[f"gt_{self.bounds[-1]:g}{unit}"] = self.counts[-1]
+        return buckets
+
+
+class PxReservoir:
+    """Keep the most recent samples in a preallocated ring.
+
+    Adding a sample overwrites the oldest one once the ring is full, the
+    samples are only sorted when a percentile is asked for.
+    """
+
+    __slots__ = ("samples", "count", "index")
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty reservoir."""
+        self.samples = [0.0] * size
+        self.count = 0
+        self.index = 0
+
+    def add(self, value: float) -> None:
+        """Add a sample, overwriting the oldest one if the ring is full."""
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the samples."""
+        if not self.count:
+            return None
+        ordered = sorted(self.samples[: self.count])
+        rank = ceil(percent / 100 * self.count)
+        return ordered[min(max(rank, 1), self.count) - 1]
@@ -1,13 +1,40 @@
 """The pulsatrix (MQTT) sensor."""
+from dataclasses import replace
+from datetime import timedelta
 import logging
+import time
 
 from homeassistant import config_entries, core
-from homeassistant.components import mqtt
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import RestoreSensor
 from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
 
-from .definitions.sensor import SENSORS, PxChargerSensorEntityDescription
+from .const import (
+    CONF_DEADBAND_MAX_INTERVAL,
+    CONF_DEADBAND_PREFIX,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SAMPLE_STATE,
+    DEFAULT_DEADBAND_MAX_INTERVAL,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLE_STATE,
+    DOMAIN,
+)
+from .coordinator import PxChargerCoordinator
+from .definitions.sensor import (
+    ACK_SENSORS,
+    COST_SENSORS,
+    DERIVED_SENSORS,
+    LATENCY_SENSORS,
+    LOAD_MANAGEMENT_SENSORS,
+    SENSORS,
+    SURPLUS_SENSORS,
+    PxChargerDerivedSensorEntityDescription,
+    PxChargerMetricSensorEntityDescription,
+    PxChargerSensorEntityDescription,
+    PxDeadband,
+)
 from .entity import PxChargerEntity
+from .sampling import PxSampleWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,33 +45,88 @@ async def async_setup_entry(
         async_add_entities,
 ):
     """Config entry setup."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
     async_add_entities(
-        PxChargerSensor(config_entry, description)
+        PxChargerSensor(coordinator, config_entry, description)
         for description in SENSORS
         if not description.disabled
     )
+    async_add_entities(
+        PxChargerDerivedSensor(coordinator, config_entry, description)
+        for description in DERIVED_SENSORS
+        if not description.disabled
+    )
+    for controller, descriptions in (
+        (coordinator.acks, ACK_SENSORS),
+        (coordinator.tracer, LATENCY_SENSORS),
+        (coordinator.load_controller, LOAD_MANAGEMENT_SENSORS),
+        (coordinator.surplus_controller, SURPLUS_SENSORS),
+        (
+            coordinator.cost_controller,
+            # Costs are in the currency configured in Home Assistant
+            [
+                replace(description, native_unit_of_measurement=hass.config.currency)
+                for description in COST_SENSORS
+            ],
+        ),
+    ):
+        if controller is not None:
+            async_add_entities(
+                [
+                    PxChargerMetricSensor(
+                        coordinator, config_entry, description, controller
+                    )
+                    for description in descriptions
+                ]
+            )
 
 
-class PxChargerSensor(PxChargerEntity, SensorEntity):
+class PxChargerSensor(PxChargerEntity, RestoreSensor):
     """Representation of a pulsatrix sensor that is updated via MQTT."""
 
     entity_description: PxChargerSensorEntityDescription
 
     def __init__(
         self,
+        coordinator: PxChargerCoordinator,
         config_entry: config_entries.ConfigEntry,
         description: PxChargerSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(config_entry, description)
+        super().__init__(coordinator, config_entry, description)
 
         self._extra_state_attributes = None
         self.entity_description = description
 
+        self._deadband = description.deadband
+        if description.deadband_group is not None:
+            option = config_entry.options.get(
+                f"{CONF_DEADBAND_PREFIX}{description.deadband_group}"
+            )
+            if option is not None:
+                self._deadband = PxDeadband.parse(option).scaled(
+                    description.deadband_scale
+                )
+        self._deadband_max_interval = config_entry.options.get(
+            CONF_DEADBAND_MAX_INTERVAL, DEFAULT_DEADBAND_MAX_INTERVAL
+        )
+
+        self._window: PxSampleWindow | None = None
+        self._sample_interval = config_entry.options.get(
+            CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL
+        )
+        self._sample_state = config_entry.options.get(
+            CONF_SAMPLE_STATE, DEFAULT_SAMPLE_STATE
+        )
+        if description.downsample and self._sample_interval:
+            # Writes are already limited to one per interval
+            self._window = PxSampleWindow()
+            self._deadband = None
+
     @property
     def extra_state_attributes(self):
         """Return entity specific state attributes."""
-        return self._extra_state_attributes
+        return self._restored_attributes(self._extra_state_attributes)
 
     @property
     def available(self):
@@ -53,33 +135,141 @@ class PxChargerSensor(PxChargerEntity, SensorEntity):
         """Return True if entity is available."""
         return self._attr_native_value is not None
 
+    def _state_snapshot(self):
+        """Return the values that make up the written state."""
+        return (self._attr_native_value, self._extra_state_attributes)
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state unless it changed only within the deadband."""
+        if self._deadband is not None and self._within_deadband():
+            self._count_write(False)
+            return
+        super().async_write_ha_state_if_changed()
+
+    def _within_deadband(self) -> bool:
+        """Return True if the new value lies within the deadband."""
+        if self._last_written is None:
+            return False
+        last_value = self._last_written[0]
+        value = self._attr_native_value
+        if not isinstance(value, (int, float)) or not isinstance(last_value, (int, float)):
+            return False
+        if time.monotonic() - self._last_write_time >= self._deadband_max_interval:
+            return False
+        return self._deadband.contains(last_value, value)
+
+    async def _async_subscribe(self, listener):
+        """Register the listener for the values of the sensor."""
+        self._stats = self.coordinator.async_get_topic_stats(
+            self.entity_description.topic
+        )
+        return await self.coordinator.async_subscribe_description(
+            self.entity_description, listener
+        )
+
+    @callback
+    def _async_flush_window(self, _now=None) -> None:
+        """Write the samples collected since the last interval."""
+        window = self._window
+        if not window.count:
+            return
+
+        mean = round(window.mean, 2)
+        self._attr_native_value = mean if self._sample_state == "mean" else window.last
+        self._extra_state_attributes = {
+            "min": window.minimum,
+            "max": window.maximum,
+            "mean": mean,
+            "samples": window.count,
+        }
+        window.reset()
+
+        self.async_write_ha_state_if_changed()
+
     async def async_added_to_hass(self):
         if self.entity_description.initial_value is not None:
             self._attr_native_value = self.entity_description.initial_value
 
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            if last_data.native_value is not None:
+                self._attr_native_value = last_data.native_value
+                self._restored = True
+
         """Subscribe to MQTT events."""
 
         @callback
-        def message_received(message):
-            """Handle new MQTT messages."""
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(
-                    message.payload, self.entity_description.attribute, self.entity_description.attribute_index
-                )
-            else:
-                if message.payload == "null":
-                    self._attr_native_value = None
-                else:
-                    self._attr_native_value = message.payload
+        def message_received(value, raw):
+            """Handle a value extracted from an MQTT payload."""
+            if self._window is not None:
+                if isinstance(value, (int, float)):
+                    self._window.add(value)
+                return
+
+            self._attr_native_value = value
 
             if self.entity_description.raw_value is not None:
-                raw_value = self.entity_description.raw_value(
-                    message.payload, self.entity_description.attribute, self.entity_description.attribute_index
-                )
                 self._extra_state_attributes = {
-                    "raw_value": raw_value
+                    "raw_value": raw
                 }
 
-            self.async_write_ha_state()
+            self.async_write_ha_state_if_changed()
+
+        self.async_on_remove(await self._async_subscribe(message_received))
+
+        if self._window is not None:
+            self.async_on_remove(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_flush_window,
+                    timedelta(seconds=self._sample_interval),
+                )
+            )
+
+
+class PxChargerDerivedSensor(PxChargerSensor):
+    """Representation of a pulsatrix sensor derived from several topics."""
+
+    entity_description: PxChargerDerivedSensorEntityDescription
+
+    async def _async_subscribe(self, listener):
+        """Register the listener for the derived values of the sensor."""
+        return await self.coordinator.join.async_add_listener(
+            self.entity_description, listener
+        )
+
+
+class PxChargerMetricSensor(PxChargerSensor):
+    """Representation of a metric of one of the integration's controllers."""
+
+    entity_description: PxChargerMetricSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: PxChargerCoordinator,
+        config_entry: config_entries.ConfigEntry,
+        description: PxChargerMetricSensorEntityDescription,
+        controller,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, description)
+        self.controller = controller
+
+    @property
+    def available(self) -> bool:
+        """Return True, the metric is unknown until the controller has one."""
+        return True
+
+    async def _async_subscribe(self, listener):
+        """Register the listener for the metric of the controller."""
+        if (attributes := self.entity_description.attributes) is not None:
+            value_listener = listener
+
+            @callback
+            def listener(value, raw):
+                self._extra_state_attributes = attributes(self.controller)
+                value_listener(value, raw)
 
-        await mqtt.async_subscribe(self.hass, self._topic, message_received, 1)
+        return self.controller.async_add_listener(
+            self.entity_description.value, listener
+        )
@@ -0,0 +1,334 @@
+"""Services of the pulsatrix (MQTT) integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
+
+from .const import (
+    ATTR_CONFIG,
+    ATTR_END,
+    ATTR_FORCE,
+    ATTR_ITEMS,
+    ATTR_KEY,
+    ATTR_SECONDS,
+    ATTR_SERIAL_NUMBER,
+    ATTR_SERIAL_NUMBERS,
+    ATTR_SOURCE,
+    ATTR_START,
+    ATTR_VALUE,
+    DATA_CHARGERS,
+    DATA_SESSION_LOG,
+    DEFAULT_TOPIC_PREFIX,
+    DOMAIN,
+    STATISTICS_SESSIONS,
+    STATISTICS_SOURCES,
+)
+from .coordinator import async_get_coordinator
+from .profiler import async_start_profile
+from .statistics import async_backfill_register, async_import_sessions, statistic_id
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_CONFIG_KEY = "set_config_key"
+SERVICE_SET_CONFIG_KEYS = "set_config_keys"
+SERVICE_GET_CONFIG_SNAPSHOT = "get_config_snapshot"
+SERVICE_GET_SESSIONS = "get_sessions"
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+SERVICE_PROFILE = "profile"
+
+# Publishes of a batch that are in flight at the same time
+MAX_PARALLEL_PUBLISHES = 10
+
+CONFIG_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SERIAL_NUMBER): cv.string,
+        vol.Required(ATTR_KEY): cv.string,
+        vol.Required(ATTR_VALUE): cv.string,
+    }
+)
+
+SERVICE_SCHEMA_SET_CONFIG_KEY = CONFIG_ITEM_SCHEMA.extend(
+    {vol.Optional(ATTR_FORCE, default=False): cv.boolean}
+)
+
+SERVICE_SCHEMA_SET_CONFIG_KEYS = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_ITEMS, "batch"): vol.All(
+                cv.ensure_list, [CONFIG_ITEM_SCHEMA]
+            ),
+            vol.Exclusive(ATTR_SERIAL_NUMBERS, "batch"): vol.All(
+                cv.ensure_list, [cv.string]
+            ),
+            vol.Optional(ATTR_CONFIG): vol.Schema({cv.string: cv.string}),
+            vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ITEMS, ATTR_SERIAL_NUMBERS),
+    cv.key_dependency(ATTR_SERIAL_NUMBERS, ATTR_CONFIG),
+)
+
+SERVICE_SCHEMA_GET_CONFIG_SNAPSHOT = vol.Schema(
+    {vol.Optional(ATTR_SERIAL_NUMBERS): vol.All(cv.ensure_list, [cv.string])}
+)
+
+SERVICE_SCHEMA_GET_SESSIONS = vol.Schema(
+    {
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_SERIAL_NUMBERS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+SERVICE_SCHEMA_IMPORT_STATISTICS = vol.Schema(
+    {
+        vol.Optional(ATTR_SOURCE, default=STATISTICS_SESSIONS): vol.In(
+            STATISTICS_SOURCES
+        ),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_SERIAL_NUMBERS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+SERVICE_SCHEMA_PROFILE = vol.Schema(
+    {
+        vol.Required(ATTR_SERIAL_NUMBER): cv.string,
+        vol.Optional(ATTR_SECONDS, default=60): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+
+def normalize_config_value(value: str) -> str:
+    """Return the payload of a config value.
+
+    Numbers are sent as is, booleans in lower case and everything else as
+    JSON string.
+    """
+    if not value.isnumeric():
+        if value in ["true", "True"]:
+            value = "true"
+        elif value in ["false", "False"]:
+            value = "false"
+        else:
+            value = f'"{value}"'
+    return value
+
+
+def config_key_topic(hass: HomeAssistant, serial_number: str, key: str) -> str:
+    """Return the topic setting a config key of a charger.
+
+    Chargers without a loaded config entry use the default topic prefix.
+    """
+    if (coordinator := async_get_coordinator(hass, serial_number)) is not None:
+        topic_prefix = coordinator.topic_prefix
+    else:
+        topic_prefix = DEFAULT_TOPIC_PREFIX
+    return f"{topic_prefix}/{serial_number}/{key}/set"
+
+
+def config_key_unchanged(
+    hass: HomeAssistant, serial_number: str, key: str, payload: str
+) -> bool:
+    """Return True if the charger is known to have the value of a config key."""
+    coordinator = async_get_coordinator(hass, serial_number)
+    return coordinator is not None and not coordinator.config.differs(key, payload)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def set_config_key_service(call: ServiceCall) -> None:
+        serial_number = call.data[ATTR_SERIAL_NUMBER]
+        key = call.data[ATTR_KEY]
+        topic = config_key_topic(hass, serial_number, key)
+        value = normalize_config_value(call.data[ATTR_VALUE])
+
+        if not call.data[ATTR_FORCE] and config_key_unchanged(
+            hass, serial_number, key, value
+        ):
+            _LOGGER.debug("%s of %s is unchanged", key, serial_number)
+            return
+        await mqtt.async_publish(hass, topic, value)
+
+    async def set_config_keys_service(call: ServiceCall) -> ServiceResponse:
+        if ATTR_ITEMS in call.data:
+            items = [
+                (item[ATTR_SERIAL_NUMBER], item[ATTR_KEY], item[ATTR_VALUE])
+                for item in call.data[ATTR_ITEMS]
+            ]
+        else:
+            items = [
+                (serial_number, key, value)
+                for serial_number in call.data[ATTR_SERIAL_NUMBERS]
+                for key, value in call.data[ATTR_CONFIG].items()
+            ]
+
+        force = call.data[ATTR_FORCE]
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_PUBLISHES)
+
+        async def publish(serial_number: str, key: str, value: str) -> dict[str, Any]:
+            result: dict[str, Any] = {
+                ATTR_SERIAL_NUMBER: serial_number,
+                ATTR_KEY: key,
+                ATTR_VALUE: normalize_config_value(value),
+            }
+            if not force and config_key_unchanged(
+                hass, serial_number, key, result[ATTR_VALUE]
+            ):
+                result.update(success=True, published=False)
+                return result
+            async with semaphore:
+                try:
+                    await mqtt.async_publish(
+                        hass,
+                        config_key_topic(hass, serial_number, key),
+                        result[ATTR_VALUE],
+                    )
+                except HomeAssistantError as err:
+                    _LOGGER.warning(
+                        "Unable to set %s of %s: %s", key, serial_number, err
+                    )
+                    result.update(success=False, published=False, error=str(err))
+                else:
+                    result.update(success=True, published=True)
+            return result
+
+        results = await asyncio.gather(*(publish(*item) for item in items))
+        if call.return_response:
+            return {"results": list(results)}
+        return None
+
+    async def get_config_snapshot_service(call: ServiceCall) -> ServiceResponse:
+        serial_numbers = call.data.get(ATTR_SERIAL_NUMBERS)
+        if serial_numbers is None:
+            serial_numbers = list(hass.data.get(DATA_CHARGERS, {}))
+        snapshots = {}
+        for serial_number in serial_numbers:
+            if (coordinator := async_get_coordinator(hass, serial_number)) is None:
+                raise ServiceValidationError(
+                    f"No pulsatrix charger with serial number {serial_number}"
+                )
+            snapshots[serial_number] = coordinator.config.as_dict()
+        return snapshots
+
+    async def get_sessions_service(call: ServiceCall) -> ServiceResponse:
+        start = call.data.get(ATTR_START)
+        end = call.data.get(ATTR_END)
+        serial_numbers = call.data.get(ATTR_SERIAL_NUMBERS)
+        sessions = hass.data[DATA_SESSION_LOG].async_query(
+            None if start is None else int(dt_util.as_utc(start).timestamp()),
+            None if end is None else int(dt_util.as_utc(end).timestamp()),
+            None if serial_numbers is None else set(serial_numbers),
+        )
+        return {"sessions": sessions}
+
+    async def import_statistics_service(call: ServiceCall) -> ServiceResponse:
+        if "recorder" not in hass.config.components:
+            raise ServiceValidationError("The recorder is not set up")
+        source = call.data[ATTR_SOURCE]
+        session_log = hass.data[DATA_SESSION_LOG]
+        serial_numbers = call.data.get(ATTR_SERIAL_NUMBERS)
+        if serial_numbers is None and source == STATISTICS_SESSIONS:
+            serial_numbers = sorted(
+                {record[ATTR_SERIAL_NUMBER] for record in session_log.async_query()}
+            )
+        elif serial_numbers is None:
+            serial_numbers = list(hass.data.get(DATA_CHARGERS, {}))
+        start = call.data.get(ATTR_START)
+
+        hours = {}
+        for serial_number in serial_numbers:
+            coordinator = async_get_coordinator(hass, serial_number)
+            if source == STATISTICS_SESSIONS and coordinator is not None:
+                # Keeps the last hour of a loaded charger for its next session
+                count = await coordinator.session_statistics.async_rebuild()
+            elif source == STATISTICS_SESSIONS:
+                count = async_import_sessions(
+                    hass,
+                    serial_number,
+                    session_log.async_query(serial_numbers={serial_number}),
+                )
+            else:
+                count = await async_backfill_register(
+                    hass,
+                    serial_number,
+                    dt_util.utc_from_timestamp(0) if start is None else start,
+                )
+            hours[statistic_id(serial_number, source)] = count
+        if call.return_response:
+            return {"statistics": hours}
+        return None
+
+    async def profile_service(call: ServiceCall) -> ServiceResponse:
+        serial_number = call.data[ATTR_SERIAL_NUMBER]
+        if (coordinator := async_get_coordinator(hass, serial_number)) is None:
+            raise ServiceValidationError(
+                f"No pulsatrix charger with serial number {serial_number}"
+            )
+        if coordinator.profiling:
+            raise ServiceValidationError(
+                f"The pulsatrix charger {serial_number} is already being profiled"
+            )
+        path = async_start_profile(hass, coordinator, call.data[ATTR_SECONDS])
+        if call.return_response:
+            return {"path": path}
+        return None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_CONFIG_KEY,
+        set_config_key_service,
+        schema=SERVICE_SCHEMA_SET_CONFIG_KEY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_CONFIG_KEYS,
+        set_config_keys_service,
+        schema=SERVICE_SCHEMA_SET_CONFIG_KEYS,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CONFIG_SNAPSHOT,
+        get_config_snapshot_service,
+        schema=SERVICE_SCHEMA_GET_CONFIG_SNAPSHOT,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SESSIONS,
+        get_sessions_service,
+        schema=SERVICE_SCHEMA_GET_SESSIONS,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_STATISTICS,
+        import_statistics_service,
+        schema=SERVICE_SCHEMA_IMPORT_STATISTICS,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile_service,
+        schema=SERVICE_SCHEMA_PROFILE,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,183 @@
+"""Charging session transitions of pulsatrix chargers."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import (
+    ATTR_SERIAL_NUMBER,
+    EVENT_SESSION,
+    SESSION_COMPLETED,
+    SESSION_FAILED,
+    SESSION_RESUMED,
+    SESSION_STARTED,
+    SESSION_SUSPENDED,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import PxChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PHASE_IDLE = "idle"
+PHASE_STARTING = "starting"
+PHASE_CHARGING = "charging"
+PHASE_SUSPENDED = "suspended"
+PHASE_COMPLETE = "complete"
+PHASE_FAILED = "failed"
+
+# Session phase of every transaction state in PxChargerStatusCodes.states
+PHASES = {
+    "IDLE": PHASE_IDLE,
+    "AWAITING_START": PHASE_STARTING,
+    "AWAITING_AUTHORIZATION": PHASE_STARTING,
+    "STARTING": PHASE_STARTING,
+    "SUSPENDED_EVSE": PHASE_SUSPENDED,
+    "SUSPENDED_EV": PHASE_SUSPENDED,
+    "CHARGING": PHASE_CHARGING,
+    "FAILED": PHASE_FAILED,
+    "STOPPED": PHASE_COMPLETE,
+    "LINGERING": PHASE_SUSPENDED,
+    "COMPLETE": PHASE_COMPLETE,
+    "COMPLETED": PHASE_COMPLETE,
+}
+
+# Phase changes that are session transitions, all others pass silently
+TRANSITIONS = {
+    (PHASE_IDLE, PHASE_CHARGING): SESSION_STARTED,
+    (PHASE_STARTING, PHASE_CHARGING): SESSION_STARTED,
+    (PHASE_IDLE, PHASE_SUSPENDED): SESSION_STARTED,
+    (PHASE_STARTING, PHASE_SUSPENDED): SESSION_STARTED,
+    (PHASE_COMPLETE, PHASE_CHARGING): SESSION_STARTED,
+    (PHASE_FAILED, PHASE_CHARGING): SESSION_STARTED,
+    (PHASE_CHARGING, PHASE_SUSPENDED): SESSION_SUSPENDED,
+    (PHASE_SUSPENDED, PHASE_CHARGING): SESSION_RESUMED,
+    (PHASE_CHARGING, PHASE_COMPLETE): SESSION_COMPLETED,
+    (PHASE_SUSPENDED, PHASE_COMPLETE): SESSION_COMPLETED,
+    (PHASE_CHARGING, PHASE_IDLE): SESSION_COMPLETED,
+    (PHASE_SUSPENDED, PHASE_IDLE): SESSION_COMPLETED,
+    (PHASE_STARTING, PHASE_FAILED): SESSION_FAILED,
+    (PHASE_CHARGING, PHASE_FAILED): SESSION_FAILED,
+    (PHASE_SUSPENDED, PHASE_FAILED): SESSION_FAILED,
+}
+
+# Phases of a session that has started, a new transaction id in one of them
+# starts a new session whatever the previous phase
+ACTIVE_PHASES = {PHASE_CHARGING, PHASE_SUSPENDED}
+
+TransitionListener = Callable[[str, dict[str, Any], dict[str, Any]], None]
+
+
+def session_energy(data: dict[str, Any]) -> float | None:
+    """Return the energy charged in the session in kWh."""
+    try:
+        return round(float(data["lastMeterValue"]) - float(data["meterStart"]), 3)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def session_duration(data: dict[str, Any]) -> int | None:
+    """Return the duration of the session in seconds, so far if it is ongoing."""
+    try:
+        started = int(data["startedTime"])
+        ended = int(data.get("endedTime") or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not started:
+        return None
+    return max((ended or int(time.time())) - started, 0)
+
+
+class PxSessionTracker:
+    """Turn the tx/status messages of a charger into session transitions.
+
+    Each message is reduced to its session phase, a change of the phase is
+    looked up in the transition table. Only real transitions fire an
+    ``pulsatrix_local_mqtt_session`` event, repeated messages with the same
+    state cost a single comparison. A change of the transaction id while
+    charging or suspended starts a new session, even without a phase change.
+    The first state received, usually the retained one, only initializes the
+    tracker.
+    """
+
+    def __init__(self, coordinator: PxChargerCoordinator) -> None:
+        """Initialize the tracker."""
+        self.coordinator = coordinator
+        self.state: str | None = None
+        self.phase: str | None = None
+        self.session_id: str | None = None
+        self._listeners: list[TransitionListener] = []
+        self._unsubscribe: CALLBACK_TYPE | None = None
+
+    async def async_start(self) -> None:
+        """Follow the transaction status."""
+        self._unsubscribe = await self.coordinator.async_subscribe(
+            "tx/status", self._async_tx_status_received
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the transaction status."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    @callback
+    def async_add_listener(self, listener: TransitionListener) -> CALLBACK_TYPE:
+        """Register a listener for the session transitions.
+
+        The listener is called with the transition, the event data and the
+        tx/status payload. Returns a callable that removes the listener again.
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_tx_status_received(self, data: Any) -> None:
+        """Detect a session transition."""
+        if not isinstance(data, dict):
+            return
+        state = data.get("state")
+        session_id = data.get("id")
+        if state not in PHASES or (
+            state == self.state and session_id == self.session_id
+        ):
+            return
+
+        previous_state, self.state = self.state, state
+        previous_phase, self.phase = self.phase, PHASES[state]
+        previous_id, self.session_id = self.session_id, session_id
+        if (
+            previous_phase is not None
+            and None not in (previous_id, session_id)
+            and previous_id != session_id
+            and self.phase in ACTIVE_PHASES
+        ):
+            transition: str | None = SESSION_STARTED
+        else:
+            transition = TRANSITIONS.get((previous_phase, self.phase))
+        if transition is None:
+            return
+
+        event_data = {
+            ATTR_SERIAL_NUMBER: self.coordinator.serial_number,
+            "type": transition,
+            "from_state": previous_state,
+            "to_state": state,
+            "session_id": session_id,
+            "energy": session_energy(data),
+            "duration": session_duration(data),
+        }
+        _LOGGER.debug("Session transition %s", event_data)
+        self.coordinator.hass.bus.async_fire(EVENT_SESSION, event_data)
+        for listener in tuple(self._listeners):
+            listener(transition, event_data, data)
@@ -0,0 +1,171 @@
+"""Persistent log of the completed charging sessions."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import ATTR_SERIAL_NUMBER, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SESSION_LOG_FILE = f"{DOMAIN}_sessions.jsonl"
+# Seconds new sessions are collected before they are appended to the file
+SESSION_LOG_DELAY = 30
+
+# tx/status fields kept for every session
+SESSION_FIELDS = (
+    "meterStart",
+    "meterStop",
+    "startedTime",
+    "endedTime",
+    "peakActivePower",
+    "startReason",
+)
+
+
+def session_record(
+    serial_number: str, data: dict[str, Any], energy: float | None
+) -> dict[str, Any]:
+    """Return the log record of a session from its tx/status payload."""
+    record = {"id": data.get("id"), ATTR_SERIAL_NUMBER: serial_number}
+    for field in SESSION_FIELDS:
+        record[field] = data.get(field)
+    record["energy"] = energy
+    return record
+
+
+class PxSessionLog:
+    """Append-only JSON lines file of the completed sessions of all chargers.
+
+    The file is read once at startup. New sessions are appended to it in
+    batches, at most every SESSION_LOG_DELAY seconds, the file is never
+    rewritten. Appends are serialised by a lock, so batches reach the file in
+    the order they were flushed. In memory the records are kept sorted by their start time,
+    so a date range is found by bisection.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the session log."""
+        self.hass = hass
+        self.path = hass.config.path(STORAGE_DIR, SESSION_LOG_FILE)
+
+        self._started: list[int] = []
+        self._records: list[dict[str, Any]] = []
+        self._ids: set[tuple[str, str]] = set()
+        self._pending: list[dict[str, Any]] = []
+        self._cancel_write: CALLBACK_TYPE | None = None
+        self._write_lock = asyncio.Lock()
+        # The file does not end with a line break, e.g. after a crash
+        self._needs_newline = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    async def async_load(self) -> None:
+        """Read the logged sessions and write pending ones on shutdown."""
+        for record in await self.hass.async_add_executor_job(self._read):
+            self._async_index(record)
+
+        async def final_write(_event: Event) -> None:
+            await self.async_flush()
+
+        self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, final_write)
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Return the records of the file."""
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # e.g. a line cut off by a crash while appending
+                        _LOGGER.warning("Skipping invalid line in %s", self.path)
+        except FileNotFoundError:
+            pass
+        return records
+
+    @callback
+    def async_add(self, record: dict[str, Any]) -> None:
+        """Log a session unless it is logged already."""
+        if not self._async_index(record):
+            return
+        self._pending.append(record)
+        if self._cancel_write is None:
+            self._cancel_write = async_call_later(
+                self.hass, SESSION_LOG_DELAY, self._async_write_later
+            )
+
+    @callback
+    def _async_index(self, record: dict[str, Any]) -> bool:
+        """Add a record to the index, return False for a known session."""
+        key = (
+            record.get(ATTR_SERIAL_NUMBER),
+            record.get("id") or record.get("startedTime"),
+        )
+        if key in self._ids:
+            return False
+        self._ids.add(key)
+        started = int(record.get("startedTime") or 0)
+        index = bisect_right(self._started, started)
+        self._started.insert(index, started)
+        self._records.insert(index, record)
+        return True
+
+    async def _async_write_later(self, _now) -> None:
+        """Append the sessions collected within the delay."""
+        self._cancel_write = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Append the pending sessions to the file right away."""
+        if self._cancel_write is not None:
+            self._cancel_write()
+            self._cancel_write = None
+        if not self._pending:
+            return
+        lines = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in self._pending
+        )
+        self._pending = []
+        if self._needs_newline:
+            lines = "\n" + lines
+            self._needs_newline = False
+        async with self._write_lock:
+            await self.hass.async_add_executor_job(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        """Append lines to the file."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+    @callback
+    def async_query(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        serial_numbers: set[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the sessions started between start and end (timestamps)."""
+        low = 0 if start is None else bisect_left(self._started, start)
+        high = len(self._started) if end is None else bisect_right(self._started, end)
+        records = self._records[low:high]
+        if serial_numbers is not None:
+            records = [
+                record
+                for record in records
+                if record.get(ATTR_SERIAL_NUMBER) in serial_numbers
+            ]
+        return records
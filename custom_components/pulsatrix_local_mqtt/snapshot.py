@@ -0,0 +1,63 @@
+"""Snapshot of the configuration of a pulsatrix charger."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import callback
+
+from .codec import get_decoder
+from .definitions.binary_sensor import BINARY_SENSORS
+from .definitions.number import NUMBERS
+from .definitions.sensor import SENSORS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sub-topics carrying measurements and states instead of config keys
+STATE_TOPICS = frozenset(
+    description.topic for description in (*SENSORS, *BINARY_SENSORS, *NUMBERS)
+)
+
+
+class PxConfigSnapshot:
+    """Latest value the charger reported for each of its config keys.
+
+    A config key is set on ``{key}/set`` and reported on ``{key}``. The
+    payloads are kept as received and only decoded when compared or read.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty snapshot."""
+        self._decode = get_decoder()
+        self._payloads: dict[str, bytes] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._payloads
+
+    @callback
+    def async_message_received(self, sub_topic: str, payload: bytes) -> None:
+        """Keep the payload of a config key."""
+        if sub_topic in STATE_TOPICS or sub_topic.endswith("/set"):
+            return
+        if payload:
+            self._payloads[sub_topic] = payload
+        else:
+            # An empty retained message clears the key
+            self._payloads.pop(sub_topic, None)
+
+    def differs(self, key: str, payload: str) -> bool:
+        """Return True unless the key is known to have the payload's value."""
+        if key not in self._payloads:
+            return True
+        return self._value(self._payloads[key]) != self._value(payload.encode())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the decoded value of every config key."""
+        return {key: self._value(payload) for key, payload in self._payloads.items()}
+
+    def _value(self, payload: bytes) -> Any:
+        """Decode a payload, plain (non JSON) payloads are returned as text."""
+        try:
+            return self._decode(payload)
+        except ValueError:
+            return payload.decode("utf-8", errors="replace")
@@ -0,0 +1,260 @@
+"""Long-term statistics of the energy charged by pulsatrix chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN, STATISTICS_METER_REGISTER, STATISTICS_SESSIONS
+
+if TYPE_CHECKING:
+    from .sessionlog import PxSessionLog
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# Sensor whose recorded states are backfilled into the meter register statistic
+REGISTER_SENSOR_KEY = "energy_active_import_register"
+
+STATISTICS_NAMES = {
+    STATISTICS_SESSIONS: "Session energy",
+    STATISTICS_METER_REGISTER: "Meter register energy",
+}
+
+
+def statistic_id(serial_number: str, source: str) -> str:
+    """Return the id of the external energy statistic of a charger."""
+    return f"{DOMAIN}:{source}_energy_{serial_number.lower()}"
+
+
+def session_buckets(records: Iterable[dict[str, Any]]) -> dict[int, float]:
+    """Spread the energy of sessions over the hours they lasted.
+
+    The energy is split by the time a session spent in each hour, as if it
+    was charged at a constant power. Returns kWh by hour start (timestamp).
+    """
+    buckets: dict[int, float] = defaultdict(float)
+    for record in records:
+        energy = record.get("energy")
+        started = int(record.get("startedTime") or 0)
+        if not energy or energy < 0 or not started:
+            continue
+        ended = max(int(record.get("endedTime") or 0), started)
+        if ended == started:
+            buckets[started - started % HOUR] += energy
+            continue
+        hour = started - started % HOUR
+        while hour < ended:
+            overlap = min(hour + HOUR, ended) - max(hour, started)
+            buckets[hour] += energy * overlap / (ended - started)
+            hour += HOUR
+    return buckets
+
+
+def register_buckets(states: Iterable[State]) -> dict[int, float]:
+    """Attribute the increases of a meter register to the hours they occurred in.
+
+    A register going down, e.g. after a meter replacement, only sets a new
+    baseline. Returns kWh by hour start (timestamp).
+    """
+    buckets: dict[int, float] = defaultdict(float)
+    last_value = None
+    for state in states:
+        try:
+            value = float(state.state)
+        except ValueError:
+            continue
+        if last_value is not None and value > last_value:
+            updated = int(state.last_updated.timestamp())
+            buckets[updated - updated % HOUR] += value - last_value
+        last_value = value
+    return buckets
+
+
+@callback
+def async_import_buckets(
+    hass: HomeAssistant,
+    serial_number: str,
+    source: str,
+    buckets: dict[int, float],
+    total: float = 0.0,
+) -> int:
+    """Import hourly buckets as a statistic with a running sum.
+
+    The sum continues from total, the sum of the hours before the buckets.
+    Returns the number of hours imported.
+    """
+    statistics = []
+    for hour in sorted(buckets):
+        total += buckets[hour]
+        statistics.append(
+            StatisticData(start=dt_util.utc_from_timestamp(hour), sum=round(total, 3))
+        )
+    if statistics:
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"pulsatrix {serial_number} {STATISTICS_NAMES[source]}",
+            source=DOMAIN,
+            statistic_id=statistic_id(serial_number, source),
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        async_add_external_statistics(hass, metadata, statistics)
+    return len(statistics)
+
+
+@callback
+def async_import_sessions(
+    hass: HomeAssistant, serial_number: str, records: Iterable[dict[str, Any]]
+) -> int:
+    """Import the energy of the logged sessions of a charger."""
+    return async_import_buckets(
+        hass, serial_number, STATISTICS_SESSIONS, session_buckets(records)
+    )
+
+
+class PxSessionStatistics:
+    """Import the energy of the sessions a charger completes hour by hour.
+
+    Only the last imported hour, its energy and the running sum up to it are
+    kept, read from the recorder once. A completed session imports its own
+    hours on top of them, the last hour again if the session shares it. A
+    session that started before the last imported hour changes the sum of
+    later hours, all logged sessions are imported again then.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, serial_number: str, session_log: PxSessionLog
+    ) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self.serial_number = serial_number
+        self.session_log = session_log
+        self.statistic_id = statistic_id(serial_number, STATISTICS_SESSIONS)
+
+        # Start, energy and running sum of the last imported hour
+        self._last: tuple[int, float, float] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_add(self, record: dict[str, Any]) -> int:
+        """Import the hours of a completed session."""
+        async with self._lock:
+            if self._last is None:
+                self._last = await self._async_read_last()
+            buckets = session_buckets([record])
+            if not buckets:
+                return 0
+            hour, energy, total = self._last
+            if min(buckets) < hour:
+                return self._async_rebuild()
+            if hour in buckets:
+                buckets[hour] += energy
+                total -= energy
+            return self._async_import(buckets, total)
+
+    async def async_rebuild(self) -> int:
+        """Import the hours of all logged sessions of the charger again."""
+        async with self._lock:
+            return self._async_rebuild()
+
+    @callback
+    def _async_rebuild(self) -> int:
+        """Import the hours of all logged sessions, holding the lock."""
+        return self._async_import(
+            session_buckets(
+                self.session_log.async_query(serial_numbers={self.serial_number})
+            ),
+            0.0,
+        )
+
+    @callback
+    def _async_import(self, buckets: dict[int, float], total: float) -> int:
+        """Import buckets following the hours with the running sum total."""
+        if buckets:
+            last = max(buckets)
+            self._last = (last, buckets[last], total + sum(buckets.values()))
+        return async_import_buckets(
+            self.hass, self.serial_number, STATISTICS_SESSIONS, buckets, total
+        )
+
+    async def _async_read_last(self) -> tuple[int, float, float]:
+        """Return the last hour of the statistic in the recorder."""
+        rows = (
+            await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 2, self.statistic_id, True, {"sum"}
+            )
+        ).get(self.statistic_id, [])
+        if not rows:
+            return (0, 0.0, 0.0)
+        total = rows[0]["sum"] or 0.0
+        previous = (rows[1]["sum"] or 0.0) if len(rows) > 1 else 0.0
+        return (int(rows[0]["start"]), total - previous, total)
+
+
+async def async_backfill_register(
+    hass: HomeAssistant, serial_number: str, start: datetime
+) -> int:
+    """Import the recorded meter register of a charger from start on.
+
+    The recorded states are read once, afterwards the statistic no longer
+    depends on them and survives their purge. The running sum continues
+    from the hour before the first imported one.
+    """
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{serial_number}-sensor-{REGISTER_SENSOR_KEY}"
+    )
+    if entity_id is None:
+        return 0
+    states = await get_instance(hass).async_add_executor_job(
+        history.state_changes_during_period,
+        hass,
+        start,
+        None,
+        entity_id,
+        True,
+    )
+    buckets = register_buckets(states.get(entity_id, []))
+    if not buckets:
+        return 0
+    total = await _async_sum_before(
+        hass, statistic_id(serial_number, STATISTICS_METER_REGISTER), min(buckets)
+    )
+    return async_import_buckets(
+        hass, serial_number, STATISTICS_METER_REGISTER, buckets, total
+    )
+
+
+async def _async_sum_before(hass: HomeAssistant, statistic: str, hour: int) -> float:
+    """Return the running sum of a statistic at the last hour before hour."""
+    rows = (
+        await get_instance(hass).async_add_executor_job(
+            statistics_during_period,
+            hass,
+            dt_util.utc_from_timestamp(0),
+            dt_util.utc_from_timestamp(hour),
+            {statistic},
+            # A month carries the sum of its last hour, one row per month
+            "month",
+            None,
+            {"sum"},
+        )
+    ).get(statistic, [])
+    if not rows:
+        return 0.0
+    return rows[-1]["sum"] or 0.0
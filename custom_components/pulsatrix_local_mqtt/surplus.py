@@ -0,0 +1,245 @@
+"""PV surplus charging for pulsatrix chargers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
+
+from .const import (
+    CONF_SURPLUS_INTERVAL,
+    CONF_SURPLUS_SENSOR,
+    CONF_SURPLUS_TARGET,
+    DEFAULT_SURPLUS_INTERVAL,
+    DEFAULT_SURPLUS_TARGET,
+    SURPLUS_TARGET_POWER,
+)
+from .coordinator import PxChargerCoordinator
+from .definitions.number import NUMBERS
+from .join import NOMINAL_VOLTAGE, parse_phases
+from .loadmanagement import AMPERAGE_LIMIT
+from .metrics import PxMetricSource
+from .sampling import PxEwmaBuffer
+
+_LOGGER = logging.getLogger(__name__)
+
+POWER_LIMIT = next(d for d in NUMBERS if d.key == "power_limit")
+
+SMOOTHING_SAMPLES = 12
+SMOOTHING_ALPHA = 0.3
+
+
+class PxSurplusController(PxMetricSource):
+    """Charge with the power that would otherwise be exported to the grid.
+
+    The surplus is the exported power (the configured sensor, or a negative
+    meter/grid activePower) plus what the charger draws itself (meter/fiscal).
+    It is smoothed with an EWMA over the most recent samples and turned into
+    the highest amperage or power limit it covers on the phases used in the
+    session, using the measured phase voltages. Below the minimum amperage
+    the minimum limit is kept, there is no verified way to pause charging
+    through a limit.
+
+    The charger gets at most one setpoint per interval: a limit computed
+    within the interval is held back and only the latest one is published
+    when the interval ends.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: PxChargerCoordinator,
+        config_entry: config_entries.ConfigEntry,
+    ) -> None:
+        """Initialize the controller."""
+        super().__init__()
+        self.hass = hass
+        self.coordinator = coordinator
+
+        options = config_entry.options
+        self.export_sensor: str | None = options.get(CONF_SURPLUS_SENSOR) or None
+        self.number = (
+            POWER_LIMIT
+            if options.get(CONF_SURPLUS_TARGET, DEFAULT_SURPLUS_TARGET)
+            == SURPLUS_TARGET_POWER
+            else AMPERAGE_LIMIT
+        )
+        self.interval = options.get(CONF_SURPLUS_INTERVAL, DEFAULT_SURPLUS_INTERVAL)
+
+        self._samples = PxEwmaBuffer(SMOOTHING_SAMPLES, SMOOTHING_ALPHA)
+        self._charger_power = 0.0
+        self._voltages: tuple[float, ...] = (NOMINAL_VOLTAGE,) * 3
+        self._phases: tuple[int, ...] = (0, 1, 2)
+
+        # Last limit published by the controller or set by the user
+        self._limit: float | None = None
+        self._target: float | None = None
+        self._last_publish = -math.inf
+        self._unsubscribe_timer: CALLBACK_TYPE | None = None
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def surplus(self) -> float | None:
+        """Return the smoothed surplus power in W."""
+        return self._samples.value
+
+    async def async_start(self) -> None:
+        """Subscribe to the meters, the used phases and the export sensor."""
+        self._unsubscribe.append(
+            self.coordinator.async_subscribe_setpoint(
+                self.number.key, self._async_setpoint_published
+            )
+        )
+        for sub_topic, handler in (
+            ("meter/fiscal", self._async_fiscal_received),
+            ("charging/status", self._async_charging_status_received),
+        ):
+            self._unsubscribe.append(
+                await self.coordinator.async_subscribe(sub_topic, handler)
+            )
+        if self.export_sensor is None:
+            self._unsubscribe.append(
+                await self.coordinator.async_subscribe(
+                    "meter/grid", self._async_grid_received
+                )
+            )
+        else:
+            self._unsubscribe.append(
+                async_track_state_change_event(
+                    self.hass, [self.export_sensor], self._async_export_changed
+                )
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop controlling the charger."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        if self._unsubscribe_timer is not None:
+            self._unsubscribe_timer()
+            self._unsubscribe_timer = None
+        for task in self._tasks:
+            task.cancel()
+
+    @callback
+    def _async_setpoint_published(self, value: float) -> None:
+        """Take over limits set through the number entity."""
+        self._limit = value
+
+    @callback
+    def _async_fiscal_received(self, data: Any) -> None:
+        """Keep the charger's own power and the phase voltages."""
+        if not isinstance(data, dict):
+            return
+        try:
+            self._charger_power = float(data["activePower"])
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            self._voltages = tuple(float(v) for v in data["voltage"])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    @callback
+    def _async_charging_status_received(self, data: Any) -> None:
+        """Follow phase switches of the session."""
+        if not isinstance(data, dict) or "usedPhasesSession" not in data:
+            return
+        phases = parse_phases(data["usedPhasesSession"]) or (0, 1, 2)
+        if phases != self._phases:
+            self._phases = phases
+            self._async_evaluate()
+
+    @callback
+    def _async_grid_received(self, data: Any) -> None:
+        """Add the power exported according to the grid meter."""
+        if not isinstance(data, dict):
+            return
+        try:
+            export = -float(data["activePower"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self._async_add_export(export)
+
+    @callback
+    def _async_export_changed(self, event: Event) -> None:
+        """Add the power exported according to the export sensor."""
+        state = event.data["new_state"]
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        try:
+            export = float(state.state)
+        except ValueError:
+            return
+        if state.attributes.get("unit_of_measurement") == UnitOfPower.KILO_WATT:
+            export *= 1000
+        self._async_add_export(export)
+
+    @callback
+    def _async_add_export(self, export: float) -> None:
+        """Add a surplus sample and evaluate the limit."""
+        self._samples.add(export + self._charger_power)
+        self._async_evaluate()
+        self._async_update_metrics()
+
+    def compute_limit(self) -> float | None:
+        """Return the highest limit covered by the smoothed surplus."""
+        surplus = self.surplus
+        if surplus is None:
+            return None
+        number = self.number
+        if number is POWER_LIMIT:
+            value = surplus
+        else:
+            voltages = self._voltages
+            value = surplus / sum(
+                voltages[phase] if phase < len(voltages) else NOMINAL_VOLTAGE
+                for phase in self._phases
+            )
+        value = math.floor(value / number.native_step) * number.native_step
+        return max(min(value, number.native_max_value), float(number.native_min_value))
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """Publish the limit now or at the end of the current interval."""
+        self._target = self.compute_limit()
+        if self._target is None or self._unsubscribe_timer is not None:
+            return
+        wait = self._last_publish + self.interval - time.monotonic()
+        if wait > 0:
+            self._unsubscribe_timer = async_call_later(
+                self.hass, wait, self._async_interval_ended
+            )
+        else:
+            self._async_publish_target()
+
+    @callback
+    def _async_interval_ended(self, _now) -> None:
+        """Publish the latest limit computed within the interval."""
+        self._unsubscribe_timer = None
+        self._async_publish_target()
+
+    @callback
+    def _async_publish_target(self) -> None:
+        """Publish the target limit unless the charger already has it."""
+        target = self._target
+        if target is None or target == self._limit:
+            return
+        self._limit = target
+        self._last_publish = time.monotonic()
+        task = self.hass.async_create_task(
+            self.coordinator.async_publish_number(self.number, target)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,84 @@
+"""Per-topic message counters of pulsatrix chargers."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .sampling import PxReservoir
+
+# Decode and extract times kept per topic for the percentiles
+RESERVOIR_SIZE = 256
+
+
+class PxTopicStats:
+    """Count the messages of a topic and the state writes they caused.
+
+    The receive time and the decode and extract times of every message are
+    taken, the times are kept in fixed-size reservoirs so the cost per
+    message stays constant. Rates, ages and percentiles are only computed
+    when the counters are read.
+    """
+
+    __slots__ = (
+        "messages",
+        "parse_errors",
+        "writes",
+        "suppressed",
+        "first_message",
+        "last_message",
+        "decode_times",
+        "extract_times",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.messages = 0
+        self.parse_errors = 0
+        self.writes = 0
+        self.suppressed = 0
+        self.first_message = 0.0
+        self.last_message = 0.0
+        self.decode_times = PxReservoir(RESERVOIR_SIZE)
+        self.extract_times = PxReservoir(RESERVOIR_SIZE)
+
+    def message_received(self, received: float) -> None:
+        """Count a message received at the given perf_counter time."""
+        if not self.messages:
+            self.first_message = received
+        self.messages += 1
+        self.last_message = received
+
+    def message_timed(self, received: float, decoded: float, extracted: float) -> None:
+        """Record the perf_counter receive, decoded and extracted times."""
+        self.decode_times.add(decoded - received)
+        self.extract_times.add(extracted - decoded)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters with the derived rates and percentiles."""
+        now = time.perf_counter()
+        duration = self.last_message - self.first_message
+        decode_p50, decode_p99, extract_p50, extract_p99 = (
+            None if value is None else round(value * 1000, 3)
+            for value in (
+                self.decode_times.percentile(50),
+                self.decode_times.percentile(99),
+                self.extract_times.percentile(50),
+                self.extract_times.percentile(99),
+            )
+        )
+        return {
+            "messages": self.messages,
+            "messages_per_second": (
+                round((self.messages - 1) / duration, 3) if duration > 0 else None
+            ),
+            "decode_time_p50_ms": decode_p50,
+            "decode_time_p99_ms": decode_p99,
+            "extract_time_p50_ms": extract_p50,
+            "extract_time_p99_ms": extract_p99,
+            "state_writes": self.writes,
+            "state_writes_suppressed": self.suppressed,
+            "parse_errors": self.parse_errors,
+            "last_message_age": (
+                round(now - self.last_message, 1) if self.messages else None
+            ),
+        }
@@ -0,0 +1,77 @@
+"""End-to-end latency tracing of pulsatrix chargers."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .coordinator import PxChargerCoordinator
+from .metrics import PxMetricSource
+from .sampling import PxReservoir
+
+_LOGGER = logging.getLogger(__name__)
+
+# State writes kept for the percentiles
+RESERVOIR_SIZE = 512
+# Seconds between two updates of the latency sensors
+PUBLISH_INTERVAL = 10
+
+
+class PxLatencyTracer(PxMetricSource):
+    """Measure the time from the receipt of a message to its state writes.
+
+    The coordinator stamps every message it dispatches, each entity state
+    written while the message is handled adds the time since then to a
+    fixed-size reservoir. The percentiles are only computed when the latency
+    sensors are updated, the writes of these sensors are not traced.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: PxChargerCoordinator) -> None:
+        """Initialize the tracer."""
+        super().__init__()
+        self.hass = hass
+        self.coordinator = coordinator
+
+        # perf_counter receipt time of the message being dispatched
+        self.received: float | None = None
+        self.writes = 0
+        self.p50: float | None = None
+        self.p95: float | None = None
+        self.maximum: float | None = None
+
+        self._latencies = PxReservoir(RESERVOIR_SIZE)
+        self._unsubscribe_timer: CALLBACK_TYPE | None = None
+
+    async def async_start(self) -> None:
+        """Start updating the latency sensors."""
+        self._unsubscribe_timer = async_track_time_interval(
+            self.hass, self._async_publish, timedelta(seconds=PUBLISH_INTERVAL)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop updating the latency sensors."""
+        if self._unsubscribe_timer is not None:
+            self._unsubscribe_timer()
+            self._unsubscribe_timer = None
+
+    @callback
+    def async_state_written(self) -> None:
+        """Record a state written for the message being dispatched."""
+        if self.received is not None:
+            self._latencies.add(time.perf_counter() - self.received)
+            self.writes += 1
+
+    @callback
+    def _async_publish(self, _now=None) -> None:
+        """Update the latency sensors from the recorded state writes."""
+        latencies = self._latencies
+        if not latencies.count:
+            return
+        self.p50, self.p95, self.maximum = (
+            round(latencies.percentile(percent) * 1000, 2) for percent in (50, 95, 100)
+        )
+        self._async_update_metrics()
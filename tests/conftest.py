@@ -1,10 +1,52 @@
 """pytest fixtures."""
+import json
+from pathlib import Path
+import sys
 from unittest.mock import MagicMock
 
 from homeassistant import core as ha
 from homeassistant.components import mqtt
 from homeassistant.setup import async_setup_component
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.pulsatrix_local_mqtt.const import (
+    CONF_SERIAL_NUMBER,
+    CONF_TOPIC_PREFIX,
+    DOMAIN,
+)
+
+# Topic prefix of the charger of the config_entry fixture
+PREFIX = "pulsatrix/secc/0F7E9A442C7B"
+
+
+def pytest_addoption(parser):
+    """Add the option enforcing the benchmark timings."""
+    parser.addoption(
+        "--assert-timings",
+        action="store_true",
+        default=False,
+        help="fail the benchmarks on wall clock regressions (needs a quiet machine)",
+    )
+
+
+@pytest.fixture
+def assert_timings(request) -> bool:
+    """Return True if the benchmarks assert their wall clock thresholds.
+
+    Off by default, the timings of shared CI runners are too noisy. Line
+    tracing (e.g. coverage) distorts them as well.
+    """
+    return request.config.getoption("--assert-timings") and sys.gettrace() is None
+
+
+def published(mqtt_mock, sub_topic: str) -> list[str]:
+    """Return the payloads published to a sub-topic of the charger."""
+    return [
+        call.args[1]
+        for call in mqtt_mock.async_publish.call_args_list
+        if call.args[0] == f"{PREFIX}/{sub_topic}"
+    ]
 
 
 @ha.callback
@@ -22,6 +64,12 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     yield
 
 
+@pytest.fixture(autouse=True)
+def isolated_config_dir(hass, tmp_path):
+    """Keep the files written by the integration out of the shared test config."""
+    hass.config.config_dir = str(tmp_path)
+
+
 @pytest.fixture(autouse=True)
 def mock_dependencies(hass):
     """Mock dependencies loaded."""
@@ -53,3 +101,35 @@ async def mqtt_mock(hass, mqtt_client_mock, mqtt_config):
     component = hass.data["mqtt"]
     component.reset_mock()
     return component
+
+
+@pytest.fixture
+def config_entry(hass):
+    """Return a pulsatrix config entry added to hass."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="pulsatrix charger 0F7E9A442C7B",
+        data={
+            CONF_SERIAL_NUMBER: "0F7E9A442C7B",
+            CONF_TOPIC_PREFIX: "pulsatrix/secc",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture(scope="session")
+def capture_payloads() -> list[tuple[str, str]]:
+    """Return the (sub-topic, payload) pairs recorded in mqtt-capture.log."""
+    capture = Path(__file__).parent.parent / "mqtt-capture.log"
+    decoder = json.JSONDecoder()
+    payloads = []
+    for block in capture.read_text().split("--------------"):
+        topic, _, text = block.strip().partition("\n")
+        sub_topic = topic.strip().split("/", 3)[3]
+        text = text.strip()
+        while text:
+            data, end = decoder.raw_decode(text)
+            payloads.append((sub_topic, json.dumps(data)))
+            text = text[end:].strip()
+    return payloads
@@ -0,0 +1,176 @@
+"""Benchmark replaying MQTT traffic through the pulsatrix entities.
+
+The replay runs against the in-process MQTT mock, so it needs no broker.
+Run with ``pytest tests/test_benchmark.py -s --no-cov`` to see the report,
+add ``--assert-timings`` to fail on a rate below the threshold.
+"""
+import json
+import random
+import time
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.pulsatrix_local_mqtt.binary_sensor import PxChargerBinarySensor
+from custom_components.pulsatrix_local_mqtt.const import (
+    CONF_SERIAL_NUMBER,
+    CONF_TOPIC_PREFIX,
+    DOMAIN,
+)
+from custom_components.pulsatrix_local_mqtt.definitions.binary_sensor import (
+    BINARY_SENSORS,
+)
+from custom_components.pulsatrix_local_mqtt.definitions.sensor import SENSORS
+from custom_components.pulsatrix_local_mqtt.sensor import PxChargerSensor
+
+SERIAL_NUMBER = "0F7E9A442C7B"
+# Not a prefix of the manifest, so MQTT discovery stays out of the measurement
+TOPIC_PREFIX = "benchmark/secc"
+ROUNDS = 200
+
+# Regression thresholds, the rate is only enforced with --assert-timings
+MIN_MESSAGES_PER_SECOND = 1000
+MAX_WRITES_PER_MESSAGE = {
+    "tx/status": 3.5,
+    "meter/fiscal": 4.0,
+    "meter/grid": 4.0,
+    "charging/status": 2.5,
+    "chargingPoint/status": 2.0,
+}
+
+
+def synthesized_payloads(
+    capture_payloads: list[tuple[str, str]], rounds: int
+) -> list[tuple[str, str]]:
+    """Return the captured traffic plus synthesized messages for all topics.
+
+    The meter readings jitter like a real meter, the status topics cycle
+    through their codes.
+    """
+    rng = random.Random(0)
+    fiscal = next(json.loads(p) for t, p in capture_payloads if t == "meter/fiscal")
+    tx_states = ["CHARGING", "SUSPENDED_EV", "CHARGING", "COMPLETED"]
+    vehicle_states = ["B", "C", "C", "B"]
+    connector_states = ["Occupied", "Occupied", "Available", "Faulted"]
+
+    def meter(step: int) -> str:
+        return json.dumps(
+            {
+                **fiscal,
+                "voltage": [round(230 + rng.uniform(-0.6, 0.6), 3) for _ in range(3)],
+                "amperage": [round(15.8 + rng.uniform(-0.1, 0.1), 3) for _ in range(3)],
+                "frequency": round(50 + rng.uniform(-0.05, 0.05), 4),
+                "activePower": round(10900 + rng.uniform(-150, 150), 1),
+                "energyImported": fiscal["energyImported"] + step * 0.01,
+            }
+        )
+
+    payloads = list(capture_payloads)
+    for step in range(rounds):
+        tx = json.loads(capture_payloads[0][1])
+        tx["state"] = tx_states[step % 4]
+        tx["lastActivePower"] = round(rng.uniform(0, 11000), 1)
+        payloads += [
+            ("meter/fiscal", meter(step)),
+            ("meter/grid", meter(step)),
+            ("tx/status", json.dumps(tx)),
+            (
+                "charging/status",
+                json.dumps(
+                    {
+                        "chargeControllerStatus": "C2",
+                        "vehicleStatus": vehicle_states[step % 4],
+                        "availableAmperage": 16,
+                        "signaledAmperage": rng.choice([6, 10, 16]),
+                        "chargingDuration": step * 60000,
+                        "usedPhasesSession": "L1L2L3",
+                        "recentCpErrorCause": 0,
+                        "plugRetentionLock": True,
+                    }
+                ),
+            ),
+            (
+                "chargingPoint/status",
+                json.dumps({"connectorStatus": connector_states[step % 4]}),
+            ),
+        ]
+    return payloads
+
+
+async def test_replay_benchmark(
+    hass: HomeAssistant,
+    mock_hass_config,
+    mqtt_mock_entry,
+    capture_payloads,
+    assert_timings,
+) -> None:
+    """Replay traffic through all sensors and binary sensors."""
+    await mqtt_mock_entry()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_SERIAL_NUMBER: SERIAL_NUMBER, CONF_TOPIC_PREFIX: TOPIC_PREFIX},
+    )
+    entry.add_to_hass(hass)
+
+    # Enable the entities that are disabled by default
+    registry = er.async_get(hass)
+    for description in (*SENSORS, *BINARY_SENSORS):
+        if not description.disabled:
+            registry.async_get_or_create(
+                description.domain,
+                DOMAIN,
+                f"{SERIAL_NUMBER}-{description.domain}-{description.key}",
+                suggested_object_id=f"pulsatrix_{SERIAL_NUMBER}_{description.key}",
+                disabled_by=None,
+            )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    messages: dict[str, list[tuple[str, str]]] = {}
+    for sub_topic, payload in synthesized_payloads(capture_payloads, ROUNDS):
+        messages.setdefault(sub_topic, []).append(
+            (f"{TOPIC_PREFIX}/{SERIAL_NUMBER}/{sub_topic}", payload)
+        )
+    writes = 0
+    original_write = PxChargerSensor.async_write_ha_state
+
+    def counting_write(entity) -> None:
+        nonlocal writes
+        writes += 1
+        original_write(entity)
+
+    report = []
+    with patch.object(
+        PxChargerSensor, "async_write_ha_state", counting_write
+    ), patch.object(PxChargerBinarySensor, "async_write_ha_state", counting_write):
+        for sub_topic, topic_messages in messages.items():
+            writes = 0
+            start = time.perf_counter()
+            for topic, payload in topic_messages:
+                async_fire_mqtt_message(hass, topic, payload)
+            await hass.async_block_till_done()
+            elapsed = time.perf_counter() - start
+            report.append((sub_topic, len(topic_messages), elapsed, writes))
+
+    entity_id = registry.async_get_entity_id(
+        "binary_sensor", DOMAIN, f"{SERIAL_NUMBER}-binary_sensor-connector_faulted"
+    )
+    assert hass.states.get(entity_id).state == "on"
+
+    print()
+    for sub_topic, count, elapsed, topic_writes in report:
+        rate = count / elapsed
+        writes_per_message = topic_writes / count
+        print(
+            f"{sub_topic}: {rate:.0f} messages/s,"
+            f" {elapsed / count * 1e6:.1f} µs per message,"
+            f" {writes_per_message:.2f} state writes per message"
+        )
+        assert 0 < writes_per_message <= MAX_WRITES_PER_MESSAGE[sub_topic], sub_topic
+        if assert_timings:
+            assert rate >= MIN_MESSAGES_PER_SECOND, sub_topic
@@ -0,0 +1,41 @@
+"""Test and benchmark the pulsatrix payload codecs."""
+import timeit
+
+import pytest
+
+from custom_components.pulsatrix_local_mqtt import codec
+
+
+def test_get_decoder() -> None:
+    """Test decoder selection and registration."""
+    assert codec.get_decoder(codec.CODEC_JSON)(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert codec.get_decoder()(b'{"a": 1.5}') == {"a": 1.5}
+    with pytest.raises(ValueError):
+        codec.get_decoder()(b"not json")
+
+    codec.register_codec("upper", lambda payload: payload.upper())
+    assert codec.get_decoder("upper")(b"abc") == b"ABC"
+
+
+def test_decode_benchmark(capture_payloads, assert_timings) -> None:
+    """Report the decode cost per message for each available codec."""
+    shapes = {}
+    for topic, payload in capture_payloads:
+        shapes.setdefault(topic, payload.encode())
+
+    results = {}
+    for name in (codec.CODEC_JSON, codec.CODEC_ORJSON):
+        try:
+            decode = codec.get_decoder(name)
+        except KeyError:
+            continue
+        for topic, payload in shapes.items():
+            seconds = min(
+                timeit.repeat(lambda: decode(payload), number=5000, repeat=5)
+            )
+            results[name, topic] = seconds / 5000
+            print(f"{name} {topic}: {seconds / 5000 * 1e6:.2f} µs per message")
+
+    if (codec.CODEC_ORJSON, "tx/status") in results and assert_timings:
+        for topic in shapes:
+            assert results[codec.CODEC_ORJSON, topic] < results[codec.CODEC_JSON, topic]
@@ -35,3 +35,45 @@ async def test_form(hass: HomeAssistant) -> None:
         "topic_prefix": "/pulsatrix",
     }
     assert len(mock_setup_entry.mock_calls) == 1
+
+
+async def test_options_flow(hass: HomeAssistant, config_entry) -> None:
+    """Test the options flow."""
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] == RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    with patch(
+        "custom_components.pulsatrix_local_mqtt.async_setup_entry", return_value=True
+    ):
+        result2 = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {
+                "force_refresh": 15,
+                "deadband_voltage": " 2 % ",
+                "tariff": "22:00=0.3,7:00=0.4",
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result2["type"] == RESULT_TYPE_CREATE_ENTRY
+    assert config_entry.options["force_refresh"] == 15
+    assert config_entry.options["deadband_voltage"] == "2%"
+    assert config_entry.options["deadband_frequency"] == "0.05"
+    assert config_entry.options["tariff"] == "00:00=0.3, 07:00=0.4, 22:00=0.3"
+
+
+async def test_options_flow_surplus_conflict(hass: HomeAssistant, config_entry) -> None:
+    """Test that surplus charging cannot set the amperage limit of load management."""
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            "load_management": True,
+            "surplus_charging": True,
+            "surplus_target": "amperage",
+        },
+    )
+
+    assert result2["type"] == RESULT_TYPE_FORM
+    assert result2["errors"] == {"surplus_target": "surplus_target_conflict"}
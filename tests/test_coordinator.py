@@ -0,0 +1,115 @@
+"""Test the pulsatrix (MQTT) topic coordinator."""
+import json
+from unittest.mock import Mock, patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import DOMAIN
+
+TX_STATUS = (
+    '{"id": "a1", "state": "CHARGING", "effectiveAmperageLimit": 16,'
+    ' "startedTime": 1691343029, "endedTime": 0, "startReason": "CablePluggedIn",'
+    ' "lastMeterValue": 3645.906982, "lastActivePower": 2119.759277,'
+    ' "meterStart": 3643.753906, "meterStop": 3643.753906,'
+    ' "peakActivePower": 3479.479492}'
+)
+
+
+async def test_one_subscription_and_decode(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that chargers share one subscription and decode once per message."""
+    mqtt_mock = await mqtt_mock_entry()
+    loads = Mock(wraps=json.loads)
+    with patch(
+        "custom_components.pulsatrix_local_mqtt.coordinator.get_decoder",
+        return_value=loads,
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        other_entry = MockConfigEntry(
+            domain=DOMAIN,
+            title="pulsatrix charger 0F7E9A442C7C",
+            data={"serial_number": "0F7E9A442C7C", "topic_prefix": "pulsatrix/secc"},
+        )
+        other_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(other_entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Discovery subscriptions from the manifest are made by the mqtt component
+    subscribed = [
+        call.args[0]
+        for call in mqtt_mock.async_subscribe.call_args_list
+        if call.args[0].startswith("pulsatrix/secc/")
+    ]
+    assert subscribed.count("pulsatrix/secc/+/#") == 1
+    assert not [topic for topic in subscribed if "0F7E9A442C7" in topic]
+
+    async_fire_mqtt_message(hass, "pulsatrix/secc/0F7E9A442C7B/tx/status", TX_STATUS)
+    await hass.async_block_till_done()
+    assert loads.call_count == 1
+
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7b_state").state == "Charging"
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7b_energy").state == "2.15"
+    assert hass.states.get("binary_sensor.pulsatrix_0f7e9a442c7b_charging").state == "on"
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7c_state").state == "Idle"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.entry_id not in hass.data[DOMAIN]
+
+
+
+async def test_retained_replay(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that chargers loaded later get the retained messages they missed."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Delivered once for the wildcard subscription of the first charger
+    for serial_number in ("0F7E9A442C7B", "0F7E9A442C7C"):
+        prefix = f"pulsatrix/secc/{serial_number}"
+        async_fire_mqtt_message(hass, f"{prefix}/tx/status", TX_STATUS, retain=True)
+        async_fire_mqtt_message(
+            hass, f"{prefix}/charging/amperageLimit", "13.0", retain=True
+        )
+        async_fire_mqtt_message(hass, f"{prefix}/config/maxCurrent", "32", retain=True)
+    # Later messages of the topic are not flagged as retained
+    async_fire_mqtt_message(
+        hass, "pulsatrix/secc/0F7E9A442C7C/charging/amperageLimit", "16.0"
+    )
+    await hass.async_block_till_done()
+
+    other_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="pulsatrix charger 0F7E9A442C7C",
+        data={"serial_number": "0F7E9A442C7C", "topic_prefix": "pulsatrix/secc"},
+    )
+    other_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(other_entry.entry_id)
+    await hass.async_block_till_done()
+
+    other = hass.data[DOMAIN][other_entry.entry_id]
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7c_state").state == "Charging"
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7c_energy").state == "2.15"
+    assert other.setpoints["amperage_limit"] == 16.0
+    assert other.config.as_dict() == {"config/maxCurrent": 32}
+
+    # Reloading a charger of the fleet keeps the shared subscription
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert coordinator.setpoints["amperage_limit"] == 13.0
+    assert coordinator.config.as_dict() == {"config/maxCurrent": 32}
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7b_state").state == "Charging"
+
+    # An empty message clears the topic
+    async_fire_mqtt_message(hass, "pulsatrix/secc/0F7E9A442C7C/config/maxCurrent", "")
+    await hass.async_block_till_done()
+    assert other.router.async_get_retained("0F7E9A442C7C", "config/maxCurrent") is None
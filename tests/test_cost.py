@@ -0,0 +1,125 @@
+"""Test the pulsatrix (MQTT) charging cost."""
+from datetime import datetime, timedelta
+import json
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+from custom_components.pulsatrix_local_mqtt.cost import PxTariff
+
+PREFIX = "pulsatrix/secc/0F7E9A442C7B"
+SESSION_COST = "sensor.pulsatrix_0f7e9a442c7b_session_cost"
+MONTHLY_COST = "sensor.pulsatrix_0f7e9a442c7b_monthly_cost"
+
+
+def test_tariff() -> None:
+    """Test that the tariff is parsed into sorted segments."""
+    tariff = PxTariff.parse("22:00=0.2, 07:00=0.4")
+    # The last price of the day wraps around midnight
+    assert str(tariff) == "00:00=0.2, 07:00=0.4, 22:00=0.2"
+    assert tariff.segment(0) == (0.2, 7 * 3600)
+    assert tariff.segment(7 * 3600) == (0.4, 22 * 3600)
+    assert tariff.segment(23 * 3600) == (0.2, 86400)
+
+
+@pytest.mark.parametrize("value", ["", "07:00", "25:00=0.3", "07:00=a", "7=0.1, 07:00=0.2"])
+def test_tariff_invalid(value: str) -> None:
+    """Test that invalid tariffs are rejected."""
+    with pytest.raises(ValueError):
+        PxTariff.parse(value)
+
+
+async def test_cost(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry, freezer
+) -> None:
+    """Test that the imported energy is priced by the time of day."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"tariff": "00:00=0.2, 07:00=0.4, 22:00=0.2"}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def meter(time: datetime, energy: float) -> None:
+        freezer.move_to(time.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE))
+        async_fire_mqtt_message(
+            hass, f"{PREFIX}/meter/fiscal", json.dumps({"energyImported": energy})
+        )
+        await hass.async_block_till_done()
+
+    def costs() -> tuple[str, str]:
+        return (hass.states.get(SESSION_COST).state, hass.states.get(MONTHLY_COST).state)
+
+    # The first reading only sets the baseline
+    await meter(datetime(2024, 1, 31, 6, 30), 100.0)
+    await meter(datetime(2024, 1, 31, 6, 45), 102.0)
+    assert costs() == ("0.4", "0.4")
+    assert hass.states.get(SESSION_COST).attributes["price"] == 0.2
+    await meter(datetime(2024, 1, 31, 7, 15), 103.0)
+    assert costs() == ("0.8", "0.8")
+
+    # A new session starts the session cost over
+    for state in ("IDLE", "CHARGING"):
+        async_fire_mqtt_message(hass, f"{PREFIX}/tx/status", json.dumps({"state": state}))
+        await hass.async_block_till_done()
+    await meter(datetime(2024, 1, 31, 22, 0), 104.0)
+    assert costs() == ("0.2", "1.0")
+
+    # A new month starts the monthly cost over
+    await meter(datetime(2024, 2, 1, 0, 30), 106.0)
+    assert costs() == ("0.6", "0.4")
+    assert hass.states.get(MONTHLY_COST).attributes["month"] == "2024-02"
+
+    # A meter reset is not charged
+    await meter(datetime(2024, 2, 1, 0, 45), 0.0)
+    await meter(datetime(2024, 2, 1, 1, 0), 1.0)
+    assert costs() == ("0.8", "0.6")
+    assert hass.states.get(SESSION_COST).attributes["unit_of_measurement"] == (
+        hass.config.currency
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_cost_saved(
+    hass: HomeAssistant,
+    mock_hass_config,
+    mqtt_mock_entry,
+    config_entry,
+    freezer,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test that the totals are saved while charging and on transitions."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(config_entry, options={"tariff": "00:00=0.2"})
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    key = "pulsatrix_local_mqtt_cost_0F7E9A442C7B"
+
+    # A reading every 10 seconds does not push the save back
+    start = dt_util.utcnow()
+    for seconds in range(0, 90, 10):
+        freezer.move_to(start + timedelta(seconds=seconds))
+        async_fire_mqtt_message(
+            hass,
+            f"{PREFIX}/meter/fiscal",
+            json.dumps({"energyImported": 100.0 + seconds / 10}),
+        )
+        async_fire_time_changed(hass, start + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+    # Saved 60 seconds after the first priced reading
+    assert hass_storage[key]["data"]["energy"] == 107.0
+
+    # A new session is saved right away
+    for state in ("IDLE", "CHARGING"):
+        async_fire_mqtt_message(hass, f"{PREFIX}/tx/status", json.dumps({"state": state}))
+        await hass.async_block_till_done()
+    assert hass_storage[key]["data"]["session_cost"] == 0.0
+    assert hass_storage[key]["data"]["energy"] == 108.0
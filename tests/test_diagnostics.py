@@ -0,0 +1,71 @@
+"""Test the pulsatrix (MQTT) diagnostics."""
+import json
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+
+from custom_components.pulsatrix_local_mqtt.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.pulsatrix_local_mqtt.sampling import PxReservoir
+
+PREFIX = "pulsatrix/secc/0F7E9A442C7B"
+
+
+def test_reservoir() -> None:
+    """Test that the reservoir keeps only the most recent samples."""
+    reservoir = PxReservoir(4)
+    assert reservoir.percentile(50) is None
+    for value in (100, 1, 2, 3, 4):
+        reservoir.add(value)
+    assert reservoir.percentile(50) == 2
+    assert reservoir.percentile(99) == 4
+    assert reservoir.percentile(0) == 1
+
+
+async def test_topic_diagnostics(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that messages, state writes and parse errors are counted per topic."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    status = json.dumps({"state": "CHARGING", "startedTime": 1691343029})
+    for payload in (status, status, "not json"):
+        async_fire_mqtt_message(hass, f"{PREFIX}/tx/status", payload)
+        await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    assert diagnostics["entry"]["data"]["serial_number"] == "0F7E9A442C7B"
+    tx_status = diagnostics["topics"]["tx/status"]
+    assert tx_status["messages"] == 3
+    assert tx_status["parse_errors"] == 1
+    assert tx_status["state_writes"] > 0
+    # The repeated payload changes no state
+    assert tx_status["state_writes_suppressed"] > 0
+    assert tx_status["decode_time_p50_ms"] >= 0
+    assert tx_status["extract_time_p99_ms"] >= tx_status["extract_time_p50_ms"] >= 0
+    assert tx_status["messages_per_second"] > 0
+    assert tx_status["last_message_age"] >= 0
+    assert diagnostics["topics"]["charging/powerLimit"]["last_message_age"] is None
+
+
+async def test_topic_diagnostics_single_message(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a single message is timed but gives no rate yet."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async_fire_mqtt_message(hass, f"{PREFIX}/tx/status", json.dumps({"state": "IDLE"}))
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    tx_status = diagnostics["topics"]["tx/status"]
+    assert tx_status["messages"] == 1
+    assert tx_status["messages_per_second"] is None
+    assert tx_status["decode_time_p50_ms"] >= 0
+    assert tx_status["extract_time_p50_ms"] >= 0
+    assert tx_status["last_message_age"] >= 0
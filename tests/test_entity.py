@@ -0,0 +1,33 @@
+"""Test the pulsatrix (MQTT) entity base class."""
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+
+from custom_components.pulsatrix_local_mqtt.sensor import PxChargerSensor
+
+TX_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/tx/status"
+TX_STATUS = (
+    '{"id": "a1", "state": "CHARGING", "effectiveAmperageLimit": 16,'
+    ' "startedTime": 1691343029, "endedTime": 0, "startReason": "CablePluggedIn",'
+    ' "lastMeterValue": 3645.906982, "lastActivePower": 2119.759277,'
+    ' "meterStart": 3643.753906, "meterStop": 3643.753906,'
+    ' "peakActivePower": 3479.479492}'
+)
+
+
+async def test_unchanged_state_is_not_written(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that repeated identical payloads do not cause state writes."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async_fire_mqtt_message(hass, TX_STATUS_TOPIC, TX_STATUS)
+    await hass.async_block_till_done()
+
+    with patch.object(PxChargerSensor, "async_write_ha_state") as write_state:
+        async_fire_mqtt_message(hass, TX_STATUS_TOPIC, TX_STATUS)
+        await hass.async_block_till_done()
+    assert write_state.call_count == 0
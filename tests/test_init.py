@@ -0,0 +1,94 @@
+"""Test the pulsatrix (MQTT) setup and unload."""
+import gc
+from types import FunctionType
+
+from homeassistant.components.mqtt import DATA_MQTT
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+
+from custom_components.pulsatrix_local_mqtt.const import (
+    DATA_CHARGERS,
+    DATA_ROUTERS,
+    DOMAIN,
+)
+from custom_components.pulsatrix_local_mqtt.coordinator import async_get_coordinator
+
+PACKAGE = "custom_components.pulsatrix_local_mqtt"
+TX_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/tx/status"
+TX_STATUS = '{"id": "a1", "state": "CHARGING", "startedTime": 0, "endedTime": 0}'
+
+
+def integration_objects() -> int:
+    """Return the number of live objects created by the integration.
+
+    Objects of Home Assistant itself are left out, as some of them (e.g. the
+    entity platforms of unloaded entries) outlive a reload in the core.
+    """
+    gc.collect()
+    count = 0
+    for obj in gc.get_objects():
+        module = obj.__module__ if isinstance(obj, FunctionType) else type(obj).__module__
+        if isinstance(module, str) and module.startswith(PACKAGE):
+            count += 1
+    return count
+
+
+def pulsatrix_subscriptions(hass: HomeAssistant) -> list[str]:
+    """Return the MQTT subscriptions made for the chargers."""
+    client = hass.data[DATA_MQTT].client._mock_wraps
+    return [
+        subscription.topic
+        for subscription in client.subscriptions
+        if subscription.topic == "pulsatrix/secc/+/#"
+    ]
+
+
+async def test_unload(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that unloading releases all subscriptions."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert pulsatrix_subscriptions(hass) == ["pulsatrix/secc/+/#"]
+    assert async_get_coordinator(hass, "0F7E9A442C7B") is (
+        hass.data[DOMAIN][config_entry.entry_id]
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.state is ConfigEntryState.NOT_LOADED
+    assert pulsatrix_subscriptions(hass) == []
+    assert hass.data[DOMAIN] == {}
+    assert hass.data[DATA_CHARGERS] == {}
+    assert async_get_coordinator(hass, "0F7E9A442C7B") is None
+    assert not hass.data[DATA_ROUTERS]["pulsatrix/secc"].has_handlers
+
+
+async def test_reload_soak(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that repeated reloads keep subscriptions and memory flat."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def reload(count: int) -> None:
+        for _ in range(count):
+            assert await hass.config_entries.async_reload(config_entry.entry_id)
+            await hass.async_block_till_done()
+            async_fire_mqtt_message(hass, TX_STATUS_TOPIC, TX_STATUS)
+            await hass.async_block_till_done()
+
+    # Warm up caches before measuring
+    await reload(50)
+    baseline = integration_objects()
+    await reload(450)
+
+    assert pulsatrix_subscriptions(hass) == ["pulsatrix/secc/+/#"]
+    router = hass.data[DATA_ROUTERS]["pulsatrix/secc"]
+    # The sensor topics and the read back limits
+    assert len(router._handlers) == 7
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7b_state").state == "Charging"
+    assert integration_objects() - baseline == 0
@@ -0,0 +1,70 @@
+"""Test the pulsatrix (MQTT) load management."""
+import json
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+
+from custom_components.pulsatrix_local_mqtt.const import DOMAIN
+
+from .conftest import PREFIX, published
+
+
+def amperage_payload(amperage: tuple[float, float, float]) -> str:
+    """Return a meter payload with the given per phase amperage."""
+    return json.dumps({"amperage": list(amperage), "activePower": 0})
+
+
+async def test_load_management(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the amperage limit follows the grid load."""
+    mqtt_mock = await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            "load_management": True,
+            "main_fuse": 20,
+            "hysteresis": 1,
+            "min_dwell": 60,
+            "fallback_timeout": 5,
+        },
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    controller = hass.data[DOMAIN][config_entry.entry_id].load_controller
+    assert published(mqtt_mock, "charging/limitTimeout") == ["300000"]
+
+    async def grid(*amperage: float) -> None:
+        async_fire_mqtt_message(hass, f"{PREFIX}/meter/grid", amperage_payload(amperage))
+        await hass.async_block_till_done()
+
+    async_fire_mqtt_message(
+        hass, f"{PREFIX}/meter/fiscal", amperage_payload((10, 10, 10))
+    )
+    # 8 A household load on the most loaded phase leaves 12 A
+    await grid(18, 12, 12)
+    await grid(18, 12, 12)
+    # Lowering is never delayed
+    await grid(18.6, 12, 12)
+    # Raising within the hysteresis or the dwell time is skipped
+    await grid(18, 12, 12)
+    await grid(16, 12, 12)
+    assert published(mqtt_mock, "charging/amperageLimit") == ["12.0", "11.0"]
+
+    controller._last_change -= 60
+    await grid(16, 12, 12)
+    # Without headroom for the minimum amperage the limit stays at the minimum
+    await grid(27, 12, 12)
+    assert published(mqtt_mock, "charging/amperageLimit") == [
+        "12.0",
+        "11.0",
+        "14.0",
+        "6.0",
+    ]
+
+    assert hass.states.get("number.pulsatrix_0f7e9a442c7b_amperage_limit").state == "6.0"
+    assert hass.states.get(
+        "sensor.pulsatrix_0f7e9a442c7b_load_management_publishes"
+    ).state == "4"
+    latency = hass.states.get("sensor.pulsatrix_0f7e9a442c7b_load_management_latency")
+    assert float(latency.state) >= 0
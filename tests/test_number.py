@@ -0,0 +1,192 @@
+"""Test the pulsatrix (MQTT) number entities."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.components.number import ATTR_VALUE, DOMAIN as NUMBER_DOMAIN, SERVICE_SET_VALUE
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+ENTITY_ID = "number.pulsatrix_0f7e9a442c7b_amperage_limit"
+ACK_ENTITY_ID = "sensor.pulsatrix_0f7e9a442c7b_limit_ack_latency"
+TOPIC = "pulsatrix/secc/0F7E9A442C7B/charging/amperageLimit"
+
+
+async def set_value(hass: HomeAssistant, value: float) -> None:
+    """Set the amperage limit."""
+    await hass.services.async_call(
+        NUMBER_DOMAIN,
+        SERVICE_SET_VALUE,
+        {ATTR_ENTITY_ID: ENTITY_ID, ATTR_VALUE: value},
+        blocking=True,
+    )
+
+
+async def test_debounce(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that only the last value set within the debounce delay is published."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    def published() -> list[str]:
+        return [
+            call.args[1]
+            for call in mqtt_mock.async_publish.call_args_list
+            if call.args[0] == TOPIC
+        ]
+
+    for value in (17, 18, 19.5):
+        await set_value(hass, value)
+        assert hass.states.get(ENTITY_ID).state == str(float(value))
+    assert published() == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert published() == ["19.5"]
+    # The charger acknowledges the limit, so it is not published again
+    async_fire_mqtt_message(hass, TOPIC, "19.5")
+    await hass.async_block_till_done()
+
+    # Ending on the value the charger already has publishes nothing
+    await set_value(hass, 20)
+    await set_value(hass, 19.5)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert published() == ["19.5"]
+    assert hass.states.get(ENTITY_ID).state == "19.5"
+
+
+async def test_read_back(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the limit follows the value reported by the charger."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_ID).state == "unknown"
+
+    async_fire_mqtt_message(hass, TOPIC, "13.5")
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_ID).state == "13.5"
+
+    # Setting the reported value publishes nothing
+    await set_value(hass, 13.5)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert not mqtt_mock.async_publish.called
+
+
+async def test_publish_ack(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a publish is acknowledged by the charger, not by its echo."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(ACK_ENTITY_ID).state == "unknown"
+
+    # The broker echoes the publish to the subscription of the topic
+    await set_value(hass, 10)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert mqtt_mock.async_publish.call_count == 1
+    assert hass.states.get(ACK_ENTITY_ID).attributes["acks"] == 0
+
+    # The charger reports the new limit
+    async_fire_mqtt_message(hass, TOPIC, "10.0")
+    await hass.async_block_till_done()
+    state = hass.states.get(ACK_ENTITY_ID)
+    assert float(state.state) >= 0
+    assert state.attributes["acks"] == 1
+    assert state.attributes["retries"] == 0
+    assert sum(
+        count for name, count in state.attributes.items() if name.endswith("ms")
+    ) == 1
+
+    # Acknowledged publishes are not retried
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=60))
+    await hass.async_block_till_done()
+    assert mqtt_mock.async_publish.call_count == 1
+
+
+async def test_publish_no_reply(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a charger that never reports limits back gets them once."""
+    mqtt_mock = await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"limit_retries": True}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    start = dt_util.utcnow()
+    await set_value(hass, 10)
+    for seconds in (1, 2.5, 4.5, 8.5, 16.5):
+        async_fire_time_changed(hass, start + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+
+    # Published and echoed once, the echo is no acknowledgement
+    assert mqtt_mock.async_publish.call_count == 1
+    state = hass.states.get(ACK_ENTITY_ID)
+    assert state.attributes["acks"] == 0
+    assert state.attributes["retries"] == 0
+    assert state.attributes["failures"] == 0
+
+
+async def test_publish_retry(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that unacknowledged publishes are retried with backoff."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"limit_retries": True}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Retries start once the charger has reported a limit back
+    await set_value(hass, 8)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    async_fire_mqtt_message(hass, TOPIC, "8.0")
+    await hass.async_block_till_done()
+    assert hass.states.get(ACK_ENTITY_ID).attributes["acks"] == 1
+
+    start = dt_util.utcnow()
+
+    async def publishes_after(seconds: float) -> int:
+        async_fire_time_changed(hass, start + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+        return publish.call_count
+
+    # Lose all publishes, so none is echoed
+    with patch(
+        "custom_components.pulsatrix_local_mqtt.ack.mqtt.async_publish", AsyncMock()
+    ) as publish:
+        await set_value(hass, 10)
+        assert await publishes_after(1) == 1
+        # Retried after 2, 4 and 8 seconds, then given up after 16
+        assert await publishes_after(1.5) == 1
+        assert await publishes_after(2.5) == 2
+        assert await publishes_after(3.5) == 2
+        assert await publishes_after(4.5) == 3
+        assert await publishes_after(8.5) == 4
+        assert await publishes_after(16.5) == 4
+    assert [call.args[1:] for call in publish.call_args_list] == [(TOPIC, "10.0")] * 4
+
+    state = hass.states.get(ACK_ENTITY_ID)
+    assert state.attributes["retries"] == 3
+    assert state.attributes["failures"] == 1
+    assert state.attributes["acks"] == 1
+
+    # A late echo is not counted
+    async_fire_mqtt_message(hass, TOPIC, "10.0")
+    await hass.async_block_till_done()
+    assert hass.states.get(ACK_ENTITY_ID).attributes["acks"] == 1
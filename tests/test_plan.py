@@ -0,0 +1,105 @@
+"""Test and benchmark the compiled extraction plan."""
+import json
+import timeit
+
+from custom_components.pulsatrix_local_mqtt.definitions.binary_sensor import (
+    BINARY_SENSORS,
+)
+from custom_components.pulsatrix_local_mqtt.definitions.number import NUMBERS
+from custom_components.pulsatrix_local_mqtt.definitions.sensor import SENSORS
+from custom_components.pulsatrix_local_mqtt.plan import compile_plan, run_plan
+
+DESCRIPTIONS = (*SENSORS, *BINARY_SENSORS, *NUMBERS)
+
+
+def callable_path(descriptions, data, results):
+    """Extract all values by calling every description's callables."""
+
+    def listener(plan_key, value, raw):
+        results[plan_key] = (value, raw)
+
+    for description in descriptions:
+        try:
+            if description.domain == "binary_sensor":
+                value = description.state(data, description.attribute)
+            else:
+                value = description.state(
+                    data, description.attribute, description.attribute_index
+                )
+        except KeyError:
+            value = None
+        raw = None
+        if description.raw_value is not None:
+            raw = description.raw_value(
+                data, description.attribute, description.attribute_index
+            )
+        listener((description.domain, description.key), value, raw)
+
+
+def plan_entries(topic, results):
+    """Return plan entries for a topic collecting values into results."""
+    entries = []
+    for plan_key, step in compile_plan(DESCRIPTIONS)[topic].items():
+
+        def listener(value, raw, plan_key=plan_key):
+            results[plan_key] = (value, raw)
+
+        entries.append((*step, [listener]))
+    return tuple(entries)
+
+
+def test_plan_matches_callables(capture_payloads) -> None:
+    """Test that the plan extracts the same values as the callables."""
+    for topic, payload in capture_payloads:
+        data = json.loads(payload)
+        descriptions = [d for d in DESCRIPTIONS if d.topic == topic and d.state]
+
+        expected = {}
+        callable_path(descriptions, data, expected)
+        actual = {}
+        run_plan(plan_entries(topic, actual), data)
+
+        for description in descriptions:
+            plan_key = (description.domain, description.key)
+            assert actual[plan_key][0] == expected[plan_key][0], plan_key
+            if description.raw_value is not None:
+                assert actual[plan_key][1] == expected[plan_key][1], plan_key
+
+
+def test_plan_raw_value_of_callable() -> None:
+    """Test that callable steps report the raw value next to their state."""
+    actual = {}
+    run_plan(
+        plan_entries("charging/status", actual),
+        {"recentCpErrorCause": "CpShortCircuit"},
+    )
+    assert actual["sensor", "recent_cp_error_cause"] == (
+        "CP shorted",
+        "CpShortCircuit",
+    )
+
+
+def test_plan_benchmark(capture_payloads, assert_timings) -> None:
+    """Compare the plan with the per-callable path on captured payloads."""
+    for topic, payload in capture_payloads:
+        data = json.loads(payload)
+        descriptions = [d for d in DESCRIPTIONS if d.topic == topic and d.state]
+        results = {}
+        entries = plan_entries(topic, results)
+
+        callables = min(
+            timeit.repeat(
+                lambda: callable_path(descriptions, data, results),
+                number=2000,
+                repeat=5,
+            )
+        )
+        plan = min(
+            timeit.repeat(lambda: run_plan(entries, data), number=2000, repeat=5)
+        )
+        print(
+            f"{topic}: callables {callables / 2000 * 1e6:.1f} µs,"
+            f" plan {plan / 2000 * 1e6:.1f} µs per message"
+        )
+        if assert_timings:
+            assert plan < callables * 1.25
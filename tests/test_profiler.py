@@ -0,0 +1,110 @@
+"""Test the pulsatrix (MQTT) profile service."""
+import asyncio
+from datetime import timedelta
+import json
+import os
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import (
+    DATA_ROUTERS,
+    DOMAIN,
+    EVENT_PROFILE,
+)
+
+SERIAL_NUMBER = "0F7E9A442C7B"
+
+
+async def test_profile(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the handlers are only wrapped while profiling."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    router = hass.data[DATA_ROUTERS]["pulsatrix/secc"]
+    handlers = dict(router._handlers)
+    events = async_capture_events(hass, EVENT_PROFILE)
+
+    # The service returns right away, the profile runs in the background
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile",
+        {"serial_number": SERIAL_NUMBER, "seconds": 5},
+        blocking=True,
+        return_response=True,
+    )
+    path = response["path"]
+    assert not os.path.exists(path)
+    assert router._handlers.keys() == handlers.keys()
+    assert router._handlers != handlers
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, "profile", {"serial_number": SERIAL_NUMBER}, blocking=True
+        )
+
+    for state in ("CHARGING", "COMPLETED"):
+        async_fire_mqtt_message(
+            hass,
+            f"pulsatrix/secc/{SERIAL_NUMBER}/tx/status",
+            json.dumps({"state": state}),
+        )
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    # The report is written by the executor
+    for _ in range(500):
+        if events:
+            break
+        await asyncio.sleep(0.01)
+
+    assert router._handlers == handlers
+    assert events[0].data == {
+        "serial_number": SERIAL_NUMBER,
+        "path": path,
+        "messages": 2,
+    }
+    with open(path, encoding="utf-8") as file:
+        report = file.read()
+    assert report.startswith(f"pulsatrix {SERIAL_NUMBER}: 2 messages in 5 seconds")
+    assert "_async_dispatch" in report
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, "profile", {"serial_number": "OTHER"}, blocking=True
+        )
+
+
+async def test_profile_unload(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that unloading the entry cancels a running profile."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    events = async_capture_events(hass, EVENT_PROFILE)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile",
+        {"serial_number": SERIAL_NUMBER, "seconds": 3600},
+        blocking=True,
+        return_response=True,
+    )
+    assert coordinator.profiling
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert not coordinator.profiling
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3600))
+    await hass.async_block_till_done()
+    assert not events
+    assert not os.path.exists(response["path"])
@@ -0,0 +1,243 @@
+"""Test the pulsatrix (MQTT) sensors."""
+from datetime import timedelta
+import json
+
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.pulsatrix_local_mqtt.definitions.sensor import (
+    DERIVED_SENSORS,
+    SENSORS,
+    SURPLUS_SENSORS,
+    PxDeadband,
+)
+from custom_components.pulsatrix_local_mqtt.join import parse_phases
+
+FISCAL_TOPIC = "pulsatrix/secc/0F7E9A442C7B/meter/fiscal"
+TX_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/tx/status"
+CHARGING_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/charging/status"
+
+
+def enable_entity(hass: HomeAssistant, key: str) -> None:
+    """Register a sensor that is disabled by default as enabled."""
+    er.async_get(hass).async_get_or_create(
+        "sensor",
+        "pulsatrix_local_mqtt",
+        f"0F7E9A442C7B-sensor-{key}",
+        suggested_object_id=f"pulsatrix_0f7e9a442c7b_{key}",
+        disabled_by=None,
+    )
+
+
+def fiscal_payload(
+    voltage: float, amperage: tuple[float, float, float] = (0, 0, 0)
+) -> str:
+    """Return a meter/fiscal payload with the given P1 voltage."""
+    return json.dumps(
+        {
+            "voltage": [voltage, 238.4984131, 236.7804108],
+            "amperage": list(amperage),
+            "frequency": 49.92698288,
+            "activePower": 0,
+            "energyImported": 3645.880859,
+        }
+    )
+
+
+async def test_deadband(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that changes within the deadband are not written."""
+    await mqtt_mock_entry()
+    enable_entity(hass, "p1_voltage")
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = "sensor.pulsatrix_0f7e9a442c7b_p1_voltage"
+
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(236.36))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "236.36"
+
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(236.61))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "236.36"
+
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(237.01))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "237.01"
+
+
+async def test_deadband_unit(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the power deadband in kW is converted for sensors in W."""
+    await mqtt_mock_entry()
+    enable_entity(hass, "p1_power")
+    hass.config_entries.async_update_entry(
+        config_entry, options={"deadband_power": "0.1"}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = "sensor.pulsatrix_0f7e9a442c7b_p1_power"
+
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(236.5, (10, 10, 10)))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "2365.0"
+
+    # 47.3 W are within the band of 100 W
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(236.5, (10.2, 10, 10)))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "2365.0"
+
+    async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(236.5, (10.5, 10, 10)))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "2483.2"
+
+
+@pytest.mark.parametrize(
+    "description",
+    [
+        description
+        for description in (*SENSORS, *DERIVED_SENSORS, *SURPLUS_SENSORS)
+        if description.deadband_group == "power"
+    ],
+    ids=lambda description: description.key,
+)
+def test_power_deadband_unit(description) -> None:
+    """Test that the power deadband option (in kW) fits each power sensor."""
+    band = PxDeadband(0.1).scaled(description.deadband_scale)
+    if description.native_unit_of_measurement == UnitOfPower.WATT:
+        assert band.value == 100
+    else:
+        assert description.native_unit_of_measurement == UnitOfPower.KILO_WATT
+        assert band.value == 0.1
+
+
+async def test_downsampling(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that samples are collected and written once per interval."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"sample_interval": 10, "sample_state": "mean"}
+    )
+    enable_entity(hass, "p1_voltage")
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = "sensor.pulsatrix_0f7e9a442c7b_p1_voltage"
+
+    for voltage in (230.0, 232.0, 237.0):
+        async_fire_mqtt_message(hass, FISCAL_TOPIC, fiscal_payload(voltage))
+        await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "unavailable"
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == "233.0"
+    assert state.attributes["min"] == 230.0
+    assert state.attributes["max"] == 237.0
+    assert state.attributes["samples"] == 3
+
+
+async def test_restore_state(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the last state is restored and replaced by live values."""
+    sensor_id = "sensor.pulsatrix_0f7e9a442c7b_state"
+    binary_sensor_id = "binary_sensor.pulsatrix_0f7e9a442c7b_charging"
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(sensor_id, "Finished"),
+                {"native_value": "Finished", "native_unit_of_measurement": None},
+            ),
+            (State(binary_sensor_id, "off"), {}),
+        ],
+    )
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(sensor_id)
+    assert state.state == "Finished"
+    assert state.attributes["restored"] is True
+    state = hass.states.get(binary_sensor_id)
+    assert state.state == "off"
+    assert state.attributes["restored"] is True
+
+    async_fire_mqtt_message(
+        hass, TX_STATUS_TOPIC, json.dumps({"id": "a1", "state": "CHARGING"})
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(sensor_id)
+    assert state.state == "Charging"
+    assert "restored" not in state.attributes
+    state = hass.states.get(binary_sensor_id)
+    assert state.state == "on"
+    assert "restored" not in state.attributes
+
+
+@pytest.mark.parametrize(
+    ("value", "phases"),
+    [
+        (3, (0, 1, 2)),
+        ("1", (0,)),
+        ("L1L2L3", (0, 1, 2)),
+        ("L1, L3", (0, 2)),
+        (0, None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_phases(value, phases) -> None:
+    """Test parsing the phases used in a session."""
+    assert parse_phases(value) == phases
+
+
+async def test_derived_sensors(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test sensors derived from the joined topics."""
+    await mqtt_mock_entry()
+    enable_entity(hass, "p1_power")
+    enable_entity(hass, "phase_imbalance")
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    max_power_id = "sensor.pulsatrix_0f7e9a442c7b_effective_amperage_limit"
+    p1_power_id = "sensor.pulsatrix_0f7e9a442c7b_p1_power"
+    imbalance_id = "sensor.pulsatrix_0f7e9a442c7b_phase_imbalance"
+
+    async_fire_mqtt_message(
+        hass, TX_STATUS_TOPIC, json.dumps({"effectiveAmperageLimit": 16})
+    )
+    await hass.async_block_till_done()
+    # Nominal voltage on three phases until the meter reports
+    assert hass.states.get(max_power_id).state == "11.04"
+    assert hass.states.get(p1_power_id).state == "unavailable"
+
+    async_fire_mqtt_message(
+        hass, FISCAL_TOPIC, fiscal_payload(236.5, (10.0, 10.0, 7.0))
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(max_power_id).state == "11.39"
+    assert hass.states.get(p1_power_id).state == "2365.0"
+    assert hass.states.get(imbalance_id).state == "22.2"
+
+    async_fire_mqtt_message(
+        hass, CHARGING_STATUS_TOPIC, json.dumps({"usedPhasesSession": "L1"})
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(max_power_id).state == "3.78"
+    assert hass.states.get(imbalance_id).state == "0.0"
@@ -0,0 +1,285 @@
+"""Test the pulsatrix (MQTT) services."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+import voluptuous as vol
+
+from custom_components.pulsatrix_local_mqtt.const import (
+    CONF_SERIAL_NUMBER,
+    CONF_TOPIC_PREFIX,
+    DOMAIN,
+)
+from custom_components.pulsatrix_local_mqtt.services import (
+    MAX_PARALLEL_PUBLISHES,
+    normalize_config_value,
+)
+
+SERIAL_NUMBER = "0F7E9A442C7B"
+
+
+@pytest.mark.parametrize(
+    ("value", "payload"),
+    [("16", "16"), ("True", "true"), ("false", "false"), ("1.5", '"1.5"'), ("abc", '"abc"')],
+)
+def test_normalize_config_value(value: str, payload: str) -> None:
+    """Test that values are sent as numbers, booleans or strings."""
+    assert normalize_config_value(value) == payload
+
+
+async def test_set_config_key(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a config key is set below the topic prefix of the entry."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        "set_config_key",
+        {"serial_number": SERIAL_NUMBER, "key": "config/foo", "value": "True"},
+        blocking=True,
+    )
+    mqtt_mock.async_publish.assert_called_once_with(
+        f"pulsatrix/secc/{SERIAL_NUMBER}/config/foo/set", "true", 0, False
+    )
+
+
+async def test_set_config_key_custom_prefix(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry
+) -> None:
+    """Test that the topic prefix is looked up by serial number."""
+    mqtt_mock = await mqtt_mock_entry()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_SERIAL_NUMBER: "0F7E9A442C7C", CONF_TOPIC_PREFIX: "garage/secc"},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        "set_config_key",
+        {"serial_number": "0F7E9A442C7C", "key": "config/foo", "value": "1"},
+        blocking=True,
+    )
+    assert mqtt_mock.async_publish.call_args.args[:2] == (
+        "garage/secc/0F7E9A442C7C/config/foo/set",
+        "1",
+    )
+
+    # Unloaded chargers fall back to the default topic prefix
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        DOMAIN,
+        "set_config_key",
+        {"serial_number": "0F7E9A442C7C", "key": "config/foo", "value": "1"},
+        blocking=True,
+    )
+    assert mqtt_mock.async_publish.call_args.args[0] == (
+        "/pulsatrix/secc/0F7E9A442C7C/config/foo/set"
+    )
+
+
+async def test_set_config_keys(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a batch is published and reported per item."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "set_config_keys",
+        {
+            "items": [
+                {"serial_number": SERIAL_NUMBER, "key": "config/foo", "value": "1"},
+                {"serial_number": "OTHER", "key": "config/bar", "value": "x"},
+            ]
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "results": [
+            {
+                "serial_number": SERIAL_NUMBER,
+                "key": "config/foo",
+                "value": "1",
+                "success": True,
+                "published": True,
+            },
+            {
+                "serial_number": "OTHER",
+                "key": "config/bar",
+                "value": '"x"',
+                "success": True,
+                "published": True,
+            },
+        ]
+    }
+    assert {call.args[:2] for call in mqtt_mock.async_publish.call_args_list} == {
+        (f"pulsatrix/secc/{SERIAL_NUMBER}/config/foo/set", "1"),
+        # Chargers without an entry use the default topic prefix
+        ("/pulsatrix/secc/OTHER/config/bar/set", '"x"'),
+    }
+
+
+async def test_set_config_keys_mapping(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a mapping is applied to many chargers with bounded parallelism."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    serial_numbers = [f"SERIAL{index:02}" for index in range(30)]
+    in_flight = max_in_flight = 0
+
+    async def publish(hass, topic, payload, *args) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if topic.startswith("/pulsatrix/secc/SERIAL13/"):
+            raise HomeAssistantError("Not connected")
+
+    with patch(
+        "custom_components.pulsatrix_local_mqtt.services.mqtt.async_publish", publish
+    ):
+        response = await hass.services.async_call(
+            DOMAIN,
+            "set_config_keys",
+            {
+                "serial_numbers": serial_numbers,
+                "config": {"config/foo": "1", "config/bar": "false"},
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    results = response["results"]
+    assert len(results) == 60
+    assert max_in_flight == MAX_PARALLEL_PUBLISHES
+    failed = [result for result in results if not result["success"]]
+    assert [(result["serial_number"], result["error"]) for result in failed] == [
+        ("SERIAL13", "Not connected"),
+        ("SERIAL13", "Not connected"),
+    ]
+
+
+async def test_set_config_keys_invalid(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that serial numbers require a config and exclude items."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    for data in (
+        {},
+        {"serial_numbers": [SERIAL_NUMBER]},
+        {
+            "serial_numbers": [SERIAL_NUMBER],
+            "config": {"config/foo": "1"},
+            "items": [{"serial_number": SERIAL_NUMBER, "key": "k", "value": "1"}],
+        },
+    ):
+        with pytest.raises(vol.Invalid):
+            await hass.services.async_call(
+                DOMAIN, "set_config_keys", data, blocking=True, return_response=True
+            )
+
+
+async def test_config_snapshot(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that reported config keys are cached and unchanged keys skipped."""
+    mqtt_mock = await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    topic = f"pulsatrix/secc/{SERIAL_NUMBER}"
+    for sub_topic, payload in (
+        ("config/foo", "16"),
+        ("config/bar", '"abc"'),
+        ("config/baz", "true"),
+        ("config/gone", "1"),
+        ("config/gone", ""),
+        # Neither the set topics nor the state topics are config keys
+        ("config/foo/set", "17"),
+        ("meter/fiscal", '{"activePower": 1}'),
+    ):
+        async_fire_mqtt_message(hass, f"{topic}/{sub_topic}", payload)
+    await hass.async_block_till_done()
+
+    snapshot = await hass.services.async_call(
+        DOMAIN, "get_config_snapshot", {}, blocking=True, return_response=True
+    )
+    assert snapshot == {
+        SERIAL_NUMBER: {"config/foo": 16, "config/bar": "abc", "config/baz": True}
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "set_config_keys",
+        {
+            "serial_numbers": [SERIAL_NUMBER],
+            "config": {
+                "config/foo": "16",
+                "config/bar": "abc",
+                "config/baz": "False",
+                "config/new": "1",
+            },
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert {
+        result["key"]: result["published"] for result in response["results"]
+    } == {
+        "config/foo": False,
+        "config/bar": False,
+        "config/baz": True,
+        "config/new": True,
+    }
+    assert [call.args[:2] for call in mqtt_mock.async_publish.call_args_list] == [
+        (f"{topic}/config/baz/set", "false"),
+        (f"{topic}/config/new/set", "1"),
+    ]
+
+    mqtt_mock.async_publish.reset_mock()
+    await hass.services.async_call(
+        DOMAIN,
+        "set_config_key",
+        {"serial_number": SERIAL_NUMBER, "key": "config/foo", "value": "16"},
+        blocking=True,
+    )
+    assert not mqtt_mock.async_publish.called
+    await hass.services.async_call(
+        DOMAIN,
+        "set_config_key",
+        {"serial_number": SERIAL_NUMBER, "key": "config/foo", "value": "16", "force": True},
+        blocking=True,
+    )
+    assert mqtt_mock.async_publish.call_args.args[:2] == (f"{topic}/config/foo/set", "16")
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "get_config_snapshot",
+            {"serial_numbers": ["OTHER"]},
+            blocking=True,
+            return_response=True,
+        )
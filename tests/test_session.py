@@ -0,0 +1,138 @@
+"""Test the pulsatrix (MQTT) session transitions."""
+import json
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_mqtt_message,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import EVENT_SESSION
+
+TX_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/tx/status"
+
+
+def tx_status(
+    state: str,
+    last_meter_value: float = 100.0,
+    ended: int = 0,
+    session_id: str = "a1",
+) -> str:
+    """Return a tx/status payload."""
+    return json.dumps(
+        {
+            "id": session_id,
+            "state": state,
+            "startedTime": 1691343029,
+            "endedTime": ended,
+            "meterStart": 100.0,
+            "lastMeterValue": last_meter_value,
+        }
+    )
+
+
+async def test_session_events(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that only session transitions fire events."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_SESSION)
+
+    for payload in (
+        # The first (retained) state only initializes the tracker
+        tx_status("IDLE"),
+        tx_status("AWAITING_START"),
+        tx_status("CHARGING", 101.0),
+        tx_status("CHARGING", 102.0),
+        tx_status("SUSPENDED_EV", 102.5),
+        tx_status("CHARGING", 103.0),
+        tx_status("COMPLETED", 104.25, ended=1691346629),
+        tx_status("COMPLETED", 104.25, ended=1691346629),
+        tx_status("IDLE"),
+    ):
+        async_fire_mqtt_message(hass, TX_STATUS_TOPIC, payload)
+        await hass.async_block_till_done()
+
+    assert [
+        (event.data["type"], event.data["from_state"], event.data["to_state"])
+        for event in events
+    ] == [
+        ("started", "AWAITING_START", "CHARGING"),
+        ("suspended", "CHARGING", "SUSPENDED_EV"),
+        ("resumed", "SUSPENDED_EV", "CHARGING"),
+        ("completed", "CHARGING", "COMPLETED"),
+    ]
+    completed = events[-1].data
+    assert completed["serial_number"] == "0F7E9A442C7B"
+    assert completed["session_id"] == "a1"
+    assert completed["energy"] == 4.25
+    assert completed["duration"] == 3600
+
+
+async def test_session_failed(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a failing session fires an event."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_SESSION)
+
+    for state in ("CHARGING", "FAILED", "UNKNOWN_STATE", "CHARGING"):
+        async_fire_mqtt_message(hass, TX_STATUS_TOPIC, tx_status(state))
+        await hass.async_block_till_done()
+
+    assert [event.data["type"] for event in events] == ["failed", "started"]
+
+
+async def test_session_started_suspended(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a session waiting for the vehicle first fires started."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_SESSION)
+
+    for payload in (
+        tx_status("IDLE"),
+        tx_status("AWAITING_START"),
+        tx_status("SUSPENDED_EV"),
+        tx_status("CHARGING", 101.0),
+    ):
+        async_fire_mqtt_message(hass, TX_STATUS_TOPIC, payload)
+        await hass.async_block_till_done()
+
+    assert [
+        (event.data["type"], event.data["from_state"], event.data["to_state"])
+        for event in events
+    ] == [
+        ("started", "AWAITING_START", "SUSPENDED_EV"),
+        ("resumed", "SUSPENDED_EV", "CHARGING"),
+    ]
+
+
+async def test_session_new_transaction(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a new transaction id starts a new session."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_SESSION)
+
+    for payload in (
+        tx_status("CHARGING"),
+        tx_status("CHARGING", 101.0),
+        tx_status("CHARGING", 100.0, session_id="b2"),
+        tx_status("IDLE", session_id="c3"),
+    ):
+        async_fire_mqtt_message(hass, TX_STATUS_TOPIC, payload)
+        await hass.async_block_till_done()
+
+    assert [(event.data["type"], event.data["session_id"]) for event in events] == [
+        ("started", "b2"),
+        ("completed", "c3"),
+    ]
@@ -0,0 +1,163 @@
+"""Test the pulsatrix (MQTT) session log."""
+import asyncio
+from datetime import timedelta
+import json
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import DOMAIN
+from custom_components.pulsatrix_local_mqtt.sessionlog import (
+    SESSION_LOG_DELAY,
+    SESSION_LOG_FILE,
+    PxSessionLog,
+)
+
+SERIAL_NUMBER = "0F7E9A442C7B"
+TX_STATUS_TOPIC = f"pulsatrix/secc/{SERIAL_NUMBER}/tx/status"
+# 2023-08-06 17:30:29 UTC
+STARTED = 1691343029
+
+
+def tx_status(session_id: str, state: str, started: int) -> str:
+    """Return a tx/status payload."""
+    return json.dumps(
+        {
+            "id": session_id,
+            "state": state,
+            "startedTime": started,
+            "endedTime": started + 3600 if state == "COMPLETED" else 0,
+            "startReason": "CablePluggedIn",
+            "meterStart": 100.0,
+            "meterStop": 105.5 if state == "COMPLETED" else 100.0,
+            "lastMeterValue": 105.5,
+            "peakActivePower": 11000.0,
+        }
+    )
+
+
+async def complete_sessions(hass: HomeAssistant, sessions: list[tuple[str, int]]) -> None:
+    """Run charging sessions to completion."""
+    for session_id, started in sessions:
+        for state in ("IDLE", "CHARGING", "COMPLETED"):
+            async_fire_mqtt_message(
+                hass, TX_STATUS_TOPIC, tx_status(session_id, state, started)
+            )
+            await hass.async_block_till_done()
+
+
+async def test_session_log(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that completed sessions are appended in batches and queried."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    path = Path(hass.config.path(".storage", SESSION_LOG_FILE))
+
+    await complete_sessions(
+        hass, [("a1", STARTED), ("a2", STARTED + 86400), ("a2", STARTED + 86400)]
+    )
+    # Written once the delay has passed
+    assert not path.exists()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SESSION_LOG_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["a1", "a2"]
+    assert json.loads(lines[0]) == {
+        "id": "a1",
+        "serial_number": SERIAL_NUMBER,
+        "meterStart": 100.0,
+        "meterStop": 105.5,
+        "startedTime": STARTED,
+        "endedTime": STARTED + 3600,
+        "peakActivePower": 11000.0,
+        "startReason": "CablePluggedIn",
+        "energy": 5.5,
+    }
+
+    # Pending sessions are appended before the unload returns, the file is
+    # never rewritten
+    await complete_sessions(hass, [("a0", STARTED - 86400)])
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert path.read_text().startswith("\n".join(lines))
+    assert len(path.read_text().splitlines()) == 3
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_sessions",
+        {"start": "2023-08-06T00:00:00+00:00", "end": "2023-08-07T23:59:59+00:00"},
+        blocking=True,
+        return_response=True,
+    )
+    assert [session["id"] for session in response["sessions"]] == ["a1", "a2"]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_sessions",
+        {"serial_numbers": ["OTHER"]},
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {"sessions": []}
+
+
+async def test_session_log_load(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the log is read at startup, skipping broken lines."""
+    path = Path(hass.config.path(".storage", SESSION_LOG_FILE))
+    path.parent.mkdir(parents=True)
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"id": "b2", "serial_number": SERIAL_NUMBER, "startedTime": 20}),
+                json.dumps({"id": "b1", "serial_number": SERIAL_NUMBER, "startedTime": 10}),
+                '{"id": "b3", "serial_nu',
+            ]
+        )
+    )
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_sessions",
+        {"start": "1970-01-01T00:00:00+00:00"},
+        blocking=True,
+        return_response=True,
+    )
+    assert [session["id"] for session in response["sessions"]] == ["b1", "b2"]
+
+    # Appending starts a new line after the broken one
+    await complete_sessions(hass, [("b4", 30)])
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert json.loads(path.read_text().splitlines()[-1])["id"] == "b4"
+
+
+async def test_session_log_flush_order(hass: HomeAssistant) -> None:
+    """Test that concurrent flushes append in the order they were started."""
+    session_log = PxSessionLog(hass)
+    await session_log.async_load()
+
+    flushes = []
+    for session_id in ("c1", "c2", "c3"):
+        session_log.async_add(
+            {"id": session_id, "serial_number": SERIAL_NUMBER, "startedTime": 10}
+        )
+        flushes.append(hass.async_create_task(session_log.async_flush()))
+        # Let the flush start before the next session is added
+        await asyncio.sleep(0)
+    await asyncio.gather(*flushes)
+
+    lines = Path(session_log.path).read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["c1", "c2", "c3"]
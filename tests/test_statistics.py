@@ -0,0 +1,163 @@
+"""Test the pulsatrix (MQTT) energy statistics."""
+from datetime import timedelta
+import json
+
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import (
+    DATA_SESSION_LOG,
+    DOMAIN,
+    STATISTICS_METER_REGISTER,
+)
+from custom_components.pulsatrix_local_mqtt.statistics import (
+    PxSessionStatistics,
+    async_backfill_register,
+    async_import_buckets,
+    register_buckets,
+    session_buckets,
+)
+
+TX_STATUS_TOPIC = "pulsatrix/secc/0F7E9A442C7B/tx/status"
+# 2024-01-01 00:00:00 UTC
+START = 1704067200
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_db_url, enable_custom_integrations):
+    """Enable custom integrations, the recorder database has to come first."""
+    yield
+
+
+def test_session_buckets() -> None:
+    """Test that the energy of a session is split over the hours it lasted."""
+    assert session_buckets(
+        [
+            # 30 minutes in the first, 60 in the second and 30 in the third hour
+            {"startedTime": START + 1800, "endedTime": START + 9000, "energy": 8.0},
+            {"startedTime": START + 3700, "endedTime": 0, "energy": 1.0},
+            {"startedTime": START, "endedTime": START + 60, "energy": None},
+        ]
+    ) == {START: 2.0, START + 3600: 5.0, START + 7200: 2.0}
+
+
+def test_register_buckets() -> None:
+    """Test that register increases are attributed to their hours."""
+    states = [
+        State("sensor.register", value, last_updated=dt_util.utc_from_timestamp(ts))
+        for value, ts in (
+            ("100.0", START + 10),
+            ("101.5", START + 1000),
+            ("unavailable", START + 2000),
+            ("103.0", START + 4000),
+            # A new meter only sets a new baseline
+            ("2.0", START + 5000),
+            ("2.5", START + 6000),
+        )
+    ]
+    assert register_buckets(states) == {START: 1.5, START + 3600: 2.0}
+
+
+async def session_sums(hass: HomeAssistant, statistic_id: str) -> list[float]:
+    """Return the hourly sums of a statistic from START on."""
+    await async_wait_recording_done(hass)
+    start = dt_util.utc_from_timestamp(START)
+    statistics = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        start,
+        start + timedelta(days=1),
+        {statistic_id},
+        "hour",
+        None,
+        {"sum"},
+    )
+    return [row["sum"] for row in statistics[statistic_id]]
+
+
+async def test_session_statistics(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    mock_hass_config,
+    mqtt_mock_entry,
+    config_entry,
+) -> None:
+    """Test that completed sessions are imported as hourly statistics."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    for session_id, started, ended, energy in (
+        ("a1", START + 1800, START + 5400, 6.0),
+        # Shares the second hour with the first session
+        ("a2", START + 6300, START + 7200, 1.0),
+        ("a3", START + 7200, START + 9000, 2.0),
+    ):
+        for state, meter in (
+            ("IDLE", 10.0),
+            ("CHARGING", 10.0),
+            ("COMPLETED", 10.0 + energy),
+        ):
+            payload = {
+                "id": session_id,
+                "state": state,
+                "startedTime": started,
+                "endedTime": ended if state == "COMPLETED" else 0,
+                "meterStart": 10.0,
+                "lastMeterValue": meter,
+            }
+            async_fire_mqtt_message(hass, TX_STATUS_TOPIC, json.dumps(payload))
+            await hass.async_block_till_done()
+
+    statistic_id = f"{DOMAIN}:sessions_energy_0f7e9a442c7b"
+    assert await session_sums(hass, statistic_id) == [3.0, 7.0, 9.0]
+
+    # A new importer continues from the last hour in the recorder
+    importer = PxSessionStatistics(hass, "0F7E9A442C7B", hass.data[DATA_SESSION_LOG])
+    assert await importer.async_add(
+        {"startedTime": START + 8000, "endedTime": START + 9000, "energy": 1.0}
+    ) == 1
+    assert await session_sums(hass, statistic_id) == [3.0, 7.0, 10.0]
+
+    # A rebuild from the session log imports all hours again
+    assert len(hass.data[DATA_SESSION_LOG]) == 3
+    response = await hass.services.async_call(
+        DOMAIN, "import_statistics", {}, blocking=True, return_response=True
+    )
+    assert response == {"statistics": {statistic_id: 3}}
+    assert await session_sums(hass, statistic_id) == [3.0, 7.0, 9.0]
+
+
+async def test_backfill_register(
+    recorder_mock: Recorder, hass: HomeAssistant, freezer
+) -> None:
+    """Test that the backfill continues the sum of the hours before it."""
+    statistic_id = f"{DOMAIN}:meter_register_energy_0f7e9a442c7b"
+    async_import_buckets(
+        hass, "0F7E9A442C7B", STATISTICS_METER_REGISTER, {START: 100.0}
+    )
+    entity_id = er.async_get(hass).async_get_or_create(
+        "sensor", DOMAIN, "0F7E9A442C7B-sensor-energy_active_import_register"
+    ).entity_id
+    for value, timestamp in (
+        ("500.0", START + 3660),
+        ("502.0", START + 4800),
+        ("505.0", START + 7260),
+    ):
+        freezer.move_to(dt_util.utc_from_timestamp(timestamp))
+        hass.states.async_set(entity_id, value)
+        await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+
+    assert await async_backfill_register(
+        hass, "0F7E9A442C7B", dt_util.utc_from_timestamp(START + 3600)
+    ) == 2
+    assert await session_sums(hass, statistic_id) == [100.0, 102.0, 105.0]
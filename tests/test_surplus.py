@@ -0,0 +1,79 @@
+"""Test the pulsatrix (MQTT) PV surplus charging."""
+from datetime import timedelta
+import json
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+from custom_components.pulsatrix_local_mqtt.sampling import PxEwmaBuffer
+
+from .conftest import PREFIX, published
+
+
+def test_ewma_buffer() -> None:
+    """Test the EWMA over the ring buffer."""
+    buffer = PxEwmaBuffer(3, 0.5)
+    assert buffer.value is None
+    buffer.add(100)
+    assert buffer.value == 100
+    buffer.add(200)
+    assert buffer.value == 150
+    for value in (0, 0, 0):
+        buffer.add(value)
+    # The older samples have left the buffer entirely
+    assert buffer.value == 0
+
+
+async def test_surplus_charging(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that the amperage limit follows the smoothed surplus."""
+    mqtt_mock = await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            "surplus_charging": True,
+            "surplus_sensor": "sensor.export",
+            "surplus_target": "amperage",
+            "surplus_interval": 60,
+        },
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def export(power: float) -> None:
+        hass.states.async_set("sensor.export", str(power), {"unit_of_measurement": "W"})
+        await hass.async_block_till_done()
+
+    # 1 phase at 230 V: 3000 W cover 13 A
+    async_fire_mqtt_message(
+        hass, f"{PREFIX}/charging/status", json.dumps({"usedPhasesSession": "L1"})
+    )
+    await export(3000)
+    assert published(mqtt_mock, "charging/amperageLimit") == ["13.0"]
+    # The charger acknowledges the limit, so it is not published again
+    async_fire_mqtt_message(hass, f"{PREFIX}/charging/amperageLimit", "13.0")
+
+    # Within the interval, only the latest limit is sent at its end
+    await export(2000)
+    await export(1000)
+    assert published(mqtt_mock, "charging/amperageLimit") == ["13.0"]
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+    assert published(mqtt_mock, "charging/amperageLimit") == ["13.0", "9.5"]
+    async_fire_mqtt_message(hass, f"{PREFIX}/charging/amperageLimit", "9.5")
+
+    # Switching to 3 phases: the surplus no longer covers 6 A per phase, the
+    # limit stays at the minimum
+    async_fire_mqtt_message(
+        hass, f"{PREFIX}/charging/status", json.dumps({"usedPhasesSession": 3})
+    )
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=122))
+    await hass.async_block_till_done()
+    assert published(mqtt_mock, "charging/amperageLimit") == ["13.0", "9.5", "6.0"]
+    assert hass.states.get("sensor.pulsatrix_0f7e9a442c7b_surplus_power").state == "2190"
@@ -0,0 +1,86 @@
+"""Test the pulsatrix (MQTT) latency tracing."""
+from datetime import timedelta
+import json
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+
+from custom_components.pulsatrix_local_mqtt.const import DOMAIN
+
+PREFIX = "pulsatrix/secc/0F7E9A442C7B"
+LATENCY_MAX = "sensor.pulsatrix_0f7e9a442c7b_state_latency_max"
+
+
+async def test_latency_tracing(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that state writes caused by messages are traced."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"latency_tracing": True}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    tracer = hass.data[DOMAIN][config_entry.entry_id].tracer
+    assert hass.states.get(LATENCY_MAX).state == "unknown"
+
+    for state in ("CHARGING", "CHARGING", "IDLE"):
+        async_fire_mqtt_message(
+            hass, f"{PREFIX}/tx/status", json.dumps({"state": state})
+        )
+        await hass.async_block_till_done()
+    writes = tracer.writes
+    # The repeated message writes no state
+    assert writes > 0
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+    assert float(hass.states.get(LATENCY_MAX).state) >= tracer.p95 >= tracer.p50 >= 0
+    assert hass.states.get(LATENCY_MAX).attributes["state_writes"] == writes
+    # Writes of the latency sensors themselves are not traced
+    assert tracer.writes == writes
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_latency_tracing_disabled(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that nothing is traced by default."""
+    await mqtt_mock_entry()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][config_entry.entry_id].tracer is None
+    assert hass.states.get(LATENCY_MAX) is None
+
+
+async def test_latency_tracing_failing_listener(
+    hass: HomeAssistant, mock_hass_config, mqtt_mock_entry, config_entry
+) -> None:
+    """Test that a failing listener leaves no stamp for later state writes."""
+    await mqtt_mock_entry()
+    hass.config_entries.async_update_entry(
+        config_entry, options={"latency_tracing": True}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    def fail(_data) -> None:
+        raise RuntimeError
+
+    await coordinator.async_subscribe("tx/status", fail)
+    subscription = coordinator._topics["tx/status"]
+    messages = subscription.stats.messages
+    with pytest.raises(RuntimeError):
+        coordinator._async_dispatch(subscription, b'{"state": "CHARGING"}')
+
+    assert coordinator.tracer.received is None
+    assert subscription.stats.messages == messages + 1